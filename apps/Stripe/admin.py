@@ -2,6 +2,7 @@ from django.contrib import admin
 from unfold.admin import ModelAdmin
 from django.utils.html import format_html
 from apps.Stripe.models import Payment, Payout
+from apps.common.paginator import EstimatedCountPaginator
 
 
 # ----------------------------
@@ -17,6 +18,10 @@ class PaymentAdmin(ModelAdmin):
     search_fields = ["user__full_name", "stripe_payment_intent_id", "stripe_charge_id"]
     list_filter = ["payment_type", "status", "created_at"]
     readonly_fields = ["created_at", "updated_at", "processed_at"]
+    # Booking.__str__ includes the booking user's name
+    list_select_related = ["user", "booking__user"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_per_page = 25
 
     # 🎨 Colored status badge
@@ -84,6 +89,7 @@ class PayoutAdmin(ModelAdmin):
     search_fields = ["host__full_name", "stripe_payout_id", "stripe_account_id"]
     list_filter = ["status", "currency", "created_at"]
     readonly_fields = ["created_at"]
+    list_select_related = ["host"]
     list_per_page = 25
 
     # 🎨 Colored status badges
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Stripe", "0001_initial"),
+        ("bookings", "0008_booking_sweeper"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["status", "created_at"], name="Stripe_paym_status_963b8e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["payment_type", "created_at"],
+                name="Stripe_paym_payment_83f98f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["-created_at"], name="Stripe_paym_created_90fe7a_idx"
+            ),
+        ),
+    ]
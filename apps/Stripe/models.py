@@ -47,6 +47,14 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Admin changelist filters and the dashboard's latest payments
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['payment_type', 'created_at']),
+            models.Index(fields=['-created_at']),
+        ]
     
     def __str__(self):
         return f"Payment #{self.id} - {self.user.full_name} - ${self.amount}"
@@ -1,3 +1,41 @@
+from django.db import connection
+from django.urls import reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from apps.accounts.models import User
+from apps.Stripe.models import Payment, Payout
 
-# Create your tests here.
+
+class StripeAdminChangelistTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(
+            full_name="Admin", email="admin@example.com", phone="+8801700000000", password="secret123"
+        )
+        self.client.force_login(admin)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            n = User.objects.count()
+            user = User.objects.create_user(
+                full_name=f"User {n}", email=f"user{n}@example.com", phone=f"+88017000000{n:02d}", password="secret123"
+            )
+            Payment.objects.create(
+                user=user, payment_type="booking", amount="23.00", stripe_payment_intent_id=f"pi_{n}"
+            )
+            Payout.objects.create(
+                host=user, amount="20.00", stripe_payout_id=f"po_{n}", stripe_account_id=f"acct_{n}"
+            )
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for name in ("admin:Stripe_payment_changelist", "admin:Stripe_payout_changelist"):
+            with self.subTest(name):
+                self.add_rows(2)
+                few = self.changelist_queries(reverse(name))
+                self.add_rows(8)
+                self.assertEqual(self.changelist_queries(reverse(name)), few)
@@ -22,6 +22,9 @@ def setup_stripe_payment(booking, user):
             user.stripe_customer_id = customer['id']
             user.save()
 
+        # Stations imported from Places have no host to pay out to
+        host = booking.station.host
+
         # Create payment intent
         payment_intent = stripe.PaymentIntent.create(
             amount=int(booking.total_amount * 100),
@@ -30,13 +33,13 @@ def setup_stripe_payment(booking, user):
             metadata={
                 'booking_id': booking.id,
                 'driver_id': user.id,
-                'host_id': booking.host.id,
+                'host_id': host.id if host else '',
                 'charger_id': booking.charger.id,
             },
             transfer_data={
-                'destination': booking.host.stripe_account_id,
+                'destination': host.stripe_account_id,
                 'amount': int(booking.subtotal * 100),
-            } if booking.host.stripe_account_id else None,
+            } if host and host.stripe_account_id else None,
         )
 
         # Save payment info
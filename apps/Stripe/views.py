@@ -298,7 +298,7 @@ def create_host_payout(request):
     # Get completed bookings for payout
     bookings = Booking.objects.filter(
         id__in=booking_ids,
-        host=host,
+        station__host=host,
         status='completed',
         is_paid=True
     )
@@ -1,10 +1,92 @@
 from django.utils.html import format_html
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from unfold.sites import UnfoldAdminSite
 from apps.accounts.models import User
 from apps.bookings.models import Booking
 from apps.host.models import ChargingStation
 from apps.Stripe.models import Payment
+from apps.analytics.models import DailyChargerStats
+from apps.analytics.utils import report_range, summarize
+
+# Each dashboard section is cached on its own so a new payment does not throw
+# away the user counts. Sections are dropped by invalidate_dashboard() when
+# their models change and expire after ADMIN_DASHBOARD_CACHE_TTL regardless.
+DASHBOARD_CACHE_PREFIX = 'admin-dashboard:'
+DASHBOARD_CACHE_TTL = getattr(settings, 'ADMIN_DASHBOARD_CACHE_TTL', 60)
+DASHBOARD_SECTIONS = {
+    User: ('users',),
+    Booking: ('bookings', 'recent_bookings'),
+    ChargingStation: ('stations',),
+    Payment: ('payments', 'latest_payments'),
+}
+
+
+def _cached(section, compute):
+    return cache.get_or_set(DASHBOARD_CACHE_PREFIX + section, compute, DASHBOARD_CACHE_TTL)
+
+
+def invalidate_dashboard(sender, **kwargs):
+    """post_save/post_delete receiver, also connected to booking_transitioned and stations_synced."""
+    sections = DASHBOARD_SECTIONS.get(sender)
+    if sections:
+        cache.delete_many([DASHBOARD_CACHE_PREFIX + section for section in sections])
+
+
+def user_counts():
+    return dict(User.objects.order_by().values_list('role').annotate(models.Count('id')))
+
+
+def booking_counts():
+    return dict(Booking.objects.order_by().values_list('status').annotate(models.Count('id')))
+
+
+def station_count():
+    return ChargingStation.objects.filter(removed_at__isnull=True).count()
+
+
+def payment_totals():
+    return {
+        row['status']: {'count': row['count'], 'amount': row['amount'] or 0}
+        for row in Payment.objects.order_by().values('status').annotate(
+            count=models.Count('id'), amount=models.Sum('amount')
+        )
+    }
+
+
+def recent_bookings():
+    return [
+        [
+            b.user.full_name,
+            b.station.station_name,
+            b.status.title(),
+            b.created_at.strftime("%Y-%m-%d"),
+        ]
+        for b in Booking.objects.select_related('user', 'station')
+        .only('status', 'created_at', 'user__full_name', 'station__station_name')
+        .order_by("-created_at")[:5]
+    ]
+
+
+def latest_payments():
+    return [
+        [
+            p.user.full_name,
+            p.get_payment_type_display(),
+            f"${p.amount}",
+            p.status.title(),
+        ]
+        for p in Payment.objects.select_related('user')
+        .only('payment_type', 'amount', 'status', 'created_at', 'user__full_name')
+        .order_by("-created_at")[:5]
+    ]
+
+
+def revenue_chart():
+    # Read from the nightly rollups rather than scanning bookings
+    start, end = report_range({})
+    return summarize(DailyChargerStats.objects.all(), start, end)["daily"]
 
 
 class CustomAdminSite(UnfoldAdminSite):
@@ -13,13 +95,18 @@ class CustomAdminSite(UnfoldAdminSite):
     index_title = "Dashboard Overview"
 
     def get_dashboard_context(self, request):
-        total_users = User.objects.count()
-        total_hosts = User.objects.filter(role="host").count()
-        total_customers = User.objects.filter(role="user").count()
-        total_bookings = Booking.objects.count()
-        total_stations = ChargingStation.objects.count()
-        total_payments = Payment.objects.count()
-        total_revenue = Payment.objects.filter(status="succeeded").aggregate(total=models.Sum("amount"))["total"] or 0
+        roles = _cached('users', user_counts)
+        bookings = _cached('bookings', booking_counts)
+        payments = _cached('payments', payment_totals)
+        last_30_days = _cached('revenue_chart', revenue_chart)
+
+        total_users = sum(roles.values())
+        total_hosts = roles.get("host", 0)
+        total_customers = roles.get("user", 0)
+        total_bookings = sum(bookings.values())
+        total_stations = _cached('stations', station_count)
+        total_payments = sum(p["count"] for p in payments.values())
+        total_revenue = payments.get("succeeded", {}).get("amount", 0)
 
         return {
             "cards": [
@@ -50,41 +137,37 @@ class CustomAdminSite(UnfoldAdminSite):
                         "datasets": [{
                             "label": "Payments",
                             "data": [
-                                Payment.objects.filter(status="succeeded").count(),
-                                Payment.objects.filter(status="pending").count(),
-                                Payment.objects.filter(status="failed").count(),
+                                payments.get("succeeded", {}).get("count", 0),
+                                payments.get("pending", {}).get("count", 0),
+                                payments.get("failed", {}).get("count", 0),
                             ],
                             "backgroundColor": ["#22c55e", "#facc15", "#ef4444"],
                         }]
                     },
                 },
+                {
+                    "title": "Charging Revenue (last 30 days)",
+                    "type": "line",
+                    "data": {
+                        "labels": [day["date"] for day in last_30_days],
+                        "datasets": [{
+                            "label": "Revenue",
+                            "data": [float(day["revenue"]) for day in last_30_days],
+                            "borderColor": "#0ea5e9",
+                        }]
+                    },
+                },
             ],
             "tables": [
                 {
                     "title": "Recent Bookings",
                     "columns": ["User", "Station", "Status", "Created At"],
-                    "rows": [
-                        [
-                            b.user.full_name,
-                            b.station.station_name,
-                            b.status.title(),
-                            b.created_at.strftime("%Y-%m-%d"),
-                        ]
-                        for b in Booking.objects.order_by("-created_at")[:5]
-                    ],
+                    "rows": _cached('recent_bookings', recent_bookings),
                 },
                 {
                     "title": "Latest Payments",
                     "columns": ["User", "Type", "Amount", "Status"],
-                    "rows": [
-                        [
-                            p.user.full_name,
-                            p.get_payment_type_display(),
-                            f"${p.amount}",
-                            p.status.title(),
-                        ]
-                        for p in Payment.objects.order_by("-created_at")[:5]
-                    ],
+                    "rows": _cached('latest_payments', latest_payments),
                 },
             ],
         }
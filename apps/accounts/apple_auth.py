@@ -1,3 +1,6 @@
+import re
+import time
+import threading
 import jwt
 import requests
 from jwt.algorithms import RSAAlgorithm
@@ -5,18 +8,137 @@ from django.conf import settings
 
 APPLE_KEYS_URL = "https://appleid.apple.com/auth/keys"
 
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class AppleKeyCache:
+    """
+    Apple's signing keys (JWKS), parsed once and cached by kid.
+
+    - Keys live as long as the response's Cache-Control max-age says.
+    - Shortly before they expire a background thread refetches them, so
+      sign-ins keep using the cached keys instead of waiting on Apple.
+    - An unknown kid (Apple rotated keys) triggers one refetch; concurrent
+      callers share it and refetches are rate limited.
+    - If Apple is unreachable, the last keys are kept until it's back.
+    """
+
+    def __init__(self, url=APPLE_KEYS_URL, timeout=5, default_ttl=3600, min_ttl=60,
+                 refresh_margin=300, unknown_kid_interval=60):
+        self.url = url
+        self.timeout = timeout
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        self.refresh_margin = refresh_margin
+        self.unknown_kid_interval = unknown_kid_interval
+
+        self._keys = {}
+        self._expires_at = 0
+        self._fetched_at = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+        self._session = requests.Session()
+        self.fetches = 0
+
+    def _ttl(self, response):
+        match = _MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+        ttl = int(match.group(1)) if match else self.default_ttl
+        return max(ttl, self.min_ttl)
+
+    def _fetch(self):
+        response = self._session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        keys = {
+            jwk["kid"]: RSAAlgorithm.from_jwk(jwk)
+            for jwk in response.json().get("keys", [])
+            if jwk.get("kid")
+        }
+        now = time.time()
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = now
+            self._expires_at = now + self._ttl(response)
+            self._generation += 1
+            self.fetches += 1
+
+    def refresh(self, seen_generation=None):
+        """
+        Refetch the keys. Callers that saw `seen_generation` and raced each other
+        end up sharing a single request.
+        """
+        with self._fetch_lock:
+            if seen_generation is not None and self._generation != seen_generation:
+                return
+            self._fetch()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Apple JWKS: background refresh failed", e)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get_key(self, kid):
+        with self._lock:
+            key = self._keys.get(kid)
+            generation = self._generation
+            expires_at = self._expires_at
+            fetched_at = self._fetched_at
+
+        now = time.time()
+        if not generation:
+            # Cold start: nothing to serve yet
+            self.refresh(seen_generation=generation)
+        elif key is not None:
+            if now >= expires_at - self.refresh_margin:
+                self._refresh_in_background()
+            return key
+        elif now - fetched_at >= self.unknown_kid_interval:
+            self.refresh(seen_generation=generation)
+
+        with self._lock:
+            return self._keys.get(kid)
+
+
+_key_cache = None
+_key_cache_lock = threading.Lock()
+
+
+def get_apple_key_cache():
+    global _key_cache
+    if _key_cache is None:
+        with _key_cache_lock:
+            if _key_cache is None:
+                _key_cache = AppleKeyCache(getattr(settings, "APPLE_KEYS_URL", APPLE_KEYS_URL))
+    return _key_cache
+
+
+def reset_apple_key_cache():
+    global _key_cache
+    with _key_cache_lock:
+        _key_cache = None
+
 
 def verify_apple_token(identity_token: str):
-    """✅ Verify Apple ID token signature using Apple's public keys."""
-    apple_keys = requests.get(APPLE_KEYS_URL).json().get("keys", [])
+    """✅ Verify Apple ID token signature using Apple's cached public keys."""
     header = jwt.get_unverified_header(identity_token)
 
-    key = next((k for k in apple_keys if k["kid"] == header.get("kid")), None)
-    if not key:
+    public_key = get_apple_key_cache().get_key(header.get("kid"))
+    if public_key is None:
         raise ValueError("Invalid identity token header (kid not found).")
 
-    public_key = RSAAlgorithm.from_jwk(key)
-
     decoded = jwt.decode(
         identity_token,
         public_key,
@@ -24,4 +146,4 @@ def verify_apple_token(identity_token: str):
         audience=settings.APPLE_CLIENT_ID,
         issuer="https://appleid.apple.com",
     )
-    return decoded
\ No newline at end of file
+    return decoded
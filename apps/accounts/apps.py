@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from apps.accounts.admin_dashboard import DASHBOARD_SECTIONS, invalidate_dashboard
+        from apps.bookings.transitions import booking_transitioned
+        from apps.host.places_import import stations_synced
+        for model in DASHBOARD_SECTIONS:
+            post_save.connect(invalidate_dashboard, sender=model, dispatch_uid=f'admin-dashboard-save-{model._meta.label}')
+            post_delete.connect(invalidate_dashboard, sender=model, dispatch_uid=f'admin-dashboard-delete-{model._meta.label}')
+        # Status transitions and station syncs are set-based writes that bypass post_save
+        booking_transitioned.connect(invalidate_dashboard, dispatch_uid='admin-dashboard-transition')
+        stations_synced.connect(invalidate_dashboard, dispatch_uid='admin-dashboard-stations-sync')
@@ -0,0 +1,59 @@
+import time
+from unittest.mock import patch
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+from apps.accounts.models import User
+from apps.accounts.throttling import reset_login_failures
+from apps.accounts.views import login
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput, CPU time and password hash checks per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Number of logins to run')
+        parser.add_argument('--wrong-password', action='store_true', help='Benchmark rejected logins instead')
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        hasher = get_hasher()
+        verify = type(hasher).verify
+        hash_checks = []
+
+        def counting_verify(self, password, encoded):
+            hash_checks.append(1)
+            return verify(self, password, encoded)
+
+        password = 'benchmark-secret-1'
+        statuses = {}
+
+        # The benchmark user is rolled back afterwards
+        with transaction.atomic():
+            User.objects.create_user(
+                full_name='Login Benchmark', email='login-benchmark@example.com',
+                phone='+8801999999999', password=password
+            )
+            body = {
+                'email': 'login-benchmark@example.com',
+                'password': 'wrong-password' if options['wrong_password'] else password,
+            }
+
+            with patch.object(type(hasher), 'verify', counting_verify):
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                for i in range(options['requests']):
+                    request = factory.post('/api/v1/login/', body, format='json', REMOTE_ADDR=f'10.0.{i // 250}.{i % 250}')
+                    response = login(request)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+            transaction.set_rollback(True)
+        reset_login_failures('login-benchmark@example.com')
+
+        count = options['requests']
+        self.stdout.write(f"Hasher            {hasher.algorithm}")
+        self.stdout.write(f"Logins            {count} ({', '.join(f'{k}: {v}' for k, v in sorted(statuses.items()))})")
+        self.stdout.write(f"Throughput        {count / wall:.1f} logins/s")
+        self.stdout.write(f"CPU per login     {cpu / count * 1000:.1f} ms")
+        self.stdout.write(f"Hash checks/login {len(hash_checks) / count:.2f}")
@@ -1,9 +1,9 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
 from django.contrib.auth.hashers import make_password
 from apps.accounts.models import User, Profile
 from apps.host.models import ChargingStation
 from apps.host.serializers import ChargingStationSerializer
+from apps.features.chat.middlewares import invalidate_cached_user
 import datetime
 
 
@@ -64,15 +64,15 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         validated_data.pop('confirm_password')
         password = validated_data.pop('password')
 
-        # Create user
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
+        # Create user (hashed once, single INSERT)
+        user = User.objects.create_user(password=password, **validated_data)
 
         # Role-specific profile
         if user.role == 'user':
             Profile.objects.create(user=user)
         elif user.role == 'host':
+            # google_place_id is unique; a blank one is stored as NULL
+            station_data['google_place_id'] = station_data['google_place_id'] or None
             ChargingStation.objects.create(host=user, **station_data)
 
         return user
@@ -86,22 +86,16 @@ class LoginSerializer(serializers.Serializer):
         email = data.get('email', '').strip().lower()
         password = data.get('password', '')
 
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
+        user = User.objects.filter(email=email).first()
+        if user is None:
             raise serializers.ValidationError({"error": "User with this email doesn't exist."})
 
-
-        auth_user = authenticate(
-            request=self.context.get('request'),
-            username=email,   
-            password=password
-        )
-
-        if auth_user is None:
+        # The only hash check of the login. check_password also re-hashes the password
+        # when it was stored with an outdated hasher or iteration count.
+        if not user.check_password(password) or not user.is_active:
             raise serializers.ValidationError({"error": "Invalid email or password."})
 
-        data['user'] = auth_user
+        data['user'] = user
         return data
 
 
@@ -168,6 +162,7 @@ class ResetPasswordSerializer(serializers.Serializer):
         user.otp_expiry = None
         user.is_verified = False 
         user.save()
+        invalidate_cached_user(user.id)
         return user
 
 
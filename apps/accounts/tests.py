@@ -1,3 +1,227 @@
-from django.test import TestCase
+import json
+import time
+import threading
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from django.core.cache import cache
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+from apps.accounts.admin_dashboard import admin_site
+from apps.accounts.apple_auth import AppleKeyCache, reset_apple_key_cache, verify_apple_token
+from apps.Stripe.models import Payment
 
-# Create your tests here.
+
+class JWKSServer:
+    """Local stand-in for https://appleid.apple.com/auth/keys."""
+
+    def __init__(self, max_age=3600, delay=0):
+        self.keys = {}
+        self.max_age = max_age
+        self.delay = delay
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.delay)
+                body = json.dumps({"keys": [
+                    dict(RSAAlgorithm.to_jwk(key.public_key(), as_dict=True), kid=kid, alg="RS256", use="sig")
+                    for kid, key in server.keys.items()
+                ]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"max-age={server.max_age}, must-revalidate")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/auth/keys"
+
+    def add_key(self, kid):
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return self.keys[kid]
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def apple_token(private_key, kid, sub="001234.apple.sub", audience="com.voltly.app"):
+    now = int(time.time())
+    return jwt.encode(
+        {"iss": "https://appleid.apple.com", "aud": audience, "sub": sub, "iat": now, "exp": now + 600,
+         "email": "driver@privaterelay.appleid.com"},
+        private_key, algorithm="RS256", headers={"kid": kid},
+    )
+
+
+class AppleKeyCacheTests(TestCase):
+    def setUp(self):
+        self.server = JWKSServer(max_age=600)
+        self.key = self.server.add_key("key-1")
+        reset_apple_key_cache()
+
+    def tearDown(self):
+        self.server.stop()
+        reset_apple_key_cache()
+
+    def test_verification_reuses_cached_keys(self):
+        with override_settings(APPLE_KEYS_URL=self.server.url, APPLE_CLIENT_ID="com.voltly.app"):
+            for _ in range(3):
+                claims = verify_apple_token(apple_token(self.key, "key-1"))
+
+        self.assertEqual(claims["sub"], "001234.apple.sub")
+        self.assertEqual(self.server.requests, 1)
+
+    def test_ttl_follows_cache_control(self):
+        cache = AppleKeyCache(self.server.url)
+        cache.get_key("key-1")
+        self.assertAlmostEqual(cache._expires_at - time.time(), 600, delta=5)
+
+    def test_rotated_kid_is_refetched_once_and_unknown_kids_are_rate_limited(self):
+        cache = AppleKeyCache(self.server.url, unknown_kid_interval=0)
+        self.assertIsNotNone(cache.get_key("key-1"))
+
+        self.server.add_key("key-2")
+        self.assertIsNotNone(cache.get_key("key-2"))
+        self.assertEqual(self.server.requests, 2)
+
+        cache.unknown_kid_interval = 60
+        for _ in range(5):
+            self.assertIsNone(cache.get_key("forged"))
+        self.assertEqual(self.server.requests, 2)
+
+    def test_concurrent_unknown_kid_lookups_share_one_fetch(self):
+        cache = AppleKeyCache(self.server.url, unknown_kid_interval=0)
+        cache.get_key("key-1")
+        self.server.add_key("key-2")
+        self.server.delay = 0.2
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_key("key-2"))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(results))
+        self.assertEqual(self.server.requests, 2)
+
+    def test_expiring_keys_are_refreshed_in_background(self):
+        cache = AppleKeyCache(self.server.url, refresh_margin=3600)
+        cache.get_key("key-1")
+        self.server.delay = 0.2
+
+        start = time.perf_counter()
+        self.assertIsNotNone(cache.get_key("key-1"))
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+        deadline = time.time() + 2
+        while cache.fetches < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(cache.fetches, 2)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    LOGIN_FAILURES_PER_EMAIL=3,
+)
+class LoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.client = APIClient()
+
+    def login(self, password, email="driver@example.com"):
+        return self.client.post(reverse('login'), {"email": email, "password": password}, format='json')
+
+    def test_login_checks_password_once(self):
+        with patch.object(User, "check_password", autospec=True, side_effect=User.check_password) as check:
+            response = self.login("secret123")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.data)
+        self.assertEqual(check.call_count, 1)
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        with override_settings(PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.ScryptPasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]):
+            self.assertEqual(self.login("secret123").status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$"))
+
+    def test_repeated_failures_are_throttled_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login("wrong-password").status_code, 400)
+
+        with patch.object(User, "check_password") as check:
+            response = self.login("secret123")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        check.assert_not_called()
+
+        # Other accounts from the same client are still allowed
+        User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123"
+        )
+        self.assertEqual(self.login("secret123", email="host@example.com").status_code, 200)
+
+
+class AdminDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        self.driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.pay(self.driver, "succeeded", "25.00")
+        self.pay(self.driver, "failed", "10.00")
+
+    def pay(self, user, status, amount):
+        return Payment.objects.create(
+            user=user, payment_type="booking", status=status, amount=amount,
+            stripe_payment_intent_id=f"pi_{Payment.objects.count()}",
+        )
+
+    def card(self, context, title):
+        return next(card["value"] for card in context["cards"] if card["title"] == title)
+
+    def test_dashboard_is_served_from_cache(self):
+        context = admin_site.get_dashboard_context(None)
+        self.assertEqual(self.card(context, "Hosts"), 1)
+        self.assertEqual(self.card(context, "Customers"), 1)
+        self.assertEqual(self.card(context, "Revenue"), "$25.00")
+        self.assertEqual(context["tables"][1]["rows"][0][0], "Driver")
+
+        with self.assertNumQueries(0):
+            admin_site.get_dashboard_context(None)
+
+    def test_saving_a_payment_only_refreshes_payment_sections(self):
+        admin_site.get_dashboard_context(None)
+        self.pay(self.host, "succeeded", "5.00")
+
+        # Grouped payment totals and the latest payments table
+        with self.assertNumQueries(2):
+            context = admin_site.get_dashboard_context(None)
+        self.assertEqual(self.card(context, "Revenue"), "$30.00")
+        self.assertEqual(context["tables"][1]["rows"][0][0], "Host")
@@ -0,0 +1,88 @@
+"""
+Brute-force protection for the auth endpoints.
+
+Failed logins are counted per client IP and per email in fixed windows stored in
+the Django cache; once either count reaches its limit the endpoint answers 429
+before any password hash is computed. Signups are counted per IP.
+"""
+import math
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+
+
+def _limits():
+    return {
+        'ip': getattr(settings, 'LOGIN_FAILURES_PER_IP', 20),
+        'email': getattr(settings, 'LOGIN_FAILURES_PER_EMAIL', 5),
+        'signup': getattr(settings, 'SIGNUPS_PER_IP', 10),
+    }
+
+
+def _window():
+    return getattr(settings, 'AUTH_THROTTLE_WINDOW', 15 * 60)
+
+
+def get_client_ip(request):
+    # Honors REST_FRAMEWORK['NUM_PROXIES'] like DRF's own throttles
+    return BaseThrottle().get_ident(request)
+
+
+def _window_key(scope, value):
+    window = _window()
+    index = int(time.time() // window)
+    retry_after = (index + 1) * window - time.time()
+    return f"auth_throttle:{scope}:{value}:{index}", retry_after
+
+
+def _blocked(checks):
+    """Seconds until the first exhausted counter resets, or 0 if none is."""
+    limits = _limits()
+    keys = {scope: _window_key(scope, value) for scope, value in checks}
+    counts = cache.get_many([key for key, _ in keys.values()])
+    for scope, (key, retry_after) in keys.items():
+        if counts.get(key, 0) >= limits[scope]:
+            return retry_after
+    return 0
+
+
+def _hit(scope, value):
+    key, _ = _window_key(scope, value)
+    if not cache.add(key, 1, _window()):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, _window())
+
+
+def login_blocked(request, email):
+    return _blocked([('ip', get_client_ip(request)), ('email', email)])
+
+
+def record_login_failure(request, email):
+    _hit('ip', get_client_ip(request))
+    _hit('email', email)
+
+
+def reset_login_failures(email):
+    cache.delete(_window_key('email', email)[0])
+
+
+def signup_blocked(request):
+    return _blocked([('signup', get_client_ip(request))])
+
+
+def record_signup(request):
+    _hit('signup', get_client_ip(request))
+
+
+def throttled_response(retry_after):
+    retry_after = max(1, math.ceil(retry_after))
+    return Response(
+        {"error": "Too many attempts. Please try again later.", "retry_after": retry_after},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(retry_after)},
+    )
@@ -1,10 +1,9 @@
-import os
 import random
 from datetime import timedelta
 from django.conf import settings
 from django.utils import timezone
 from apps.accounts.models import User
-from django.core.mail import send_mail
+from apps.common.utils import queue_email
 from django.template.loader import render_to_string
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -12,7 +11,11 @@ from rest_framework_simplejwt.tokens import RefreshToken
 def generate_otp():
     return random.randint(1000, 9999)
 
-def send_email(email):
+def send_email(email, expiry_minutes=3):
+    """
+    Generate an OTP for the user, store it and queue the email.
+    Delivery happens in the email outbox worker, so this never waits on SMTP.
+    """
     otp_code = generate_otp()
     subject = "Your OTP Verification Code from Voltly"
     
@@ -22,19 +25,11 @@ def send_email(email):
     
     from_email = settings.EMAIL_HOST_USER
 
-    print(from_email, email, otp_code)
-    send_mail(
-        subject,
-        "",
-        from_email,
-        [email],
-        html_message=html_message,
-        fail_silently=False,
+    User.objects.filter(email=email).update(
+        otp=otp_code,
+        otp_expiry=timezone.now() + timedelta(minutes=expiry_minutes)
     )
-    user = User.objects.get(email=email)
-    user.otp = otp_code
-    user.otp_expiry = timezone.now() + timedelta(minutes=3)
-    user.save()
+    queue_email(subject, [email], html_message=html_message, from_email=from_email)
 
     return otp_code
 
@@ -1,20 +1,21 @@
-from datetime import timedelta
 from rest_framework import status
-from django.utils import timezone
 from django.utils.timezone import now
 from apps.accounts.models import User
 from apps.accounts.utils import send_email
 from rest_framework.response import Response
-from django.contrib.auth import authenticate
 from rest_framework.decorators import api_view
 from drf_yasg.utils import swagger_auto_schema
 import uuid
 from .apple_auth import *
 from django.core.exceptions import ValidationError
 from apps.accounts.utils import get_tokens_for_user
+from apps.accounts.throttling import (login_blocked, record_login_failure, reset_login_failures,
+    signup_blocked, record_signup, throttled_response
+)
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from apps.features.chat.middlewares import invalidate_cached_user
 from rest_framework.decorators import permission_classes, authentication_classes, api_view
 from apps.accounts.serializers import (UserRegistrationSerializer, UserSerializer, 
     LoginSerializer, ForgetPasswordSerializer, 
@@ -28,12 +29,17 @@ from apps.accounts.serializers import (UserRegistrationSerializer, UserSerialize
 @swagger_auto_schema(method='post', request_body=UserRegistrationSerializer, tags=['Auth'])
 @api_view(['POST'])
 def signup(request):
+    retry_after = signup_blocked(request)
+    if retry_after:
+        return throttled_response(retry_after)
+
     serializer = UserRegistrationSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         email = serializer.validated_data['email'].strip().lower()
         if User.objects.filter(email=email).exists():
             return Response({"error": "Email is already registered."}, status=status.HTTP_400_BAD_REQUEST)
         user = serializer.save(email=email)
+        record_signup(request)
     
         refresh = RefreshToken.for_user(user)
         access = refresh.access_token
@@ -50,21 +56,20 @@ def signup(request):
 @swagger_auto_schema(method='post', request_body=LoginSerializer, tags=['Auth'])
 @api_view(['POST'])
 def login(request):
-    email = request.data.get('email', '').strip().lower()
+    email = str(request.data.get('email', '')).strip().lower()
+    retry_after = login_blocked(request, email)
+    if retry_after:
+        return throttled_response(retry_after)
+
     serializer = LoginSerializer(data=request.data, context={'request': request})
     
     if not serializer.is_valid():
+        record_login_failure(request, email)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    email = serializer.validated_data['email'].lower()
-    password = serializer.validated_data['password']
-
-
-    user = authenticate(request, email=email, password=password)
-
-    if user is None:
-        return Response({"message": "Invalid email or password"},
-                        status=status.HTTP_401_UNAUTHORIZED)
+    # The serializer already verified the password once
+    user = serializer.validated_data['user']
+    reset_login_failures(email)
 
 
     token = get_tokens_for_user(user)
@@ -90,14 +95,10 @@ def forget_password(request):
         return Response({"message": "Email not found"}, status=status.HTTP_404_NOT_FOUND)
 
     try:
-        otp = send_email(email)
+        send_email(user.email, expiry_minutes=5)
     except Exception as e:
         return Response({"message": "Failed to send OTP", "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    user.otp = otp
-    user.otp_expiry = timezone.now() + timedelta(minutes=5)
-    user.save()
-
     return Response({"message": "OTP sent to your email"}, status=status.HTTP_200_OK)
 
 
@@ -118,10 +119,7 @@ def verify_otp(request):
 
     
         if user.otp_expiry and now() > user.otp_expiry:
-            otp = send_email(user.email)
-            user.otp = otp
-            user.otp_expiry = timezone.now() + timedelta(minutes=3)
-            user.save()
+            send_email(user.email)
             raise ValidationError({"error": "Looks like that code's a bit too old — it expired after 10 minutes. I just sent you a fresh one, so check your email(and maybe spam)."})
 
         if user.otp != otp:
@@ -189,6 +187,7 @@ def change_password(request):
 
     user.set_password(new_password)
     user.save()
+    invalidate_cached_user(user.id)
     return Response({"message": "Password changed successfully."}, status=status.HTTP_200_OK)
 
 
@@ -223,6 +222,7 @@ def logout(request):
         refresh_token = request.data['refresh']
         token = RefreshToken(refresh_token)
         token.blacklist()
+        invalidate_cached_user(request.user.id)
         return Response({'message': 'Logout successful'}, status=status.HTTP_205_RESET_CONTENT)
     except Exception as e:
         return Response({"error": "Invalid or expired refresh token"}, status=status.HTTP_400_BAD_REQUEST)
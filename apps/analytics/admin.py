@@ -1,3 +1,20 @@
 from django.contrib import admin
+from unfold.admin import ModelAdmin
+from apps.analytics.models import DailyChargerStats
 
-# Register your models here.
+
+@admin.register(DailyChargerStats)
+class DailyChargerStatsAdmin(ModelAdmin):
+    list_display = (
+        'date', 'station', 'charger', 'bookings', 'sessions', 'cancelled', 'energy_kwh', 'utilization', 'revenue', 'platform_fee'
+    )
+    list_filter = ('date', 'station')
+    list_select_related = ('station', 'charger')
+    date_hierarchy = 'date'
+
+    # Rebuilt by the build_daily_rollups task
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
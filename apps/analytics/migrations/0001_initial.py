@@ -0,0 +1,113 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("host", "0005_remove_charger_scanner_image"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("value", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyChargerStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("bookings", models.PositiveIntegerField(default=0)),
+                (
+                    "sessions",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Completed charging sessions"
+                    ),
+                ),
+                ("cancelled", models.PositiveIntegerField(default=0)),
+                (
+                    "energy_kwh",
+                    models.DecimalField(decimal_places=3, default=0, max_digits=12),
+                ),
+                ("minutes_occupied", models.PositiveIntegerField(default=0)),
+                (
+                    "minutes_available",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Station opening hours that day"
+                    ),
+                ),
+                (
+                    "utilization",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="% of opening hours occupied",
+                        max_digits=5,
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "platform_fee",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "charger",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="host.charger",
+                    ),
+                ),
+                (
+                    "station",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="host.chargingstation",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Daily Charger Stats",
+                "ordering": ["-date"],
+                "indexes": [
+                    models.Index(
+                        fields=["station", "date"],
+                        name="analytics_d_station_a0a9a5_idx",
+                    ),
+                    models.Index(fields=["date"], name="analytics_d_date_aa1733_idx"),
+                ],
+                "unique_together": {("charger", "date")},
+            },
+        ),
+    ]
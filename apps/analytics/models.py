@@ -1,3 +1,47 @@
 from django.db import models
+from apps.host.models import Charger, ChargingStation
 
 
+class DailyChargerStats(models.Model):
+    """
+    One row per charger per day, rebuilt by analytics.utils.build_daily_rollups
+    for every day whose bookings changed since the last run. Reporting reads
+    these rows instead of scanning Booking.
+    """
+    date = models.DateField()
+    station = models.ForeignKey(ChargingStation, on_delete=models.CASCADE, related_name='daily_stats')
+    charger = models.ForeignKey(Charger, on_delete=models.CASCADE, related_name='daily_stats')
+
+    bookings = models.PositiveIntegerField(default=0)
+    sessions = models.PositiveIntegerField(default=0, help_text="Completed charging sessions")
+    cancelled = models.PositiveIntegerField(default=0)
+    energy_kwh = models.DecimalField(max_digits=12, decimal_places=3, default=0)
+    minutes_occupied = models.PositiveIntegerField(default=0)
+    minutes_available = models.PositiveIntegerField(default=0, help_text="Station opening hours that day")
+    utilization = models.DecimalField(max_digits=5, decimal_places=2, default=0, help_text="% of opening hours occupied")
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    platform_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Daily Charger Stats"
+        ordering = ['-date']
+        unique_together = ('charger', 'date')
+        indexes = [
+            models.Index(fields=['station', 'date']),
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.charger_id} on {self.date}"
+
+
+class RollupWatermark(models.Model):
+    """Booking.updated_at up to which a rollup has been built."""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,8 @@
+from celery import shared_task
+from apps.analytics.utils import build_daily_rollups as build
+
+
+@shared_task(ignore_result=True)
+def build_daily_rollups():
+    days = build()
+    return f"Analytics rollups: rebuilt {days} days"
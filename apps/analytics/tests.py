@@ -1,3 +1,107 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
 from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+from apps.analytics.models import DailyChargerStats
+from apps.analytics.utils import build_daily_rollups
+from apps.bookings.models import Booking
+from apps.bookings.transitions import transition
+from apps.driver.models import Vehicle
+from apps.host.models import Charger, ChargerType, ChargingStation
 
-# Create your tests here.
+DAY = date(2026, 3, 1)
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        # Open 09:00-22:00, i.e. 780 minutes a day
+        self.station = ChargingStation.objects.create(
+            host=self.host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        charger_type = ChargerType.objects.create(name="AC")
+        self.bay1 = Charger.objects.create(name="Bay 1", station=self.station, charger_type=charger_type, price=20)
+        self.bay2 = Charger.objects.create(name="Bay 2", station=self.station, charger_type=charger_type, price=20)
+        self.vehicle = Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion")
+
+        check_in = datetime(2026, 3, 1, 10, 0, tzinfo=dt_timezone.utc)
+        self.book(self.bay1, DAY, time(10, 0), time(11, 0), "completed", check_in_time=check_in,
+                  check_out_time=check_in + timedelta(hours=1), subtotal=Decimal("20.00"), total_amount=Decimal("23.00"))
+        self.book(self.bay1, DAY, time(12, 0), time(13, 0), "cancelled")
+        self.book(self.bay2, DAY, time(14, 0), time(16, 0), "confirmed")
+        self.next_day = self.book(self.bay1, DAY + timedelta(days=1), time(9, 0), time(10, 0), "pending")
+        # As if written yesterday, well before the first rollup
+        Booking.objects.update(updated_at=timezone.now() - timedelta(days=1))
+
+    def book(self, charger, day, start, end, status, **fields):
+        return Booking.objects.create(
+            user=self.driver, station=self.station, charger=charger, vehicle=self.vehicle,
+            booking_date=day, start_time=start, end_time=end, status=status, **fields,
+        )
+
+    def test_rollup_aggregates_each_charger_day(self):
+        self.assertEqual(build_daily_rollups(), 2)
+
+        self.assertEqual(DailyChargerStats.objects.count(), 4)
+        bay1 = DailyChargerStats.objects.get(charger=self.bay1, date=DAY)
+        self.assertEqual(
+            (bay1.bookings, bay1.sessions, bay1.cancelled, bay1.minutes_occupied, bay1.minutes_available), (2, 1, 1, 60, 780)
+        )
+        self.assertEqual((bay1.revenue, bay1.platform_fee), (Decimal("23.00"), Decimal("3.00")))
+        self.assertEqual(bay1.energy_kwh, Decimal("7.500"))
+        self.assertEqual(bay1.utilization, Decimal("7.69"))
+
+        bay2 = DailyChargerStats.objects.get(charger=self.bay2, date=DAY)
+        self.assertEqual((bay2.bookings, bay2.sessions, bay2.minutes_occupied, bay2.revenue), (1, 0, 120, 0))
+
+    def test_rollup_rebuilds_only_days_touched_since_watermark(self):
+        build_daily_rollups()
+        self.assertEqual(build_daily_rollups(), 0)
+
+        transition(self.next_day, "cancel", self.driver)
+        self.assertEqual(build_daily_rollups(), 1)
+        row = DailyChargerStats.objects.get(charger=self.bay1, date=self.next_day.booking_date)
+        self.assertEqual((row.bookings, row.cancelled, row.minutes_occupied), (1, 1, 0))
+
+    def test_host_report_reads_rollups(self):
+        build_daily_rollups()
+        client = APIClient()
+        client.force_authenticate(self.host)
+
+        response = client.get(reverse("host-daily-stats"), {"start": "2026-02-28", "end": "2026-03-02"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([day["date"] for day in response.data["daily"]], ["2026-02-28", "2026-03-01", "2026-03-02"])
+        self.assertEqual(response.data["daily"][0]["bookings"], 0)
+        self.assertEqual(response.data["totals"]["revenue"], "23.00")
+        self.assertEqual(response.data["totals"]["bookings"], 4)
+        # 60 + 120 + 60 minutes over two chargers x two rolled-up days x 780 minutes
+        self.assertEqual(response.data["totals"]["utilization"], "7.69")
+        self.assertEqual(response.data["breakdown"][0]["charger__name"], "Bay 1")
+
+        self.assertEqual(client.get(reverse("host-daily-stats"), {"start": "2026-03-02", "end": "2026-03-01"}).status_code, 400)
+        client.force_authenticate(self.driver)
+        self.assertEqual(client.get(reverse("host-daily-stats")).status_code, 403)
+        self.assertEqual(client.get(reverse("platform-daily-stats")).status_code, 403)
+
+    def test_platform_report_breaks_down_by_station(self):
+        build_daily_rollups()
+        admin = User.objects.create_user(
+            full_name="Admin", email="admin@example.com", phone="+8801700000003", password="secret123", is_staff=True
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        response = client.get(reverse("platform-daily-stats"), {"start": "2026-03-01", "end": "2026-03-01"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["breakdown"][0]["station__station_name"], "Depot")
+        self.assertEqual(response.data["totals"]["sessions"], 1)
@@ -0,0 +1,7 @@
+from django.urls import path
+from apps.analytics.views import host_daily_stats, platform_daily_stats
+
+urlpatterns = [
+    path('host/daily/', host_daily_stats, name='host-daily-stats'),
+    path('platform/daily/', platform_daily_stats, name='platform-daily-stats'),
+]
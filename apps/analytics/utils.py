@@ -0,0 +1,176 @@
+"""
+Daily per-charger rollups of bookings, sessions, energy, occupancy and revenue.
+
+build_daily_rollups() looks up the booking dates touched since the stored
+watermark (Booking.updated_at, which every status transition bumps) and
+rebuilds just those days. The watermark is read back ROLLUP_WATERMARK_OVERLAP
+earlier than it was stored so transactions that committed late are not
+missed; rebuilding a day is idempotent.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from apps.analytics.models import DailyChargerStats, RollupWatermark
+from apps.bookings.models import Booking
+from apps.bookings.telemetry import usage_kwh
+from apps.host.models import Charger
+
+WATERMARK_NAME = 'daily_charger_stats'
+DAYS_PER_BATCH = getattr(settings, 'ROLLUP_DAYS_PER_BATCH', 31)
+ROLLUP_WATERMARK_OVERLAP = timedelta(minutes=getattr(settings, 'ROLLUP_WATERMARK_OVERLAP_MINUTES', 15))
+MAX_REPORT_DAYS = getattr(settings, 'ANALYTICS_MAX_REPORT_DAYS', 366)
+
+STAT_FIELDS = ('bookings', 'sessions', 'cancelled', 'energy_kwh', 'minutes_occupied', 'revenue', 'platform_fee')
+
+
+def _minutes(start, end):
+    return max(0, int((end - start).total_seconds() // 60))
+
+
+def open_minutes(station):
+    """Minutes a station is open per day; a closing time at or before opening means 24h."""
+    opening = datetime.combine(date.min, station.opening_time)
+    closing = datetime.combine(date.min, station.closing_time)
+    if closing <= opening:
+        closing += timedelta(days=1)
+    return _minutes(opening, closing)
+
+
+def occupied_minutes(booking):
+    """Charging time of finished sessions, the reserved slot for live bookings."""
+    if booking.status == 'cancelled':
+        return 0
+    if booking.status == 'completed' and booking.check_in_time and booking.check_out_time:
+        return _minutes(booking.check_in_time, booking.check_out_time)
+    return _minutes(
+        datetime.combine(booking.booking_date, booking.start_time),
+        datetime.combine(booking.booking_date, booking.end_time),
+    )
+
+
+def touched_days(since=None):
+    bookings = Booking.objects.order_by()
+    if since is not None:
+        bookings = bookings.filter(updated_at__gt=since - ROLLUP_WATERMARK_OVERLAP)
+    return sorted(bookings.values_list('booking_date', flat=True).distinct())
+
+
+def rollup_days(days):
+    """Rebuild the DailyChargerStats rows of `days`, one row per charger per day."""
+    chargers = list(Charger.objects.select_related('station').order_by())
+    rows = {}
+    for day in days:
+        for charger in chargers:
+            available = open_minutes(charger.station)
+            rows[charger.id, day] = DailyChargerStats(
+                date=day, station_id=charger.station_id, charger_id=charger.id, minutes_available=available,
+            )
+
+    bookings = (
+        Booking.objects.filter(booking_date__in=days)
+        .select_related('charger', 'telemetry')
+        .defer('telemetry__rollup')
+        .order_by()
+    )
+    for booking in bookings.iterator(chunk_size=2000):
+        row = rows.get((booking.charger_id, booking.booking_date))
+        if row is None:
+            continue
+        row.bookings += 1
+        row.minutes_occupied += occupied_minutes(booking)
+        if booking.status == 'cancelled':
+            row.cancelled += 1
+        elif booking.status == 'completed':
+            row.sessions += 1
+            row.energy_kwh += usage_kwh(booking)
+            row.revenue += booking.total_amount
+            row.platform_fee += booking.total_amount - booking.subtotal
+
+    for row in rows.values():
+        row.energy_kwh = Decimal(row.energy_kwh).quantize(Decimal('0.001'))
+        if row.minutes_available:
+            row.utilization = min(
+                Decimal('100'), Decimal(row.minutes_occupied * 100) / row.minutes_available
+            ).quantize(Decimal('0.01'))
+
+    with transaction.atomic():
+        DailyChargerStats.objects.filter(date__in=days).delete()
+        DailyChargerStats.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def build_daily_rollups(full=False):
+    """Rebuild every day touched since the last run (or all days if `full`)."""
+    started = timezone.now()
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK_NAME)
+    days = touched_days(None if full else watermark.value)
+    for i in range(0, len(days), DAYS_PER_BATCH):
+        rollup_days(days[i:i + DAYS_PER_BATCH])
+    watermark.value = started
+    watermark.save(update_fields=['value', 'updated_at'])
+    return len(days)
+
+
+def _sums():
+    # Aliased because an annotation may not shadow a model field
+    return {f'{field}_sum': Sum(field) for field in STAT_FIELDS + ('minutes_available',)}
+
+
+def _format(values):
+    available = values.get('minutes_available_sum') or 0
+    occupied = values.get('minutes_occupied_sum') or 0
+    result = {field: values.get(f'{field}_sum') or 0 for field in STAT_FIELDS}
+    for field, places in (('energy_kwh', '0.001'), ('revenue', '0.01'), ('platform_fee', '0.01')):
+        result[field] = str(Decimal(result[field]).quantize(Decimal(places)))
+    result['utilization'] = str(
+        (Decimal(occupied * 100) / available).quantize(Decimal('0.01')) if available else Decimal('0.00')
+    )
+    return result
+
+
+def summarize(stats, start, end, group_by=()):
+    """
+    Totals, a gap-free daily series and (if `group_by` fields are given) a
+    breakdown for the DailyChargerStats rows in `stats` between start and end.
+    """
+    stats = stats.filter(date__range=(start, end)).order_by()
+    daily = {row['date']: _format(row) for row in stats.values('date').annotate(**_sums())}
+    empty = _format({})
+
+    series = []
+    day = start
+    while day <= end:
+        series.append({'date': str(day), **daily.get(day, empty)})
+        day += timedelta(days=1)
+
+    breakdown = []
+    if group_by:
+        for row in stats.values(*group_by).annotate(**_sums()).order_by('-revenue_sum'):
+            breakdown.append({**{field: row[field] for field in group_by}, **_format(row)})
+
+    return {
+        'start': str(start),
+        'end': str(end),
+        'totals': _format(stats.aggregate(**_sums())),
+        'daily': series,
+        'breakdown': breakdown,
+    }
+
+
+def report_range(params):
+    """(start, end) from ?start=&end= (YYYY-MM-DD), defaulting to the last 30 days."""
+    end = params.get('end')
+    start = params.get('start')
+    try:
+        end = date.fromisoformat(end) if end else timezone.localdate()
+        start = date.fromisoformat(start) if start else end - timedelta(days=29)
+    except ValueError:
+        raise ValueError("start and end must be dates in YYYY-MM-DD format.")
+    if start > end:
+        raise ValueError("start must not be after end.")
+    if (end - start).days >= MAX_REPORT_DAYS:
+        raise ValueError(f"A report can cover at most {MAX_REPORT_DAYS} days.")
+    return start, end
@@ -1,3 +1,40 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from apps.analytics.models import DailyChargerStats
+from apps.analytics.utils import report_range, summarize
 
-# Create your views here.
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def host_daily_stats(request):
+    """
+    Daily bookings, sessions, energy, utilization and revenue of the host's
+    chargers. Query params: start, end (YYYY-MM-DD; default last 30 days).
+    """
+    if request.user.role != 'host':
+        return Response({'error': 'Only hosts can access station analytics.'}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        start, end = report_range(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    stats = DailyChargerStats.objects.filter(station__host=request.user)
+    return Response(summarize(stats, start, end, ('charger_id', 'charger__name')), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAdminUser])
+def platform_daily_stats(request):
+    """Platform-wide daily stats with a per-station breakdown. Same query params as host_daily_stats."""
+    try:
+        start, end = report_range(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    stats = DailyChargerStats.objects.all()
+    return Response(summarize(stats, start, end, ('station_id', 'station__station_name')), status=status.HTTP_200_OK)
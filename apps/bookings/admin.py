@@ -25,6 +25,15 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
 from apps.bookings.models import Booking, Review
+from apps.common.paginator import EstimatedCountPaginator
+from apps.host.models import Charger
+
+
+class ChargerListFilter(admin.RelatedFieldListFilter):
+    # Charger.__str__ includes its station name; fetch them in the same query
+    def field_choices(self, field, request, model_admin):
+        chargers = Charger.objects.select_related('station').order_by('station__station_name', 'name')
+        return [(charger.pk, str(charger)) for charger in chargers]
 
 
 # Booking Admin Customization
@@ -32,9 +41,13 @@ class BookingAdmin(ModelAdmin):
     list_display = (
         'id', 'user', 'station', 'station__host', 'charger', 'status', 'is_paid', 'start_time', 'end_time', 'created_at'
     )
-    list_filter = ('status', 'created_at', 'station', 'charger')
+    list_filter = ('status', 'created_at', 'station', ('charger', ChargerListFilter))
     readonly_fields = ('created_at', 'updated_at')  
     search_fields = ('user__email', 'user__full_name', 'station__station_name', 'charger__name')
+    # Charger.__str__ includes its station name
+    list_select_related = ('user', 'station__host', 'charger__station')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     # Unfold UI Customizations
     unfold_config = {
@@ -80,6 +93,7 @@ admin.site.register(Booking, BookingAdmin)
 @admin.register(Review)
 class ReviewAdmin(ModelAdmin):
     list_display = ['id', 'charging_station', 'reviewer', 'rating', 'comment']
+    list_select_related = ['charging_station', 'reviewer']
     
     # Unfold UI Customizations for ReviewAdmin
     unfold_config = {
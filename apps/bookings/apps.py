@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class BookingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.bookings'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from apps.bookings.models import Booking
+        from apps.bookings.telemetry import finalize_completed_sessions
+        from apps.bookings.transitions import booking_transitioned
+        from apps.common.db_router import pin_booking_user, pin_transition_actor
+        booking_transitioned.connect(finalize_completed_sessions, dispatch_uid='finalize_completed_sessions')
+        # Users who just changed a booking read it back from the primary
+        post_save.connect(pin_booking_user, sender=Booking, dispatch_uid='pin_booking_user')
+        booking_transitioned.connect(pin_transition_actor, dispatch_uid='pin_transition_actor')
@@ -0,0 +1,85 @@
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.db import database_sync_to_async
+from django.db.models import Q
+from apps.bookings.models import Booking
+from apps.bookings.telemetry import TelemetryError, charging_group, ingest_samples, session_progress
+
+
+class ChargingSessionConsumer(AsyncWebsocketConsumer):
+    """
+    Live meter stream of one charging session.
+    The driver and the station host receive a `progress` event for every
+    stored batch. Only the host may push {"samples": [...]} batches here:
+    kWh chargers bill them, so a driver's readings are never accepted.
+    """
+
+    async def connect(self):
+        user = self.scope["user"]
+        if not user.is_authenticated:
+            await self.close()
+            return
+
+        self.booking_id = int(self.scope["url_route"]["kwargs"]["booking_id"])
+        booking = await self.get_booking(user, self.booking_id)
+        if booking is None:
+            await self.close()
+            return
+
+        self.group_name = charging_group(self.booking_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send_json({"type": "progress", "progress": await self.progress(booking)})
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive(self, text_data: str):
+        try:
+            data = json.loads(text_data or "")
+        except json.JSONDecodeError:
+            await self.send_json({"type": "error", "error": "Invalid JSON format."})
+            return
+
+        booking = await self.get_booking(self.scope["user"], self.booking_id, status="in_progress")
+        if booking is None:
+            await self.send_json({"type": "error", "error": "Booking is not in progress."})
+            return
+        if booking.station.host_id != self.scope["user"].pk:
+            await self.send_json({"type": "error", "error": "Only the charger can report meter samples."})
+            return
+
+        try:
+            progress = await database_sync_to_async(ingest_samples)(booking, data.get("samples"))
+        except TelemetryError as e:
+            await self.send_json({"type": "error", "error": str(e)})
+            return
+
+        await self.channel_layer.group_send(
+            self.group_name, {"type": "charging.progress", "progress": progress}
+        )
+
+    async def charging_progress(self, event):
+        await self.send_json({"type": "progress", "progress": event["progress"]})
+
+    # ------------------------------------------------------------------
+    # Database Utility Functions
+    # ------------------------------------------------------------------
+    @staticmethod
+    @database_sync_to_async
+    def get_booking(user, booking_id, status=None):
+        bookings = Booking.objects.select_related("charger", "station").filter(
+            Q(user=user) | Q(station__host=user), id=booking_id
+        )
+        if status:
+            bookings = bookings.filter(status=status)
+        return bookings.first()
+
+    @staticmethod
+    @database_sync_to_async
+    def progress(booking):
+        return session_progress(booking)
+
+    async def send_json(self, data):
+        await self.send(text_data=json.dumps(data, default=str))
@@ -1,5 +1,4 @@
 import stripe
-from decimal import Decimal
 from datetime import datetime
 from django.conf import settings
 from django.db.models import Avg
@@ -12,6 +11,8 @@ from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.exceptions import NotFound
 from apps.bookings.models import Booking, Review
+from apps.common.db_router import replica_reads
+from apps.bookings.telemetry import session_curve, usage_kwh
 from apps.Stripe.utils import setup_stripe_payment
 from apps.driver.models import Vehicle, UserVehicle
 from django.views.decorators.csrf import csrf_exempt
@@ -25,6 +26,7 @@ from rest_framework.decorators import api_view, authentication_classes, permissi
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def booking_list(request):
     """Get the list of bookings for the authenticated user."""
     user = request.user  
@@ -50,10 +52,12 @@ def payment_cancel(request):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def get_charging_history(request):
     try:
         bookings = (
-            Booking.objects.select_related('station', 'charger', 'vehicle', 'plug')
+            Booking.objects.select_related('station', 'charger', 'vehicle', 'plug', 'telemetry')
+            .defer('telemetry__rollup')
             .filter(user=request.user, status='completed')
             .order_by('-booking_date')
         )
@@ -63,13 +67,7 @@ def get_charging_history(request):
         
         history_data = []
         for booking in bookings:
-            duration_hours = 0
-            usage_kwh = 0
-            
-            if booking.check_in_time and booking.check_out_time:
-                duration_seconds = (booking.check_out_time - booking.check_in_time).total_seconds()
-                duration_hours = duration_seconds / 3600
-                usage_kwh = booking.charger.power_rating * Decimal(str(duration_hours))
+            usage = usage_kwh(booking)
             
             vehicle_name = booking.vehicle.name if booking.vehicle else "N/A"
             plug_type_name = booking.plug.name if booking.plug else "N/A" 
@@ -80,7 +78,7 @@ def get_charging_history(request):
                 "plug_type": plug_type_name,
                 "station_name": booking.station.station_name,
                 "booking_date": booking.booking_date.strftime("%Y-%m-%d"),
-                "usage_kwh": f"{round(usage_kwh, 2)} kWh",
+                "usage_kwh": f"{round(usage, 2)} kWh",
                 "price": f"{booking.total_amount} $"
             })
         
@@ -96,7 +94,7 @@ def get_charging_history(request):
 def charging_history_detail(request, booking_id):
     try:
         booking = Booking.objects.select_related(
-            'vehicle', 'station__host', 'charger'
+            'vehicle', 'station__host', 'charger', 'telemetry'
         ).get(id=booking_id, user=request.user, status='completed')
         
         # vehicle = booking.vehicle
@@ -110,10 +108,7 @@ def charging_history_detail(request, booking_id):
         charging_station = booking.station
         charger = booking.charger
             
-        duration_seconds = (booking.check_out_time - booking.check_in_time).total_seconds()
-        duration_hours = duration_seconds / 3600  
-        
-        usage_kwh = booking.charger.power_rating * Decimal(str(duration_hours))
+        usage = usage_kwh(booking)
         
         #charger details
         charging_fee = booking.subtotal
@@ -140,13 +135,16 @@ def charging_history_detail(request, booking_id):
             "charge_details": {
                 "charging_fee": f"{charging_fee} USD",
                 "charging_rate": f"{charger.power_rating} kW/h",
+                "energy_delivered": f"{round(usage, 2)} kWh",
                 "platform_fee": f"{platform_fee} USD",
                 "total_fee": f"{total_fee} USD"
             },
             "timing": {
                 "start_charging": booking.check_in_time.strftime("%Y-%m-%d %H:%M") if booking.check_in_time else "N/A",
                 "finish_charging": booking.check_out_time.strftime("%Y-%m-%d %H:%M") if booking.check_out_time else "N/A"
-            }
+            },
+            # Downsampled meter curve (seconds since start, kWh, kW, SoC); null without telemetry
+            "charging_curve": session_curve(booking),
         }
 
         return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,136 @@
+import csv
+import time
+import random
+import threading
+from django.db import connection
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.bookings.models import Booking
+from apps.bookings.views import ingest_telemetry
+
+
+def synthetic_samples(power_kw, capacity_kwh, count, interval, start):
+    """
+    A constant-current / constant-voltage curve: full power up to 80% state
+    of charge, then tapering to a tenth of it at 100%.
+    """
+    soc = random.uniform(15, 40)
+    register = random.uniform(1000, 5000)
+    samples = []
+    for i in range(count):
+        taper = 1.0 if soc < 80 else max(0.1, (100 - soc) / 20)
+        kw = power_kw * taper * random.uniform(0.97, 1.0)
+        samples.append({
+            'ts': start + i * interval,
+            'kwh': round(register, 4),
+            'kw': round(kw, 2),
+            'soc': round(soc, 1),
+        })
+        energy = kw * interval / 3600
+        register += energy
+        soc = min(100.0, soc + energy / capacity_kwh * 100)
+    return samples
+
+
+def recorded_samples(path, start):
+    """Replay a CSV with ts,kwh,kw,soc columns, shifted to start now."""
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        raise CommandError(f"{path} has no samples")
+    offset = start - float(rows[0]['ts'])
+    return [
+        {
+            'ts': float(row['ts']) + offset,
+            'kwh': float(row['kwh']),
+            'kw': float(row['kw']) if row.get('kw') else None,
+            'soc': float(row['soc']) if row.get('soc') else None,
+        }
+        for row in rows
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Replay meter sample streams into in-progress bookings to load test telemetry ingestion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--booking-ids', type=int, nargs='*', help='Bookings to feed (default: all in progress)')
+        parser.add_argument('--file', help='CSV with ts,kwh,kw,soc columns to replay instead of a synthetic curve')
+        parser.add_argument('--samples', type=int, default=600, help='Synthetic samples per session')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between samples')
+        parser.add_argument('--batch', type=int, default=30, help='Samples per request')
+        parser.add_argument('--concurrency', type=int, default=4, help='Sessions fed in parallel (use 1 on SQLite)')
+        parser.add_argument('--realtime', action='store_true', help='Wait between batches as a real charger would')
+
+    def handle(self, *args, **options):
+        bookings = Booking.objects.select_related('station__host', 'charger', 'vehicle').filter(status='in_progress')
+        if options['booking_ids']:
+            bookings = bookings.filter(id__in=options['booking_ids'])
+        bookings = list(bookings)
+        # Samples are accepted from the station's host only, as a charger reports them
+        hostless = [booking.id for booking in bookings if booking.station.host is None]
+        if hostless:
+            self.stderr.write(f"Skipping bookings at stations without a host: {', '.join(map(str, hostless))}")
+            bookings = [booking for booking in bookings if booking.station.host is not None]
+        if not bookings:
+            raise CommandError("No in-progress bookings to feed")
+
+        start = time.time()
+        streams = []
+        for booking in bookings:
+            if options['file']:
+                samples = recorded_samples(options['file'], start)
+            else:
+                capacity = float(booking.vehicle.battery_capacity or 60)
+                samples = synthetic_samples(
+                    float(booking.charger.power_rating), capacity, options['samples'], options['interval'], start
+                )
+            streams.append((booking, samples))
+
+        factory = APIRequestFactory()
+        latencies, statuses = [], {}
+        lock = threading.Lock()
+
+        def feed(booking, samples):
+            for i in range(0, len(samples), options['batch']):
+                batch = samples[i:i + options['batch']]
+                request = factory.post(
+                    f'/api/v1/bookings/charging/{booking.id}/telemetry/', {'samples': batch}, format='json'
+                )
+                force_authenticate(request, user=booking.station.host)
+                sent = time.perf_counter()
+                try:
+                    outcome = ingest_telemetry(request, booking_id=booking.id).status_code
+                except Exception as e:
+                    outcome = type(e).__name__
+                elapsed = time.perf_counter() - sent
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[outcome] = statuses.get(outcome, 0) + 1
+                if options['realtime']:
+                    time.sleep(max(0, len(batch) * options['interval'] - elapsed))
+
+        def worker():
+            while True:
+                with lock:
+                    if not streams:
+                        break
+                    stream = streams.pop()
+                feed(*stream)
+            connection.close()
+
+        total = sum(len(samples) for _, samples in streams)
+        wall_start = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(max(1, options['concurrency']))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall_start
+
+        latencies.sort()
+        self.stdout.write(f"Sessions          {len(bookings)}")
+        self.stdout.write(f"Batches           {len(latencies)} ({', '.join(f'{k}: {v}' for k, v in sorted(statuses.items(), key=str))})")
+        self.stdout.write(f"Samples/s         {total / wall:.0f}")
+        self.stdout.write(f"Batch latency p50 {latencies[len(latencies) // 2] * 1000:.1f} ms")
+        self.stdout.write(f"Batch latency p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms")
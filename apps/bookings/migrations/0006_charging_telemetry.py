@@ -0,0 +1,82 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_booking_vehicle"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChargingTelemetry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sample_count", models.PositiveIntegerField(default=0)),
+                ("chunk_count", models.PositiveIntegerField(default=0)),
+                ("first_sample_at", models.DateTimeField(blank=True, null=True)),
+                ("last_sample_at", models.DateTimeField(blank=True, null=True)),
+                ("start_kwh", models.FloatField(blank=True, null=True)),
+                ("last_kwh", models.FloatField(blank=True, null=True)),
+                ("power_kw", models.FloatField(blank=True, null=True)),
+                (
+                    "soc",
+                    models.FloatField(
+                        blank=True, help_text="State of charge in %", null=True
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "booking",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="telemetry",
+                        to="bookings.booking",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TelemetryChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("seq", models.PositiveIntegerField()),
+                ("first_sample_at", models.DateTimeField()),
+                ("last_sample_at", models.DateTimeField()),
+                ("sample_count", models.PositiveIntegerField()),
+                ("codec", models.PositiveSmallIntegerField(default=1)),
+                ("data", models.BinaryField()),
+                (
+                    "telemetry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunks",
+                        to="bookings.chargingtelemetry",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["seq"],
+                "unique_together": {("telemetry", "seq")},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0006_charging_telemetry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chargingtelemetry",
+            name="rollup",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="telemetrychunk",
+            name="codec",
+            field=models.PositiveSmallIntegerField(default=2),
+        ),
+    ]
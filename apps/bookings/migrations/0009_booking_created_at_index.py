@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0008_booking_sweeper"),
+        ("driver", "0002_uservehicle_is_default"),
+        ("host", "0006_chargingstation_admin_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["-created_at"], name="bookings_bo_created_7d6386_idx"
+            ),
+        ),
+    ]
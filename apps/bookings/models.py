@@ -45,6 +45,7 @@ class Booking(models.Model):
     stripe_payment_intent_id = models.CharField(max_length=255, blank=True, null=True)
     is_paid = models.BooleanField(default=False)
     payment_date = models.DateField(null=True, blank=True)
+    payment_reminded_at = models.DateTimeField(null=True, blank=True)
 
     # Tracking
     check_in_time = models.DateTimeField(null=True, blank=True)
@@ -59,7 +60,11 @@ class Booking(models.Model):
         ordering = ['-created_at']
         unique_together = ('charger', 'booking_date', 'start_time', 'end_time')
         indexes = [
-            models.Index(fields=['charger', 'booking_date', 'start_time', 'end_time'])
+            models.Index(fields=['charger', 'booking_date', 'start_time', 'end_time']),
+            # Stale booking sweeps (apps/bookings/sweeper.py)
+            models.Index(fields=['status', 'booking_date', 'end_time']),
+            # Default ordering of the admin changelist
+            models.Index(fields=['-created_at']),
         ]
 
     def __str__(self):
@@ -108,7 +113,8 @@ class BookingStatusHistory(models.Model):
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='status_history')
     old_status = models.CharField(max_length=15)
     new_status = models.CharField(max_length=15)
-    changed_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Null for changes made by the system (e.g. the stale booking sweeper)
+    changed_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     reason = models.TextField(blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     
@@ -116,6 +122,56 @@ class BookingStatusHistory(models.Model):
         return f"Booking #{self.booking.id}: {self.old_status} → {self.new_status}"
 
 
+class ChargingTelemetry(models.Model):
+    """
+    Running totals of a booking's meter stream. The samples themselves are
+    appended as compressed TelemetryChunk rows, one per ingested batch, and
+    compacted into larger chunks once the session completes.
+    """
+    booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='telemetry')
+    sample_count = models.PositiveIntegerField(default=0)
+    chunk_count = models.PositiveIntegerField(default=0)
+    first_sample_at = models.DateTimeField(null=True, blank=True)
+    last_sample_at = models.DateTimeField(null=True, blank=True)
+
+    # Meter register (kWh) at the first and latest sample
+    start_kwh = models.FloatField(null=True, blank=True)
+    last_kwh = models.FloatField(null=True, blank=True)
+    power_kw = models.FloatField(null=True, blank=True)
+    soc = models.FloatField(null=True, blank=True, help_text="State of charge in %")
+
+    # Downsampled curve stored when the session completes (see telemetry.compute_rollup)
+    rollup = models.JSONField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def energy_kwh(self):
+        if self.start_kwh is None or self.last_kwh is None:
+            return 0.0
+        return self.last_kwh - self.start_kwh
+
+    def __str__(self):
+        return f"Telemetry for Booking #{self.booking_id} ({self.sample_count} samples)"
+
+
+class TelemetryChunk(models.Model):
+    telemetry = models.ForeignKey(ChargingTelemetry, on_delete=models.CASCADE, related_name='chunks')
+    seq = models.PositiveIntegerField()
+    first_sample_at = models.DateTimeField()
+    last_sample_at = models.DateTimeField()
+    sample_count = models.PositiveIntegerField()
+    codec = models.PositiveSmallIntegerField(default=2)
+    data = models.BinaryField()
+
+    class Meta:
+        ordering = ['seq']
+        unique_together = ('telemetry', 'seq')
+
+    def __str__(self):
+        return f"Chunk {self.seq} of Booking #{self.telemetry.booking_id}"
+
+
 class BookingExtension(models.Model):
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='extensions')
     requested_by = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -0,0 +1,6 @@
+from django.urls import re_path
+from apps.bookings import consumers
+
+websocket_urlpatterns = [
+    re_path(r'ws/charging/(?P<booking_id>\d+)/$', consumers.ChargingSessionConsumer.as_asgi()),
+]
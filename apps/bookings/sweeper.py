@@ -0,0 +1,133 @@
+"""
+Periodic clean-up of bookings nobody closed.
+
+- pending/confirmed bookings whose slot has ended are cancelled as no-shows;
+- in_progress sessions still open SWEEP_CHECKOUT_GRACE_MINUTES after their
+  slot ended are completed and billed up to the end of the slot;
+- completed bookings left unpaid for SWEEP_PAYMENT_REMINDER_HOURS get one
+  payment reminder.
+
+Each step selects a batch of ids over the (status, booking_date, end_time)
+index and moves it with set-based UPDATEs through transition_bookings, so
+history rows, the booking_transitioned signal and notifications are written
+per batch rather than per booking.
+"""
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.bookings.models import Booking
+from apps.bookings.transitions import transition_bookings
+from apps.bookings.utils import calculate_charges
+from apps.common.models import Notification
+
+BATCH_SIZE = getattr(settings, 'SWEEP_BATCH_SIZE', 500)
+CHECKOUT_GRACE = timedelta(minutes=getattr(settings, 'SWEEP_CHECKOUT_GRACE_MINUTES', 30))
+PAYMENT_REMINDER_AFTER = timedelta(hours=getattr(settings, 'SWEEP_PAYMENT_REMINDER_HOURS', 24))
+
+
+def ended_before(moment):
+    """Bookings whose slot ended at or before `moment` (local time)."""
+    moment = timezone.localtime(moment)
+    return Q(booking_date__lt=moment.date()) | Q(booking_date=moment.date(), end_time__lte=moment.time())
+
+
+def _next_batch(queryset):
+    return list(queryset.order_by().values_list('id', flat=True)[:BATCH_SIZE])
+
+
+def _notify(bookings, message):
+    Notification.objects.bulk_create(
+        [Notification(user_id=booking.user_id, message=message(booking)) for booking in bookings],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def expire_no_shows(now):
+    candidates = Booking.objects.filter(ended_before(now), status__in=['pending', 'confirmed'])
+    total = 0
+    while True:
+        ids = _next_batch(candidates)
+        if not ids:
+            break
+        with transaction.atomic():
+            moved = transition_bookings(
+                Booking.objects.filter(id__in=ids), 'cancel', None, reason='Slot ended without check-in'
+            )
+            _notify(
+                Booking.objects.filter(id__in=moved).select_related('station'),
+                lambda b: f"Your booking at {b.station.station_name} on {b.booking_date} was cancelled because the slot ended before check-in.",
+            )
+        total += len(moved)
+        # Rows locked by a request in flight are left for the next run
+        if len(moved) < len(ids):
+            break
+    return total
+
+
+def slot_end(booking):
+    end = timezone.make_aware(datetime.combine(booking.booking_date, booking.end_time))
+    return max(end, booking.check_in_time) if booking.check_in_time else end
+
+
+def complete_overdue_sessions(now):
+    candidates = Booking.objects.filter(ended_before(now - CHECKOUT_GRACE), status='in_progress')
+    total = 0
+    while True:
+        ids = _next_batch(candidates)
+        if not ids:
+            break
+        with transaction.atomic():
+            moved = transition_bookings(
+                Booking.objects.filter(id__in=ids), 'complete', None, reason='Session not stopped; closed at slot end'
+            )
+            bookings = list(Booking.objects.filter(id__in=moved).select_related('charger', 'station', 'telemetry'))
+            for booking in bookings:
+                booking.check_in_time = booking.check_in_time or slot_end(booking)
+                booking.check_out_time = slot_end(booking)
+                booking.subtotal, booking.total_amount, _ = calculate_charges(booking, booking.check_out_time)
+            Booking.objects.bulk_update(
+                bookings, ['check_in_time', 'check_out_time', 'subtotal', 'total_amount'], batch_size=BATCH_SIZE
+            )
+            _notify(
+                bookings,
+                lambda b: f"Your charging session at {b.station.station_name} was closed at the end of your slot. Total due: {b.total_amount}.",
+            )
+        total += len(moved)
+        if len(moved) < len(ids):
+            break
+    return total
+
+
+def remind_unpaid(now):
+    cutoff = now - PAYMENT_REMINDER_AFTER
+    candidates = Booking.objects.filter(
+        ended_before(cutoff), status='completed', is_paid=False, payment_reminded_at__isnull=True,
+    )
+    total = 0
+    while True:
+        with transaction.atomic():
+            bookings = list(
+                candidates.select_for_update(skip_locked=True, of=('self',)).select_related('station').order_by()[:BATCH_SIZE]
+            )
+            if not bookings:
+                break
+            Booking.objects.filter(id__in=[b.id for b in bookings]).update(payment_reminded_at=now)
+            _notify(
+                bookings,
+                lambda b: f"Your charging session at {b.station.station_name} on {b.booking_date} is still unpaid ({b.total_amount}).",
+            )
+        total += len(bookings)
+        if len(bookings) < BATCH_SIZE:
+            break
+    return total
+
+
+def sweep_stale_bookings(now=None):
+    now = now or timezone.now()
+    return {
+        'expired': expire_no_shows(now),
+        'completed': complete_overdue_sessions(now),
+        'reminded': remind_unpaid(now),
+    }
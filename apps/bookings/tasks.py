@@ -0,0 +1,16 @@
+from celery import shared_task
+from apps.bookings.sweeper import sweep_stale_bookings as sweep
+from apps.bookings.telemetry import finalize_telemetry
+
+
+@shared_task(ignore_result=True)
+def finalize_charging_telemetry(booking_ids):
+    for booking_id in booking_ids:
+        finalize_telemetry(booking_id)
+    return f"Charging telemetry: finalized {len(booking_ids)} sessions"
+
+
+@shared_task(ignore_result=True)
+def sweep_stale_bookings():
+    counts = sweep()
+    return f"Stale bookings: {counts['expired']} expired, {counts['completed']} completed, {counts['reminded']} reminded"
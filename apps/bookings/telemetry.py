@@ -0,0 +1,370 @@
+"""
+Live charging telemetry.
+
+Chargers (or the driver's app) post batches of meter samples for a booking
+that is in progress. Each batch is appended as one TelemetryChunk holding the
+samples as packed arrays, the running totals on ChargingTelemetry are
+updated in the same transaction, and the new progress is pushed to the
+`charging_<booking_id>` channel group the driver's app listens on.
+
+When the session completes its chunks are compacted into a few large ones
+and a downsampled curve is stored on ChargingTelemetry.rollup, so history
+screens never decode raw samples.
+
+A sample is {"ts": <unix seconds>, "kwh": <meter register>, "kw": <power>,
+"soc": <state of charge %>}; kw and soc are optional.
+"""
+import io
+import sys
+import math
+import struct
+from array import array
+from decimal import Decimal
+from datetime import datetime, timezone as dt_timezone
+import zstandard
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.bookings.models import ChargingTelemetry, TelemetryChunk
+
+# Codec 1: uint32 count, then float64 ts[], float64 kwh[], float32 kw[],
+# float32 soc[] (little-endian, NaN for missing kw/soc). Read-only now.
+CODEC_ARRAYS = 1
+_HEADER = struct.Struct('<I')
+
+# Codec 2: zstd frame of uint32 count, float64 first ts, float64 first kwh,
+# then uint32 ms since the previous sample[], float32 kwh since the first
+# sample[], float32 kw[], float32 soc[]
+CODEC_DELTA_ZSTD = 2
+_DELTA_HEADER = struct.Struct('<Idd')
+
+ZSTD_LEVEL = getattr(settings, 'TELEMETRY_ZSTD_LEVEL', 3)
+CHUNK_SAMPLES = getattr(settings, 'TELEMETRY_CHUNK_SAMPLES', 3600)
+ROLLUP_POINTS = getattr(settings, 'TELEMETRY_ROLLUP_POINTS', 120)
+
+
+class TelemetryError(ValueError):
+    pass
+
+
+def _little_endian(values):
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def encode_samples(ts, kwh, kw, soc):
+    count = len(ts)
+    base_ts, base_kwh = (ts[0], kwh[0]) if count else (0.0, 0.0)
+
+    deltas, previous = array('I'), 0
+    for value in ts:
+        offset = round((value - base_ts) * 1000)
+        deltas.append(offset - previous)
+        previous = offset
+
+    raw = bytearray(_DELTA_HEADER.pack(count, base_ts, base_kwh))
+    raw += _little_endian(deltas).tobytes()
+    raw += _little_endian(array('f', (value - base_kwh for value in kwh))).tobytes()
+    raw += _little_endian(array('f', kw)).tobytes()
+    raw += _little_endian(array('f', soc)).tobytes()
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(bytes(raw))
+
+
+def _read_column(reader, typecode, count):
+    values = array(typecode)
+    values.frombytes(reader.read(values.itemsize * count))
+    return _little_endian(values)
+
+
+def decode_samples(data, codec=CODEC_DELTA_ZSTD):
+    """
+    Return (ts, kwh, kw, soc) arrays of one chunk. Codec 2 chunks are
+    decompressed as a stream, one column at a time.
+    """
+    if codec == CODEC_ARRAYS:
+        reader = io.BytesIO(data)
+        count = _HEADER.unpack(reader.read(_HEADER.size))[0]
+        return tuple(_read_column(reader, typecode, count) for typecode in ('d', 'd', 'f', 'f'))
+
+    if codec != CODEC_DELTA_ZSTD:
+        raise TelemetryError(f"Unknown telemetry codec {codec}")
+
+    with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+        count, base_ts, base_kwh = _DELTA_HEADER.unpack(reader.read(_DELTA_HEADER.size))
+        deltas = _read_column(reader, 'I', count)
+        kwh_offsets = _read_column(reader, 'f', count)
+        kw = _read_column(reader, 'f', count)
+        soc = _read_column(reader, 'f', count)
+
+    ts, elapsed_ms = array('d'), 0
+    for delta in deltas:
+        elapsed_ms += delta
+        ts.append(base_ts + elapsed_ms / 1000)
+    kwh = array('d', (base_kwh + value for value in kwh_offsets))
+    return ts, kwh, kw, soc
+
+
+def _number(sample, name, required=False):
+    value = sample.get(name)
+    if value is None:
+        if required:
+            raise TelemetryError(f"Each sample needs a numeric '{name}'.")
+        return math.nan
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise TelemetryError(f"'{name}' must be a finite number.")
+    return float(value)
+
+
+def parse_samples(samples):
+    """Validate a batch and return it as (ts, kwh, kw, soc) lists."""
+    max_batch = getattr(settings, 'TELEMETRY_MAX_BATCH', 500)
+    if not isinstance(samples, list) or not samples:
+        raise TelemetryError("samples must be a non-empty list.")
+    if len(samples) > max_batch:
+        raise TelemetryError(f"At most {max_batch} samples per batch.")
+
+    ts, kwh, kw, soc = [], [], [], []
+    for sample in samples:
+        if not isinstance(sample, dict):
+            raise TelemetryError("Each sample must be an object.")
+        ts.append(_number(sample, 'ts', required=True))
+        kwh.append(_number(sample, 'kwh', required=True))
+        kw.append(_number(sample, 'kw'))
+        soc.append(_number(sample, 'soc'))
+
+    for i in range(1, len(ts)):
+        if ts[i] <= ts[i - 1]:
+            raise TelemetryError("Sample timestamps must be strictly increasing.")
+        if kwh[i] < kwh[i - 1]:
+            raise TelemetryError("The meter register (kwh) cannot go backwards.")
+    return ts, kwh, kw, soc
+
+
+def _datetime(seconds):
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+
+
+def _last(values):
+    for value in reversed(values):
+        if not math.isnan(value):
+            return value
+    return None
+
+
+def ingest_samples(booking, samples):
+    """
+    Append a batch to the booking's series. Samples at or before the last
+    stored one are dropped, so a retried batch is not stored twice.
+    Returns the session progress.
+    """
+    ts, kwh, kw, soc = parse_samples(samples)
+
+    with transaction.atomic():
+        telemetry, _ = ChargingTelemetry.objects.select_for_update().get_or_create(booking=booking)
+
+        if telemetry.last_sample_at is not None:
+            last = telemetry.last_sample_at.timestamp()
+            skip = next((i for i, value in enumerate(ts) if value > last), len(ts))
+            ts, kwh, kw, soc = ts[skip:], kwh[skip:], kw[skip:], soc[skip:]
+            if ts and kwh[0] < telemetry.last_kwh:
+                raise TelemetryError("The meter register (kwh) cannot go backwards.")
+
+        if ts:
+            TelemetryChunk.objects.create(
+                telemetry=telemetry,
+                seq=telemetry.chunk_count,
+                first_sample_at=_datetime(ts[0]),
+                last_sample_at=_datetime(ts[-1]),
+                sample_count=len(ts),
+                codec=CODEC_DELTA_ZSTD,
+                data=encode_samples(ts, kwh, kw, soc),
+            )
+            if telemetry.first_sample_at is None:
+                telemetry.first_sample_at = _datetime(ts[0])
+                telemetry.start_kwh = kwh[0]
+            telemetry.last_sample_at = _datetime(ts[-1])
+            telemetry.last_kwh = kwh[-1]
+            telemetry.power_kw = _last(kw) if _last(kw) is not None else telemetry.power_kw
+            telemetry.soc = _last(soc) if _last(soc) is not None else telemetry.soc
+            telemetry.sample_count += len(ts)
+            telemetry.chunk_count += 1
+            telemetry.save()
+
+    return session_progress(booking, telemetry)
+
+
+def iter_chunks(telemetry):
+    """Decoded chunks of a session in order, fetched and decoded one by one."""
+    chunks = telemetry.chunks.order_by('seq').values_list('codec', 'data')
+    for codec, data in chunks.iterator(chunk_size=20):
+        yield decode_samples(data, codec)
+
+
+def read_series(telemetry):
+    """The whole stored series of a session as (ts, kwh, kw, soc) arrays."""
+    series = (array('d'), array('d'), array('f'), array('f'))
+    for columns in iter_chunks(telemetry):
+        for column, values in zip(series, columns):
+            column.extend(values)
+    return series
+
+
+def _rounded(value, digits):
+    return None if value is None or math.isnan(value) else round(value, digits)
+
+
+def compute_rollup(series, points=ROLLUP_POINTS):
+    """
+    Downsample a session to at most `points` equal-time buckets: seconds
+    since the first sample, energy delivered, average and peak power and
+    state of charge at the end of each bucket, as parallel lists.
+    """
+    ts, kwh, kw, soc = series
+    rollup = {'t': [], 'energy_kwh': [], 'power_kw': [], 'max_power_kw': [], 'soc': []}
+    if not ts:
+        return rollup
+
+    start, start_kwh = ts[0], kwh[0]
+    width = max((ts[-1] - start) / points, 1e-9)
+    i = 0
+    while i < len(ts):
+        bucket = min(int((ts[i] - start) / width), points - 1)
+        powers, last_soc = [], math.nan
+        while i < len(ts) and min(int((ts[i] - start) / width), points - 1) == bucket:
+            if not math.isnan(kw[i]):
+                powers.append(kw[i])
+            if not math.isnan(soc[i]):
+                last_soc = soc[i]
+            i += 1
+        rollup['t'].append(round(ts[i - 1] - start, 1))
+        rollup['energy_kwh'].append(round(kwh[i - 1] - start_kwh, 3))
+        rollup['power_kw'].append(round(sum(powers) / len(powers), 2) if powers else None)
+        rollup['max_power_kw'].append(round(max(powers), 2) if powers else None)
+        rollup['soc'].append(_rounded(last_soc, 1))
+    return rollup
+
+
+def finalize_telemetry(booking_id):
+    """
+    Compact a finished session into chunks of up to CHUNK_SAMPLES samples
+    and store its downsampled curve. Safe to run more than once.
+    """
+    with transaction.atomic():
+        telemetry = ChargingTelemetry.objects.select_for_update().filter(booking_id=booking_id).first()
+        if telemetry is None or telemetry.rollup is not None:
+            return telemetry
+
+        series = read_series(telemetry)
+        count = len(series[0])
+        if telemetry.chunk_count > math.ceil(count / CHUNK_SAMPLES):
+            compacted = []
+            for seq, begin in enumerate(range(0, count, CHUNK_SAMPLES)):
+                ts, kwh, kw, soc = (column[begin:begin + CHUNK_SAMPLES] for column in series)
+                compacted.append(TelemetryChunk(
+                    telemetry=telemetry, seq=seq,
+                    first_sample_at=_datetime(ts[0]), last_sample_at=_datetime(ts[-1]),
+                    sample_count=len(ts), codec=CODEC_DELTA_ZSTD, data=encode_samples(ts, kwh, kw, soc),
+                ))
+            telemetry.chunks.all().delete()
+            TelemetryChunk.objects.bulk_create(compacted)
+            telemetry.chunk_count = len(compacted)
+
+        telemetry.rollup = compute_rollup(series)
+        telemetry.save(update_fields=['rollup', 'chunk_count', 'updated_at'])
+    return telemetry
+
+
+def queue_telemetry_finalization(booking_ids):
+    from apps.bookings.tasks import finalize_charging_telemetry
+    try:
+        finalize_charging_telemetry.apply_async(args=[list(booking_ids)], retry=False)
+    except Exception as e:
+        # Broker down: do it now rather than leave the session uncompacted
+        print("Charging telemetry: could not enqueue finalization", e)
+        for booking_id in booking_ids:
+            finalize_telemetry(booking_id)
+
+
+def finalize_completed_sessions(sender, booking_ids, new_status, **kwargs):
+    """booking_transitioned receiver, connected in BookingsConfig.ready()."""
+    if new_status == 'completed':
+        queue_telemetry_finalization(booking_ids)
+
+
+def session_curve(booking):
+    """Downsampled curve of a completed session, built on first use if missing."""
+    telemetry = get_telemetry(booking)
+    if telemetry is None or not telemetry.sample_count:
+        return None
+    if telemetry.rollup is None:
+        telemetry = finalize_telemetry(booking.id)
+    return telemetry.rollup
+
+
+def get_telemetry(booking):
+    try:
+        return booking.telemetry
+    except ChargingTelemetry.DoesNotExist:
+        return None
+
+
+def metered_energy(booking):
+    """Energy measured by the meter in kWh, or None if nothing was reported."""
+    telemetry = get_telemetry(booking)
+    if telemetry is None or not telemetry.sample_count:
+        return None
+    return Decimal(str(round(telemetry.energy_kwh, 3)))
+
+
+def usage_kwh(booking):
+    """Metered energy when available, otherwise power_rating x charging time."""
+    energy = metered_energy(booking)
+    if energy is not None:
+        return energy
+    if not booking.check_in_time or not booking.check_out_time:
+        return Decimal('0')
+    hours = (booking.check_out_time - booking.check_in_time).total_seconds() / 3600
+    return booking.charger.power_rating * Decimal(str(hours))
+
+
+def session_progress(booking, telemetry=None):
+    telemetry = telemetry or get_telemetry(booking)
+    charger = booking.charger
+    now = timezone.now()
+    elapsed = (now - booking.check_in_time).total_seconds() if booking.check_in_time else 0
+    energy = telemetry.energy_kwh if telemetry else 0.0
+
+    if charger.mode == 'kwh':
+        cost = charger.price * Decimal(str(round(energy, 3)))
+    else:
+        cost = charger.price * Decimal(str(elapsed / 3600))
+
+    return {
+        'booking_id': booking.id,
+        'status': booking.status,
+        'energy_kwh': round(energy, 3),
+        'power_kw': telemetry.power_kw if telemetry else None,
+        'soc': telemetry.soc if telemetry else None,
+        'sample_count': telemetry.sample_count if telemetry else 0,
+        'last_sample_at': telemetry.last_sample_at.isoformat() if telemetry and telemetry.last_sample_at else None,
+        'elapsed_seconds': int(elapsed),
+        'estimated_cost': str(cost.quantize(Decimal('0.01'))),
+    }
+
+
+def charging_group(booking_id):
+    return f"charging_{booking_id}"
+
+
+def broadcast_progress(progress):
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            charging_group(progress['booking_id']),
+            {'type': 'charging.progress', 'progress': progress},
+        )
+    except Exception as e:
+        # Live updates are best effort; the samples are already stored
+        print("Charging telemetry: broadcast failed", e)
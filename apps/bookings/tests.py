@@ -1,3 +1,581 @@
-from django.test import TestCase
+import math
+import struct
+from io import StringIO
+from array import array
+from decimal import Decimal
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from unittest.mock import patch
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+from apps.bookings.models import Booking, BookingStatusHistory, ChargingTelemetry, Review
+from apps.bookings.routing import websocket_urlpatterns
+from apps.bookings.sweeper import sweep_stale_bookings
+from apps.common.models import Notification
+from apps.bookings.telemetry import decode_samples, encode_samples, parse_samples, read_series
+from apps.bookings.transitions import InvalidTransition, booking_transitioned, transition, transition_bookings
+from apps.driver.models import PlugType, Vehicle
+from apps.host.models import Charger, ChargerType, ChargingStation
 
-# Create your tests here.
+NOW = datetime(2026, 3, 2, 10, 0, tzinfo=dt_timezone.utc)
+
+
+class ScanToStartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = patch("django.utils.timezone.now", return_value=NOW)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        station = ChargingStation.objects.create(
+            host=host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        self.charger = Charger.objects.create(
+            name="Bay 1", station=station, charger_type=ChargerType.objects.create(name="DC Fast"), price=20
+        )
+        self.vehicle = Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion")
+        self.client = APIClient()
+        self.client.force_authenticate(self.driver)
+
+    def book(self, start, end, user=None, status="pending"):
+        return Booking.objects.create(
+            user=user or self.driver, station=self.charger.station, charger=self.charger, vehicle=self.vehicle,
+            booking_date=NOW.date(), start_time=start, end_time=end, status=status,
+        )
+
+    def scan(self, **extra):
+        return self.client.post(
+            reverse("scan-to-start"), {"scanner_code": self.charger.scanner_code, **extra}, format="json"
+        )
+
+    def test_booked_scan_is_one_lookup_and_one_transition(self):
+        booking = self.book(time(10, 5), time(11, 0))
+        other = self.book(time(12, 0), time(13, 0))
+        self.scan()  # warms the scanner code cache, starts the booking
+        Booking.objects.filter(id=booking.id).update(status="confirmed", check_in_time=None)
+
+        # Booking lookup, conditional UPDATE, status history INSERT
+        with self.assertNumQueries(3):
+            response = self.scan()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["booking_id"], booking.id)
+        booking.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(booking.status, "in_progress")
+        self.assertEqual(booking.check_in_time, NOW)
+        self.assertEqual(other.status, "pending")
+
+    def test_repeat_scan_does_not_write(self):
+        booking = self.book(time(9, 30), time(11, 0), status="in_progress")
+        self.scan()
+
+        with self.assertNumQueries(1):
+            response = self.scan()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["booking_id"], booking.id)
+
+    def test_conditional_update_loses_to_concurrent_cancel(self):
+        booking = self.book(time(10, 0), time(11, 0))
+        original = Booking.objects.filter
+
+        def cancel_first(*args, **kwargs):
+            # Simulate another request cancelling between lookup and write
+            if set(kwargs) == {"id", "status"}:
+                Booking.objects.all().update(status="cancelled")
+            return original(*args, **kwargs)
+
+        with patch.object(Booking.objects, "filter", side_effect=cancel_first):
+            response = self.scan()
+
+        self.assertEqual(response.status_code, 409)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, "cancelled")
+
+    def test_walk_up_session_on_free_charger(self):
+        response = self.scan(vehicle_id=self.vehicle.id, duration_minutes=45)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data["walk_up"])
+        booking = Booking.objects.get(id=response.data["booking_id"])
+        self.assertEqual(booking.status, "in_progress")
+        self.assertEqual((booking.start_time, booking.end_time), (time(10, 0), time(10, 45)))
+        self.assertEqual(booking.hourly_rate, self.charger.price)
+
+    def test_walk_up_is_refused_when_someone_else_booked_the_charger(self):
+        other = User.objects.create_user(
+            full_name="Other", email="other@example.com", phone="+8801700000003", password="secret123"
+        )
+        self.book(time(10, 30), time(11, 30), user=other)
+
+        response = self.scan(vehicle_id=self.vehicle.id)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Booking.objects.filter(user=self.driver).count(), 0)
+
+    def test_scan_at_a_removed_station_starts_nothing(self):
+        booking = self.book(time(10, 0), time(11, 0))
+        ChargingStation.objects.filter(id=self.charger.station_id).update(removed_at=NOW)
+
+        response = self.scan(vehicle_id=self.vehicle.id)
+
+        self.assertEqual(response.status_code, 409)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, "pending")
+
+        booking.delete()
+        response = self.scan(vehicle_id=self.vehicle.id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["error"], "This station is no longer listed.")
+        self.assertFalse(Booking.objects.exists())
+
+    def test_unknown_code(self):
+        response = self.client.post(reverse("scan-to-start"), {"scanner_code": "nope"}, format="json")
+        self.assertEqual(response.status_code, 404)
+
+
+class CreateBookingTests(TestCase):
+    def setUp(self):
+        self.driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        # Imported from Places, so no host
+        self.station = ChargingStation.objects.create(
+            station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        self.charger = Charger.objects.create(
+            name="Bay 1", station=self.station, charger_type=ChargerType.objects.create(name="DC Fast"), price=20
+        )
+        self.plug = PlugType.objects.create(name="CCS2")
+        self.vehicle = Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion")
+        self.client = APIClient()
+        self.client.force_authenticate(self.driver)
+
+    def create(self):
+        return self.client.post(reverse("create-booking"), {
+            "station": self.station.id, "charger": self.charger.id, "plug": self.plug.id, "vehicle_id": self.vehicle.id,
+            "booking_date": "2026-03-02", "start_time": "10:00", "end_time": "11:00",
+        }, format="json")
+
+    def test_station_without_host_can_be_booked(self):
+        response = self.create()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.get(id=response.data["id"]).station, self.station)
+
+    def test_removed_station_cannot_be_booked(self):
+        ChargingStation.objects.filter(id=self.station.id).update(removed_at=timezone.now())
+
+        response = self.create()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Booking.objects.exists())
+
+
+class BookingTransitionTests(TestCase):
+    def setUp(self):
+        self.driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        station = ChargingStation.objects.create(
+            host=self.host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        self.charger = Charger.objects.create(
+            name="Bay 1", station=station, charger_type=ChargerType.objects.create(name="DC Fast"), price=20
+        )
+        self.vehicle = Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion")
+        self.client = APIClient()
+
+    def book(self, hour, status="pending"):
+        return Booking.objects.create(
+            user=self.driver, station=self.charger.station, charger=self.charger, vehicle=self.vehicle,
+            booking_date=NOW.date(), start_time=time(hour, 0), end_time=time(hour, 59), status=status,
+        )
+
+    def test_start_is_refused_for_cancelled_booking(self):
+        booking = self.book(9, status="cancelled")
+        self.client.force_authenticate(self.driver)
+
+        response = self.client.post(reverse("start-charging"), {"booking_id": booking.id}, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, "cancelled")
+        self.assertFalse(booking.status_history.exists())
+
+    def test_host_cannot_accept_completed_booking(self):
+        booking = self.book(9, status="completed")
+        self.client.force_authenticate(self.host)
+
+        response = self.client.post(reverse("booking-status-update", kwargs={"pk": booking.id}), {"status": "accept"}, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, "completed")
+
+    def test_accept_records_history_and_emits_one_event(self):
+        booking = self.book(9)
+        self.client.force_authenticate(self.host)
+        events = []
+        receiver = lambda **kwargs: events.append(kwargs)
+        booking_transitioned.connect(receiver)
+        self.addCleanup(booking_transitioned.disconnect, receiver)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("booking-status-update", kwargs={"pk": booking.id}), {"status": "accept"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        history = booking.status_history.get()
+        self.assertEqual((history.old_status, history.new_status, history.changed_by), ("pending", "confirmed", self.host))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["booking_ids"], [booking.id])
+
+    def test_stale_read_loses_the_race(self):
+        booking = self.book(9)
+        stale = Booking.objects.get(id=booking.id)
+        transition(booking, "cancel", self.driver)
+
+        with self.assertRaises(InvalidTransition) as ctx:
+            transition(stale, "start", self.driver, check_in_time=NOW)
+
+        self.assertEqual(ctx.exception.status, "cancelled")
+        self.assertIsNone(Booking.objects.get(id=booking.id).check_in_time)
+
+    def test_bulk_transition_appends_history_in_one_insert(self):
+        pending = [self.book(hour) for hour in (8, 9, 10)]
+        confirmed = self.book(11, status="confirmed")
+        self.book(12, status="completed")
+
+        # SELECT ... FOR UPDATE, one UPDATE per source status, one history INSERT
+        # (plus the savepoint pair inside the test transaction)
+        with self.assertNumQueries(6):
+            moved = transition_bookings(Booking.objects.all(), "cancel", self.host, reason="Station closed")
+
+        self.assertCountEqual(moved, [b.id for b in pending] + [confirmed.id])
+        self.assertEqual(Booking.objects.filter(status="cancelled").count(), 4)
+        self.assertEqual(BookingStatusHistory.objects.filter(new_status="cancelled", reason="Station closed").count(), 4)
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class ChargingTelemetryTests(TestCase):
+    def setUp(self):
+        self.driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.host = host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        station = ChargingStation.objects.create(
+            host=host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        self.charger = Charger.objects.create(
+            name="Bay 1", station=station, charger_type=ChargerType.objects.create(name="DC Fast"),
+            price=Decimal("0.50"), mode="kwh", power_rating=50,
+        )
+        vehicle = Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion")
+        self.booking = Booking.objects.create(
+            user=self.driver, station=station, charger=self.charger, vehicle=vehicle,
+            booking_date=NOW.date(), start_time=time(9, 0), end_time=time(11, 0),
+            status="in_progress", check_in_time=timezone.now(),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.driver)
+        # Meter samples come from the charger, which reports as the station's host
+        self.charger_client = APIClient()
+        self.charger_client.force_authenticate(host)
+        self.start = timezone.now().timestamp()
+
+    def samples(self, first, count, kwh_start=1000.0):
+        return [
+            {"ts": self.start + i, "kwh": kwh_start + i * 0.01, "kw": 36.0, "soc": 40 + i * 0.1}
+            for i in range(first, first + count)
+        ]
+
+    def post(self, samples, client=None):
+        return (client or self.charger_client).post(
+            reverse("charging-telemetry", kwargs={"booking_id": self.booking.id}), {"samples": samples}, format="json"
+        )
+
+    def test_codec_round_trip(self):
+        data = encode_samples([1.5, 2.5, 3.75], [10.0, 10.25, 10.5], [7.0, math.nan, 6.5], [math.nan, 55.5, 56.0])
+        ts, kwh, kw, soc = decode_samples(data)
+
+        self.assertEqual(list(ts), [1.5, 2.5, 3.75])
+        self.assertEqual(list(kwh), [10.0, 10.25, 10.5])
+        self.assertEqual(kw[0], 7.0)
+        self.assertTrue(math.isnan(kw[1]) and math.isnan(soc[0]))
+        self.assertAlmostEqual(soc[1], 55.5)
+
+    def test_codec_is_compact_and_reads_legacy_chunks(self):
+        data = encode_samples(*parse_samples(self.samples(0, 500)))
+        self.assertLess(len(data), 500 * 12)
+
+        legacy = struct.pack("<I", 1) + b"".join(
+            array(code, [value]).tobytes() for code, value in (("d", 5.0), ("d", 1.25), ("f", 7.0), ("f", 50.0))
+        )
+        ts, kwh, kw, soc = decode_samples(legacy, codec=1)
+        self.assertEqual((ts[0], kwh[0], kw[0], soc[0]), (5.0, 1.25, 7.0, 50.0))
+
+    def test_batches_are_appended_as_chunks(self):
+        self.assertEqual(self.post(self.samples(0, 30)).status_code, 200)
+        # A retried batch overlapping stored samples only adds the new ones
+        response = self.post(self.samples(20, 30))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["sample_count"], 50)
+        self.assertAlmostEqual(response.data["energy_kwh"], 0.49)
+        self.assertEqual(response.data["estimated_cost"], "0.24")
+
+        telemetry = ChargingTelemetry.objects.get(booking=self.booking)
+        self.assertEqual(telemetry.chunks.count(), 2)
+        ts, kwh, kw, soc = read_series(telemetry)
+        self.assertEqual(len(ts), 50)
+        self.assertEqual(list(ts), sorted(ts))
+
+    def test_invalid_batches_are_rejected(self):
+        self.post(self.samples(0, 10))
+
+        self.assertEqual(self.post(self.samples(10, 5, kwh_start=900.0)).status_code, 400)
+        self.assertEqual(self.post([{"ts": self.start + 20}]).status_code, 400)
+        self.assertEqual(self.post(list(reversed(self.samples(30, 5)))).status_code, 400)
+
+        Booking.objects.filter(id=self.booking.id).update(status="completed")
+        self.assertEqual(self.post(self.samples(40, 5)).status_code, 404)
+
+    def test_kwh_chargers_bill_metered_energy(self):
+        self.post([{"ts": self.start, "kwh": 1000.0}, {"ts": self.start + 60, "kwh": 1012.5}])
+
+        response = self.client.post(reverse("finish-charging"), {"booking_id": self.booking.id}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["energy_kwh"], "12.5")
+        self.assertEqual(response.data["subtotal"], "6.25")
+
+    def test_drivers_cannot_report_meter_samples(self):
+        self.post([{"ts": self.start, "kwh": 1000.0}, {"ts": self.start + 60, "kwh": 1012.5}])
+
+        response = self.post([{"ts": self.start + 61, "kwh": 1012.5}, {"ts": self.start + 62, "kwh": 1012.5}], self.client)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(ChargingTelemetry.objects.get(booking=self.booking).sample_count, 2)
+
+        response = self.client.post(reverse("finish-charging"), {"booking_id": self.booking.id}, format="json")
+        self.assertEqual(response.data["subtotal"], "6.25")
+
+    def test_finished_session_is_compacted_and_rolled_up(self):
+        for first in range(0, 1200, 60):
+            self.post(self.samples(first, 60))
+        telemetry = ChargingTelemetry.objects.get(booking=self.booking)
+        self.assertEqual(telemetry.chunks.count(), 20)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("finish-charging"), {"booking_id": self.booking.id}, format="json")
+
+        telemetry.refresh_from_db()
+        self.assertEqual(telemetry.chunks.count(), 1)
+        self.assertEqual(len(read_series(telemetry)[0]), 1200)
+        self.assertEqual(len(telemetry.rollup["t"]), 120)
+        self.assertAlmostEqual(telemetry.rollup["energy_kwh"][-1], 11.99, places=2)
+        self.assertEqual(telemetry.rollup["power_kw"][0], 36.0)
+
+        # The history screen plots the stored curve without decoding samples
+        with patch("apps.bookings.telemetry.decode_samples", side_effect=AssertionError):
+            response = self.client.get(reverse("charging-history", kwargs={"booking_id": self.booking.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["charging_curve"], telemetry.rollup)
+
+    async def test_websocket_streams_progress(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/charging/{self.booking.id}/")
+        communicator.scope["user"] = self.host
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual((await communicator.receive_json_from())["progress"]["sample_count"], 0)
+
+        await communicator.send_json_to({"samples": self.samples(0, 5)})
+        event = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertEqual(event["type"], "progress")
+        self.assertEqual(event["progress"]["sample_count"], 5)
+        self.assertEqual(event["progress"]["soc"], 40.4)
+
+    async def test_websocket_drivers_watch_without_reporting(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/charging/{self.booking.id}/")
+        communicator.scope["user"] = self.driver
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.receive_json_from()
+
+        await communicator.send_json_to({"samples": self.samples(0, 5)})
+        event = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertEqual(event["type"], "error")
+        self.assertFalse(await ChargingTelemetry.objects.filter(booking=self.booking, sample_count__gt=0).aexists())
+
+    async def test_websocket_rejects_other_users(self):
+        other = await User.objects.acreate(full_name="Other", email="other@example.com", phone="+8801700000003")
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/charging/{self.booking.id}/")
+        communicator.scope["user"] = other
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class SimulateChargingTests(TransactionTestCase):
+    # The command posts from worker threads, which only see committed rows
+    def test_batches_are_stored_as_the_stations_host(self):
+        driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        station = ChargingStation.objects.create(
+            host=host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        charger = Charger.objects.create(
+            name="Bay 1", station=station, charger_type=ChargerType.objects.create(name="DC Fast"),
+            price=Decimal("0.50"), mode="kwh", power_rating=50,
+        )
+        booking = Booking.objects.create(
+            user=driver, station=station, charger=charger,
+            vehicle=Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion"),
+            booking_date=NOW.date(), start_time=time(9, 0), end_time=time(11, 0),
+            status="in_progress", check_in_time=timezone.now(),
+        )
+        out = StringIO()
+
+        call_command("simulate_charging", booking_ids=[booking.id], samples=60, batch=20, concurrency=1, stdout=out)
+
+        self.assertIn("(200: 3)", out.getvalue())
+        self.assertEqual(ChargingTelemetry.objects.get(booking=booking).sample_count, 60)
+
+
+class StaleBookingSweeperTests(TestCase):
+    def setUp(self):
+        patcher = patch("django.utils.timezone.now", return_value=NOW)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        self.station = ChargingStation.objects.create(
+            host=host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        self.charger = Charger.objects.create(
+            name="Bay 1", station=self.station, charger_type=ChargerType.objects.create(name="DC Fast"), price=20
+        )
+        self.vehicle = Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion")
+
+    def book(self, day_offset, start, end, status, **fields):
+        return Booking.objects.create(
+            user=self.driver, station=self.station, charger=self.charger, vehicle=self.vehicle,
+            booking_date=NOW.date() + timedelta(days=day_offset), start_time=start, end_time=end,
+            status=status, **fields,
+        )
+
+    def test_sweep_moves_only_stale_bookings(self):
+        yesterday = self.book(-1, time(9, 0), time(10, 0), "pending")
+        ended = self.book(0, time(8, 0), time(9, 0), "confirmed")
+        upcoming = self.book(0, time(11, 0), time(12, 0), "pending")
+        overdue = self.book(0, time(7, 0), time(8, 0), "in_progress", check_in_time=NOW - timedelta(hours=3, minutes=30))
+        in_grace = self.book(0, time(9, 0), time(9, 45), "in_progress", check_in_time=NOW - timedelta(hours=1))
+        unpaid = self.book(-2, time(9, 0), time(10, 0), "completed", total_amount=Decimal("23.00"))
+
+        counts = sweep_stale_bookings()
+
+        self.assertEqual(counts, {"expired": 2, "completed": 1, "reminded": 1})
+        statuses = dict(Booking.objects.values_list("id", "status"))
+        self.assertEqual(statuses[yesterday.id], "cancelled")
+        self.assertEqual(statuses[ended.id], "cancelled")
+        self.assertEqual(statuses[upcoming.id], "pending")
+        self.assertEqual(statuses[in_grace.id], "in_progress")
+
+        overdue.refresh_from_db()
+        self.assertEqual(overdue.status, "completed")
+        self.assertEqual(overdue.check_out_time, NOW.replace(hour=8))
+        # 1h30 at 20/h plus the 15% platform fee
+        self.assertEqual((overdue.subtotal, overdue.total_amount), (Decimal("30.00"), Decimal("34.50")))
+
+        history = BookingStatusHistory.objects.filter(changed_by__isnull=True)
+        self.assertEqual(history.count(), 3)
+        self.assertEqual(Notification.objects.filter(user=self.driver).count(), 4)
+
+        unpaid.refresh_from_db()
+        self.assertEqual(unpaid.payment_reminded_at, NOW)
+        self.assertEqual(sweep_stale_bookings(), {"expired": 0, "completed": 0, "reminded": 0})
+
+    def test_query_count_does_not_grow_with_stale_bookings(self):
+        def sweep_queries(count, hour):
+            for i in range(count):
+                self.book(-1 - i, time(hour, 0), time(hour + 1, 0), "pending")
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(sweep_stale_bookings()["expired"], count)
+            return len(queries.captured_queries)
+
+        self.assertEqual(sweep_queries(3, 9), sweep_queries(40, 12))
+
+
+class BookingAdminChangelistTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(
+            full_name="Admin", email="admin@example.com", phone="+8801700000000", password="secret123"
+        )
+        self.vehicle = Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion")
+        self.charger_type = ChargerType.objects.create(name="AC")
+        self.client.force_login(admin)
+
+    def add_bookings(self, count):
+        for _ in range(count):
+            n = User.objects.count()
+            driver = User.objects.create_user(
+                full_name=f"Driver {n}", email=f"driver{n}@example.com", phone=f"+88017000000{n:02d}", password="secret123"
+            )
+            host = User.objects.create_user(
+                full_name=f"Host {n}", email=f"host{n}@example.com", phone=f"+88017100000{n:02d}", password="secret123"
+            )
+            station = ChargingStation.objects.create(
+                host=host, station_name=f"Depot {n}", location_area="Tejgaon", latitude=23.76, longitude=90.39
+            )
+            charger = Charger.objects.create(name="Bay", station=station, charger_type=self.charger_type)
+            Booking.objects.create(
+                user=driver, station=station, charger=charger, vehicle=self.vehicle,
+                booking_date=NOW.date(), start_time=time(10, 0), end_time=time(11, 0),
+            )
+            Review.objects.create(charging_station=station, reviewer=driver, rating=5)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for name in ("admin:bookings_booking_changelist", "admin:bookings_review_changelist"):
+            with self.subTest(name):
+                self.add_bookings(2)
+                few = self.changelist_queries(reverse(name))
+                self.add_bookings(8)
+                self.assertEqual(self.changelist_queries(reverse(name)), few)
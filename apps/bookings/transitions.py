@@ -0,0 +1,119 @@
+"""
+Booking lifecycle transitions.
+
+Every status change goes through `transition` / `transition_bookings`, which
+apply it as a conditional UPDATE (`... WHERE status = <status read>`), check
+the affected rows, append BookingStatusHistory rows in one INSERT and send a
+single `booking_transitioned` signal. A request that lost a race gets
+InvalidTransition instead of overwriting the other request's change.
+"""
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from apps.bookings.models import Booking, BookingStatusHistory
+
+# action -> (statuses it may start from, resulting status)
+TRANSITIONS = {
+    'confirm': (('pending',), 'confirmed'),
+    'reject': (('pending', 'confirmed'), 'cancelled'),
+    'cancel': (('pending', 'confirmed'), 'cancelled'),
+    'start': (('pending', 'confirmed'), 'in_progress'),
+    'complete': (('in_progress',), 'completed'),
+}
+
+# Sent once per transition call, after commit, with booking_ids,
+# old_statuses (id -> status), new_status, action and changed_by
+booking_transitioned = Signal()
+
+
+class InvalidTransition(Exception):
+    def __init__(self, booking_id, action, status):
+        self.booking_id = booking_id
+        self.action = action
+        self.status = status
+        super().__init__(f"Cannot {action} booking #{booking_id} while it is {status}.")
+
+
+def _apply(rows, action, changed_by, reason, fields):
+    """
+    rows: (booking_id, status read by the caller) pairs, all allowed sources
+    of `action`. Returns the ids that were actually moved.
+    """
+    new_status = TRANSITIONS[action][1]
+    now = timezone.now()
+    values = dict(fields, status=new_status, updated_at=now)
+
+    by_status = {}
+    for booking_id, old_status in rows:
+        by_status.setdefault(old_status, []).append(booking_id)
+
+    moved = {}
+    with transaction.atomic(savepoint=False):
+        for old_status, ids in by_status.items():
+            if len(ids) == 1:
+                updated = Booking.objects.filter(id=ids[0], status=old_status).update(**values)
+            else:
+                updated = Booking.objects.filter(id__in=ids, status=old_status).update(**values)
+            if updated == len(ids):
+                moved.update(dict.fromkeys(ids, old_status))
+            elif updated:
+                # Rows were locked by the caller, so this only happens on misuse
+                raise RuntimeError(f"Partial transition of bookings {ids} from {old_status}")
+
+        if moved:
+            BookingStatusHistory.objects.bulk_create([
+                BookingStatusHistory(
+                    booking_id=booking_id, old_status=old_status, new_status=new_status,
+                    changed_by=changed_by, reason=reason,
+                )
+                for booking_id, old_status in moved.items()
+            ])
+
+    if moved:
+        transaction.on_commit(lambda: booking_transitioned.send(
+            sender=Booking, booking_ids=list(moved), old_statuses=moved,
+            new_status=new_status, action=action, changed_by=changed_by,
+        ))
+    return list(moved)
+
+
+def transition(booking, action, changed_by, reason='', **fields):
+    """
+    Apply `action` to one booking, also setting `fields` in the same UPDATE.
+
+    `booking.status` must be the status the caller read: the UPDATE only
+    matches while the row still has it, so the history row records exactly
+    what was replaced. Raises InvalidTransition if the action is not allowed
+    from that status or the row changed in the meantime. On success the
+    instance is updated in place.
+    """
+    sources, new_status = TRANSITIONS[action]
+    if booking.status not in sources:
+        raise InvalidTransition(booking.id, action, booking.status)
+
+    if not _apply([(booking.id, booking.status)], action, changed_by, reason, fields):
+        current = Booking.objects.filter(id=booking.id).values_list('status', flat=True).first()
+        raise InvalidTransition(booking.id, action, current)
+
+    booking.status = new_status
+    for name, value in fields.items():
+        setattr(booking, name, value)
+    return booking
+
+
+def transition_bookings(queryset, action, changed_by, reason='', **fields):
+    """
+    Apply `action` to every booking in `queryset` that allows it, with one
+    UPDATE per source status and one history INSERT. Rows locked by another
+    transaction are skipped and left for the next run. Returns the moved ids.
+    """
+    sources = TRANSITIONS[action][0]
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(status__in=sources)
+            .select_for_update(skip_locked=True)
+            .values_list('id', 'status')
+        )
+        if not rows:
+            return []
+        return _apply(rows, action, changed_by, reason, fields)
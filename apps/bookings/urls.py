@@ -1,5 +1,5 @@
 from django.urls import path
-from apps.bookings.views import create_booking, submit_review, start_charging_session, stop_charging_session, get_booking_details, charging_activity, get_charging_info, pay_for_booking, stripe_webhook
+from apps.bookings.views import create_booking, submit_review, start_charging_session, scan_to_start, stop_charging_session, get_booking_details, charging_activity, ingest_telemetry, get_charging_info, pay_for_booking, stripe_webhook
 from apps.bookings.irin_views import payment_success, payment_cancel, get_charging_history, charging_history_detail, booking_list
 
 urlpatterns = [
@@ -7,7 +7,9 @@ urlpatterns = [
     path('get-booking/<int:booking_id>/details/', get_booking_details, name='booking-details'),
     path('booking-list/', booking_list, name='booking-list'),
     path('start-charging/', start_charging_session, name='start-charging'),
+    path('scan-to-start/', scan_to_start, name='scan-to-start'),
     path('charging-activity/', charging_activity, name='charging-activity'),
+    path('charging/<int:booking_id>/telemetry/', ingest_telemetry, name='charging-telemetry'),
     path('finish-charging/', stop_charging_session, name='finish-charging'),
     path('charging/<int:booking_id>/information/', get_charging_info, name='charging-information'),
     path('pay-for-booking/', pay_for_booking, name='pay-for-booking'),
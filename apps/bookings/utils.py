@@ -1,5 +1,13 @@
+from decimal import Decimal
+from datetime import time, timedelta
 from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from channels.layers import get_channel_layer
+from apps.host.models import Charger
+from apps.bookings.models import Booking
+from apps.bookings.telemetry import metered_energy
 
 def notify_user(user_id, payload):
     """
@@ -12,4 +20,116 @@ def notify_user(user_id, payload):
             "type": "booking.notification",
             "payload": payload
         }
-    )
\ No newline at end of file
+    )
+
+SCANNER_CODE_CACHE_PREFIX = 'scanner-code:'
+
+
+def resolve_scanner_code(scanner_code):
+    """
+    Return the id of the charger with this QR code, or None. The mapping never
+    changes for a charger, so it is cached for a long time and a scan at the
+    plug normally costs no query here.
+    """
+    key = f"{SCANNER_CODE_CACHE_PREFIX}{scanner_code}"
+    charger_id = cache.get(key)
+    if charger_id is None:
+        charger_id = Charger.objects.filter(scanner_code=scanner_code).values_list('id', flat=True).first()
+        if charger_id is None:
+            return None
+        cache.set(key, charger_id, getattr(settings, 'SCANNER_CODE_CACHE_TTL', 24 * 60 * 60))
+    return charger_id
+
+
+def forget_scanner_code(scanner_code):
+    cache.delete(f"{SCANNER_CODE_CACHE_PREFIX}{scanner_code}")
+
+
+def scannable_booking(user, charger_id, now):
+    """
+    The user's booking on this charger that a scan at `now` may start: one
+    that is already running, or one whose slot has begun or begins within
+    SCAN_EARLY_START_MINUTES. Served by the (charger, booking_date, ...) index.
+    Bookings at stations that were removed since are not started.
+    """
+    window_end = now + timedelta(minutes=getattr(settings, 'SCAN_EARLY_START_MINUTES', 15))
+    latest_start = window_end.time() if window_end.date() == now.date() else time.max
+    return Booking.objects.filter(
+        charger_id=charger_id,
+        booking_date=now.date(),
+        start_time__lte=latest_start,
+        end_time__gt=now.time(),
+        user=user,
+        status__in=['pending', 'confirmed', 'in_progress'],
+        station__removed_at__isnull=True,
+    ).order_by('start_time').values_list('id', 'status').first()
+
+
+def start_walk_up_session(user, charger_id, vehicle, plug, now, minutes):
+    """
+    Create an in_progress booking for a driver without one, if the charger is
+    free from now for `minutes` (capped at midnight). The charger row is locked
+    so two walk-ups on the same plug cannot both succeed.
+    Returns (booking, error).
+    """
+    with transaction.atomic():
+        charger = Charger.objects.select_related('station').select_for_update(of=('self',)).filter(id=charger_id).first()
+        if charger is None:
+            return None, 'Charger not found.'
+        if not charger.available or not charger.is_active:
+            return None, 'Charger not available.'
+        if charger.station.removed_at is not None:
+            return None, 'This station is no longer listed.'
+
+        end = now + timedelta(minutes=minutes)
+        start_time = now.time().replace(microsecond=0)
+        end_time = end.time().replace(microsecond=0) if end.date() == now.date() else time(23, 59, 59)
+
+        busy = Booking.objects.filter(
+            charger=charger,
+            booking_date=now.date(),
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+            status__in=['pending', 'confirmed', 'in_progress'],
+        ).exists()
+        if busy:
+            return None, 'This charger is booked right now.'
+
+        booking = Booking.objects.create(
+            user=user,
+            station_id=charger.station_id,
+            charger=charger,
+            plug=plug,
+            vehicle=vehicle,
+            booking_date=now.date(),
+            start_time=start_time,
+            end_time=end_time,
+            hourly_rate=charger.price,
+            payment_date=now.date(),
+            status='in_progress',
+            check_in_time=now,
+        )
+    return booking, None
+
+
+def calculate_charges(booking, check_out_time):
+    """
+    Subtotal and total (with the 15% platform fee) of a session ending at
+    check_out_time, plus the metered energy if the charger reported any.
+    Hourly chargers bill started minutes; per-kWh chargers bill metered energy.
+    """
+    duration_seconds = (check_out_time - booking.check_in_time).total_seconds()
+    duration_hours = int(duration_seconds // 3600)
+    duration_minutes = int((duration_seconds % 3600) // 60)
+
+    price_per_hour = booking.charger.price
+    subtotal = price_per_hour * Decimal(str(duration_hours))
+    if duration_minutes > 0:
+        subtotal += price_per_hour / 60 * Decimal(str(duration_minutes))
+
+    energy_kwh = metered_energy(booking)
+    if booking.charger.mode == 'kwh' and energy_kwh is not None:
+        subtotal = booking.charger.price * energy_kwh
+
+    total_amount = subtotal + subtotal * Decimal('0.15')
+    return subtotal.quantize(Decimal('0.01')), total_amount.quantize(Decimal('0.01')), energy_kwh
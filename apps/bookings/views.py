@@ -9,13 +9,17 @@ from  rest_framework import status
 from django.http import HttpResponse
 # from apps.host.models import Charger
 # from apps.Stripe.models import Payment
-from apps.bookings.utils import notify_user
+from apps.bookings.utils import (
+    calculate_charges, notify_user, resolve_scanner_code, forget_scanner_code, scannable_booking, start_walk_up_session,
+)
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.exceptions import NotFound
 from apps.bookings.models import Booking, Review
+from apps.bookings.transitions import transition, InvalidTransition
+from apps.bookings.telemetry import TelemetryError, broadcast_progress, ingest_samples, session_progress, usage_kwh
 from apps.Stripe.utils import setup_stripe_payment
-from apps.driver.models import Vehicle, UserVehicle
+from apps.driver.models import Vehicle, UserVehicle, PlugType
 from django.views.decorators.csrf import csrf_exempt
 from stripe._error import SignatureVerificationError
 from rest_framework.permissions import IsAuthenticated
@@ -49,6 +53,8 @@ def create_booking(request):
 
     if not charger.available or not charger.is_active:
         return Response({'error': 'Charger not available.'}, status=status.HTTP_400_BAD_REQUEST)
+    if charger.station.removed_at is not None:
+        return Response({'error': 'This station is no longer listed.'}, status=status.HTTP_400_BAD_REQUEST)
 
     booking_date = serializer.validated_data['booking_date']
     start_time = serializer.validated_data['start_time']
@@ -87,10 +93,7 @@ def create_booking(request):
         payment_date=booking_date,
         status='pending'
     )
-    print("User:", user.get_full_name())  
-    print("Host:", station.host.get_full_name()) 
-    print("Station:", station.station_name)
-    
+
     data = BookingSerializer(booking).data
     return Response(data, status=status.HTTP_201_CREATED)
 
@@ -195,24 +198,120 @@ def start_charging_session(request):
     
     try:
         booking = Booking.objects.get(id=booking_id, user=request.user)
-        booking.status = 'in_progress'
-        booking.check_in_time = timezone.now()
-        booking.save(update_fields=['status','check_in_time'])     
+        transition(booking, 'start', request.user, check_in_time=timezone.now())
         return Response({'message':'Charging started', 'booking_id': booking.id})
     
     except Booking.DoesNotExist:
         raise NotFound({'error': 'Booking not found or does not belong to the user.'})
 
+    except InvalidTransition as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+
     except Exception as e:
         return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def scan_to_start(request):
+    """
+    Start charging from the charger's QR code. Starts the driver's current or
+    imminent booking on that charger, or a walk-up session if the charger is free.
+    """
+    scanner_code = request.data.get('scanner_code')
+    if not scanner_code:
+        return Response({'error': 'scanner_code is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    charger_id = resolve_scanner_code(scanner_code)
+    if charger_id is None:
+        return Response({'error': 'Unknown charger code.'}, status=status.HTTP_404_NOT_FOUND)
+
+    now = timezone.localtime()
+    booking = scannable_booking(request.user, charger_id, now)
+    if booking:
+        booking_id, booking_status = booking
+        if booking_status == 'in_progress':
+            return Response({'message': 'Charging already in progress', 'booking_id': booking_id})
+        try:
+            transition(Booking(id=booking_id, status=booking_status), 'start', request.user, check_in_time=now)
+        except InvalidTransition:
+            return Response({'error': 'Booking was changed by another request.'}, status=status.HTTP_409_CONFLICT)
+        return Response({'message': 'Charging started', 'booking_id': booking_id, 'walk_up': False})
+
+    if getattr(request.user, 'role', 'user') != 'user':
+        return Response({'error': 'Only users can start charging sessions.'}, status=status.HTTP_403_FORBIDDEN)
+
+    vehicle = Vehicle.objects.filter(id=request.data.get('vehicle_id')).first()
+    if vehicle is None:
+        return Response({'error': 'vehicle_id is required for a walk-up session.'}, status=status.HTTP_400_BAD_REQUEST)
+    plug = PlugType.objects.filter(id=request.data.get('plug_id')).first() if request.data.get('plug_id') else None
+
+    try:
+        minutes = int(request.data.get('duration_minutes') or settings.SCAN_WALK_UP_MINUTES)
+    except (TypeError, ValueError):
+        return Response({'error': 'duration_minutes must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= minutes <= 24 * 60:
+        return Response({'error': 'duration_minutes must be between 1 and 1440.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    walk_up, error = start_walk_up_session(request.user, charger_id, vehicle, plug, now, minutes)
+    if walk_up is None:
+        if error == 'Charger not found.':
+            forget_scanner_code(scanner_code)
+            return Response({'error': error}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'error': error}, status=status.HTTP_409_CONFLICT)
+
+    return Response({
+        'message': 'Charging started',
+        'booking_id': walk_up.id,
+        'walk_up': True,
+        'end_time': str(walk_up.end_time),
+    }, status=status.HTTP_201_CREATED)
+
+
+
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def charging_activity(request):
-    pass
+    """
+    Live progress of the user's charging sessions that are in progress.
+    """
+    bookings = Booking.objects.select_related('charger', 'station', 'telemetry').filter(
+        user=request.user, status='in_progress'
+    )
+    sessions = []
+    for booking in bookings:
+        progress = session_progress(booking)
+        progress['station_name'] = booking.station.station_name
+        progress['charger_name'] = booking.charger.name
+        sessions.append(progress)
+    return Response({'sessions': sessions}, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def ingest_telemetry(request, booking_id):
+    """
+    Append a batch of meter samples to a session in progress. kWh chargers
+    bill these readings, so only the station's host (the account the charger
+    reports through) may send them; drivers follow progress read-only.
+    """
+    booking = Booking.objects.select_related('charger').filter(
+        station__host=request.user, id=booking_id, status='in_progress'
+    ).first()
+    if booking is None:
+        return Response({'error': 'Booking not found or not in progress.'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        progress = ingest_samples(booking, request.data.get('samples'))
+    except TelemetryError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    broadcast_progress(progress)
+    return Response(progress, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -222,43 +321,32 @@ def stop_charging_session(request):
     booking_id = request.data.get('booking_id')
     
     try:
-        booking = Booking.objects.get(id=booking_id, user=request.user, status='in_progress')
+        booking = Booking.objects.select_related('charger', 'telemetry').get(id=booking_id, user=request.user, status='in_progress')
 
-        booking.check_out_time = timezone.now()
-        booking.status = 'completed'
+        check_out_time = timezone.now()
 
         # Calculate the duration in seconds and then break it into hours, minutes, and seconds
-        duration_seconds = (booking.check_out_time - booking.check_in_time).total_seconds()
+        duration_seconds = (check_out_time - booking.check_in_time).total_seconds()
         duration_hours = int(duration_seconds // 3600)
         duration_minutes = int((duration_seconds % 3600) // 60)
         duration_seconds = int(duration_seconds % 60) 
 
-        # Pricing logic
-        price_per_hour = booking.charger.price 
-        price_per_minute = price_per_hour / 60  
-        
-        # Calculate subtotal based on duration
-        subtotal = price_per_hour * Decimal(str(duration_hours))
-        
-        # If there are remaining minutes, calculate and add the minute price
-        if duration_minutes > 0:
-            extra_minutes_price = price_per_minute * Decimal(str(duration_minutes))
-            subtotal += extra_minutes_price
-
-        # Platform fee (15% of subtotal)
-        platform_fee = subtotal * Decimal('0.15')
-        total_amount = subtotal + platform_fee
+        subtotal, total_amount, energy_kwh = calculate_charges(booking, check_out_time)
 
-        # Update booking with calculated values
-        booking.subtotal = subtotal.quantize(Decimal('0.01'))
-        booking.total_amount = total_amount.quantize(Decimal('0.01'))
-        booking.save(update_fields=['check_out_time', 'status', 'subtotal', 'total_amount'])
+        # Complete the booking with the calculated values in one conditional update
+        transition(
+            booking, 'complete', request.user,
+            check_out_time=check_out_time,
+            subtotal=subtotal,
+            total_amount=total_amount,
+        )
 
         return Response({
             'message': 'Charging completed',
             'duration_hours': duration_hours,
             'duration_minutes': duration_minutes,
             'duration_seconds': duration_seconds,
+            'energy_kwh': str(energy_kwh) if energy_kwh is not None else None,
             'subtotal': str(booking.subtotal),
             'platform_fee': str(booking.platform_fee),
             'total_amount': str(booking.total_amount)
@@ -266,6 +354,9 @@ def stop_charging_session(request):
 
     except Booking.DoesNotExist:
         return Response({'error': "Booking not found or not in progress."}, status=status.HTTP_404_NOT_FOUND)
+
+    except InvalidTransition as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
     
     except Exception as e:
         return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -280,7 +371,7 @@ def stop_charging_session(request):
 def get_charging_info(request, booking_id):
     try:
         booking = Booking.objects.select_related(
-            'vehicle', 'station__host', 'charger'
+            'vehicle', 'station__host', 'charger', 'telemetry'
         ).get(id=booking_id, user=request.user, status='completed')
         
         # vehicle = booking.vehicle
@@ -294,10 +385,7 @@ def get_charging_info(request, booking_id):
         charging_station = booking.station
         charger = booking.charger
             
-        duration_seconds = (booking.check_out_time - booking.check_in_time).total_seconds()
-        duration_hours = duration_seconds / 3600  
-        
-        usage_kwh = booking.charger.power_rating * Decimal(str(duration_hours))
+        usage = usage_kwh(booking)
 
 
         data = {
@@ -306,7 +394,7 @@ def get_charging_info(request, booking_id):
             "station_name": charging_station.station_name,
             "check_in_time": booking.check_in_time.strftime("%Y-%m-%d %H:%M:%S") if booking.check_in_time else "N/A",
             "check_out_time": booking.check_out_time.strftime("%Y-%m-%d %H:%M:%S") if booking.check_out_time else "N/A",
-            "usage_kwh": str(round(usage_kwh, 2)) + " kWh",
+            "usage_kwh": str(round(usage, 2)) + " kWh",
             "platform_fee": str(booking.platform_fee) + "$"
         }
 
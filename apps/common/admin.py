@@ -1,6 +1,6 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
-from apps.common.models import HelpSupport, PrivacyPolicy, TermsConditions, Notification
+from apps.common.models import HelpSupport, PrivacyPolicy, TermsConditions, Notification, EmailOutbox
 
 
 # ----------------------------
@@ -150,3 +150,19 @@ class NotificationAdmin(ModelAdmin):
 
     def unfold_ui_config(self):
         return self.unfold_config
+
+
+# ----------------------------
+# Email Outbox Admin
+# ----------------------------
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(ModelAdmin):
+    list_display = ["id", "subject", "recipients", "status", "attempts", "next_attempt_at", "created_at", "sent_at"]
+    list_filter = ["status", "created_at"]
+    search_fields = ["subject", "to"]
+    readonly_fields = ["attempts", "last_error", "created_at", "sent_at"]
+    list_per_page = 25
+
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+    recipients.short_description = "To"
@@ -0,0 +1,129 @@
+"""
+Read replica routing.
+
+Reads go to the primary unless a view opts in with @replica_reads (the
+listing endpoints: stations, booking history, chat lists). Within such a
+view the router falls back to the primary when
+
+- no replica alias is configured (DB_REPLICA_HOST or, for SQLite,
+  DB_REPLICA_NAME; see src/settings.py);
+- the request user changed a booking in the last DB_REPLICA_PIN_SECONDS, so
+  they read their own writes rather than a lagging copy;
+- the view already wrote something (select_for_update counts as a write);
+- the replica reports more than DB_REPLICA_MAX_LAG_SECONDS of lag (PostgreSQL
+  only, checked at most every REPLICA_LAG_CHECK_INTERVAL seconds).
+
+State is kept in context variables, so it is per request under both WSGI
+threads and Daphne's async workers.
+"""
+import time
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+REPLICA_ALIAS = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+PIN_SECONDS = getattr(settings, 'DB_REPLICA_PIN_SECONDS', 5)
+MAX_LAG_SECONDS = getattr(settings, 'DB_REPLICA_MAX_LAG_SECONDS', 5)
+REPLICA_LAG_CHECK_INTERVAL = 10
+PIN_CACHE_PREFIX = 'db-pin:'
+
+_use_replica = ContextVar('use_replica', default=False)
+_wrote = ContextVar('wrote', default=False)
+# Last lag reading; seconds is None when the replica could not be queried
+_lag = {'checked_at': float('-inf'), 'seconds': 0}
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def pin_to_primary(user_id):
+    """Send `user_id`'s replica reads to the primary until the replica caught up."""
+    if user_id and PIN_SECONDS:
+        cache.set(f'{PIN_CACHE_PREFIX}{user_id}', 1, PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return bool(user_id) and cache.get(f'{PIN_CACHE_PREFIX}{user_id}') is not None
+
+
+def replica_lag():
+    """Replay lag of the replica in seconds, None if it could not be read."""
+    now = time.monotonic()
+    if now - _lag['checked_at'] < REPLICA_LAG_CHECK_INTERVAL:
+        return _lag['seconds']
+    connection = connections[REPLICA_ALIAS]
+    seconds = 0
+    if connection.vendor == 'postgresql':
+        try:
+            with connection.cursor() as cursor:
+                # An idle primary sends no new transactions; fully replayed WAL is no lag
+                cursor.execute(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                )
+                row = cursor.fetchone()
+            seconds = float(row[0]) if row and row[0] is not None else 0
+        except Exception as e:
+            print("Replica router: could not read replica lag", e)
+            seconds = None
+    _lag.update(checked_at=now, seconds=seconds)
+    return seconds
+
+
+def replica_usable():
+    if not replica_configured():
+        return False
+    lag = replica_lag()
+    return lag is not None and lag <= MAX_LAG_SECONDS
+
+
+def replica_reads(view):
+    """
+    Lets a read-only DRF view read from the replica (place it below
+    @permission_classes, so request.user is the authenticated user).
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        use_replica = replica_usable() and not is_pinned(request.user.pk)
+        use_token = _use_replica.set(use_replica)
+        wrote_token = _wrote.set(False)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _wrote.reset(wrote_token)
+            _use_replica.reset(use_token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get() or _wrote.get():
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Later reads of the same view must see this write
+        _wrote.set(True)
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+def pin_booking_user(sender, instance, **kwargs):
+    """post_save receiver for Booking."""
+    pin_to_primary(instance.user_id)
+
+
+def pin_transition_actor(sender, changed_by=None, **kwargs):
+    """booking_transitioned receiver; system transitions have no actor to pin."""
+    if changed_by is not None:
+        pin_to_primary(changed_by.pk)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATED_COUNT_THRESHOLD = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin paginator that skips COUNT(*) on large unfiltered changelists.
+
+    On PostgreSQL the planner's row estimate (pg_class.reltuples) is used once
+    it passes ADMIN_ESTIMATED_COUNT_THRESHOLD; smaller tables, filtered or
+    searched lists and other databases get the exact count. Pair it with
+    `show_full_result_count = False` so the admin does not count twice.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+    def estimated_count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None or query.where or query.distinct:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        return row[0] if row and row[0] > 0 else None
@@ -0,0 +1,8 @@
+from celery import shared_task
+from apps.common.utils import drain_outbox
+
+
+@shared_task(ignore_result=True)
+def send_outbox():
+    sent, failed = drain_outbox()
+    return f"Email outbox: {sent} sent, {failed} failed"
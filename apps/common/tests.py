@@ -1,3 +1,159 @@
+from datetime import date, time, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
 from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+from apps.bookings.models import Booking
+from apps.bookings.transitions import transition_bookings
+from apps.common import db_router, utils
+from apps.common.db_router import ReplicaRouter, replica_reads
+from apps.common.models import EmailOutbox, Notification
+from apps.common.utils import drain_outbox, queue_email
+from apps.driver.models import Vehicle
+from apps.host.models import Charger, ChargerType, ChargingStation
 
-# Create your tests here.
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+
+    def test_forget_password_queues_otp_without_sending(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = APIClient().post(reverse('forgot-password'), {"email": "driver@example.com"}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(callbacks), 1)
+
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.to, ["driver@example.com"])
+        self.user.refresh_from_db()
+        self.assertIn(self.user.otp, queued.html_body)
+        self.assertAlmostEqual(
+            (self.user.otp_expiry - timezone.now()).total_seconds(), 5 * 60, delta=5
+        )
+
+    def test_drain_sends_batch_over_one_connection(self):
+        for i in range(3):
+            queue_email(f"Subject {i}", [f"user{i}@example.com"], html_message="<p>Hi</p>")
+
+        with patch("apps.common.utils.get_connection", wraps=utils.get_connection) as get_connection:
+            sent, failed = drain_outbox()
+
+        self.assertEqual((sent, failed), (3, 0))
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+        # Delivered bodies (OTPs, reset links) are not kept
+        self.assertFalse(EmailOutbox.objects.exclude(html_body="").exists())
+
+    def test_failed_sends_back_off_then_give_up(self):
+        queue_email("Subject", ["user@example.com"], body="Hi")
+
+        with patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("SMTP down")):
+            self.assertEqual(drain_outbox(), (0, 1))
+            email = EmailOutbox.objects.get()
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=20))
+
+            # Not due yet
+            self.assertEqual(drain_outbox(), (0, 0))
+
+            for _ in range(utils.OUTBOX_MAX_ATTEMPTS - 1):
+                EmailOutbox.objects.update(next_attempt_at=timezone.now())
+                drain_outbox()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+        self.assertIn("SMTP down", email.last_error)
+        self.assertEqual(email.body, "")
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@replica_reads
+def read_alias(request):
+    """Stands in for a listing view: the alias its queries would use."""
+    return Booking.objects.all().db
+
+
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        db_router._lag.update(checked_at=float("-inf"), seconds=0)
+        # A second SQLite alias; only routing is checked, nothing is queried on it
+        replica = patch.dict(settings.DATABASES, replica={**settings.DATABASES["default"], "NAME": ":memory:"})
+        replica.start()
+        self.addCleanup(replica.stop)
+
+        self.driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+
+    def request(self, user):
+        return SimpleNamespace(user=user)
+
+    def book(self):
+        station = ChargingStation.objects.create(
+            host=self.host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        charger = Charger.objects.create(
+            name="Bay 1", station=station, charger_type=ChargerType.objects.create(name="DC Fast"), price=20
+        )
+        return Booking.objects.create(
+            user=self.driver, station=station, charger=charger,
+            vehicle=Vehicle.objects.create(name="Leaf", vehicle_type="CAR", battery_type="Li-ion"),
+            booking_date=date(2030, 1, 1), start_time=time(9, 0), end_time=time(9, 59),
+        )
+
+    def test_listing_views_read_from_replica(self):
+        self.assertEqual(read_alias(self.request(self.driver)), "replica")
+        # Undecorated code keeps reading from the primary
+        self.assertEqual(Booking.objects.all().db, "default")
+
+    def test_reads_stay_on_primary_without_replica(self):
+        del settings.DATABASES["replica"]
+        self.assertEqual(read_alias(self.request(self.driver)), "default")
+
+    def test_reads_after_a_write_in_the_same_view_use_primary(self):
+        @replica_reads
+        def view(request):
+            Notification.objects.create(user=request.user, message="Hi")
+            return Booking.objects.all().db
+
+        self.assertEqual(view(self.request(self.driver)), "default")
+        # The next request starts unpinned
+        self.assertEqual(read_alias(self.request(self.driver)), "replica")
+
+    def test_user_who_changed_a_booking_reads_from_primary(self):
+        booking = self.book()
+
+        self.assertEqual(read_alias(self.request(self.driver)), "default")
+        self.assertEqual(read_alias(self.request(self.host)), "replica")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_bookings(Booking.objects.filter(id=booking.id), "confirm", self.host)
+        self.assertEqual(read_alias(self.request(self.host)), "default")
+
+    def test_lagging_replica_is_skipped(self):
+        with patch("apps.common.db_router.replica_lag", return_value=db_router.MAX_LAG_SECONDS + 1):
+            self.assertEqual(read_alias(self.request(self.driver)), "default")
+        with patch("apps.common.db_router.replica_lag", return_value=None):
+            self.assertEqual(read_alias(self.request(self.driver)), "default")
+
+    def test_replica_is_never_migrated(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate("replica", "bookings"))
+        self.assertTrue(router.allow_migrate("default", "bookings"))
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.core.mail import EmailMultiAlternatives, get_connection
+from apps.common.models import EmailOutbox
+
+
+OUTBOX_BATCH_SIZE = getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+OUTBOX_BACKOFF_SECONDS = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_SECONDS', 30)
+OUTBOX_MAX_BACKOFF_SECONDS = 60 * 60
+# A claimed row becomes due again after this long, in case its worker died mid-batch
+OUTBOX_LEASE_SECONDS = 5 * 60
+
+
+def queue_email(subject, to, body="", html_message=None, from_email=None, reply_to=None):
+    """
+    Store an email in the outbox and wake the worker once the surrounding
+    transaction commits. Returns immediately; delivery happens in send_outbox.
+    """
+    email = EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_message or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL or "",
+        to=list(to),
+        reply_to=list(reply_to or []),
+    )
+    transaction.on_commit(wake_outbox_worker)
+    return email
+
+
+def wake_outbox_worker():
+    from apps.common.tasks import send_outbox
+    try:
+        send_outbox.apply_async(retry=False)
+    except Exception as e:
+        # Broker down: the periodic beat run will pick the email up
+        print("Email outbox: could not enqueue send_outbox", e)
+
+
+def backoff_delay(attempts):
+    return timedelta(seconds=min(OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+def claim_batch(batch_size):
+    """Lease a batch of due emails so concurrent workers don't send them twice."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if batch:
+            EmailOutbox.objects.filter(id__in=[email.id for email in batch]).update(
+                next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+            )
+    return batch
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+        reply_to=email.reply_to or None,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def mark_failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    if email.attempts >= OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+        # Never retried again; don't keep one-time codes around
+        email.body = email.html_body = ""
+    else:
+        email.next_attempt_at = timezone.now() + backoff_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'body', 'html_body'])
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE, max_batches=20):
+    """
+    Send due emails in batches, reusing one SMTP connection per batch.
+    Failed emails are retried with exponential backoff until OUTBOX_MAX_ATTEMPTS.
+    Bodies are cleared once an email is sent or gives up, so OTPs and reset
+    links don't outlive delivery in the table. Returns (sent, failed) counts.
+    """
+    sent = failed = 0
+
+    for _ in range(max_batches):
+        batch = claim_batch(batch_size)
+        if not batch:
+            break
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            print("Email outbox: SMTP connection failed", e)
+            for email in batch:
+                mark_failed(email, e)
+            failed += len(batch)
+            break
+
+        delivered = []
+        try:
+            for email in batch:
+                try:
+                    build_message(email, connection).send()
+                except Exception as e:
+                    print("Email outbox: sending failed", email.id, e)
+                    mark_failed(email, e)
+                    failed += 1
+                else:
+                    delivered.append(email.id)
+        finally:
+            connection.close()
+
+        if delivered:
+            EmailOutbox.objects.filter(id__in=delivered).update(
+                status='sent', sent_at=timezone.now(), last_error="", body="", html_body=""
+            )
+            sent += len(delivered)
+
+    return sent, failed
@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from .models import *
 from .serializers import *
-from django.core.mail import EmailMessage
+from apps.common.utils import queue_email
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
@@ -45,14 +45,13 @@ def support(request):
         message = serializer.validated_data['message']
 
         try:
-            email = EmailMessage(
-                subject=subject,
+            queue_email(
+                subject,
+                [settings.DEFAULT_FROM_EMAIL],
                 body=message,
                 from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[settings.DEFAULT_FROM_EMAIL],
                 reply_to=[email_address],
             )
-            email.send(fail_silently=False)
             return Response({"message": "Your support request has been submitted successfully."}, status=status.HTTP_200_OK)
 
         except Exception as e:
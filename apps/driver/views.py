@@ -4,6 +4,7 @@ from rest_framework import status
 from rest_framework.response import Response
 from apps.driver.models import Vehicle, PlugType, UserVehicle
 from apps.driver.utils import calculate_distance
+from apps.common.db_router import replica_reads
 from rest_framework.permissions import IsAuthenticated
 from apps.host.models import ChargingStation, Charger, ChargerType
 from apps.host.serializers import ChargingStationSerializer, ChargerSerializer, ChargerTypeSerializer
@@ -191,6 +192,7 @@ def chunks(lst, n):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def nearby_stations(request):
 
     station_id = request.query_params.get('station_id', None)
@@ -206,7 +208,7 @@ def nearby_stations(request):
     lon = float(lon)
 
     # Fetch all stations first
-    all_stations = list(ChargingStation.objects.all())
+    all_stations = list(ChargingStation.objects.filter(removed_at__isnull=True))
     stations_with_info = []
 
     # Calculate distances in chunks
@@ -1,18 +1,24 @@
 import os
+import sys
 import requests
-from openai import OpenAI
 
 # --- Initialization ---
 # It's best practice to load API keys from environment variables
 # For OpenAI API key: https://platform.openai.com/account/api-keys
 # For Google Maps API key: https://console.cloud.google.com/google/maps-apis
-try:
-    GOOGLE_MAPS_API_KEY = os.environ["GOOGLE_MAPS_API_KEY"]
-    OPENAI_API_KEY = os.environ["OPENAI_API_KEY"]
-    client = OpenAI(api_key=OPENAI_API_KEY)
-except KeyError:
-    print("🚨 Critical Error: Make sure to set GOOGLE_MAPS_API_KEY and OPENAI_API_KEY environment variables.")
-    exit()
+GOOGLE_MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY")
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+
+_client = None
+
+
+def get_client():
+    """Create the OpenAI client on first use instead of at import time."""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=OPENAI_API_KEY)
+    return _client
 
 def find_nearest_charging_stations(lat: float, lng: float, radius: int = 5000):
     """
@@ -70,7 +76,7 @@ def get_intent(user_message: str, chat_history):
     Respond with ONLY the intent label (find_station / general_info / other).
     """
     try:
-        result = client.chat.completions.create(
+        result = get_client().chat.completions.create(
            model="gpt-4o-mini",
            messages=[{"role": "user", "content": prompt}],
            temperature=0,
@@ -124,7 +130,7 @@ def chatbot_response(user_message: str, chat_history: list, lat: float = None, l
     """
     
     try:
-        completion = client.chat.completions.create(
+        completion = get_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_instruction},
@@ -141,6 +147,10 @@ def chatbot_response(user_message: str, chat_history: list, lat: float = None, l
 # Example usage with conversation loop
 # -----------------------------
 if __name__ == "__main__":
+    if not GOOGLE_MAPS_API_KEY or not OPENAI_API_KEY:
+        print("🚨 Critical Error: Make sure to set GOOGLE_MAPS_API_KEY and OPENAI_API_KEY environment variables.")
+        sys.exit(1)
+
     # In a real application, you'd get this from the user's browser/device
     user_latitude, user_longitude = 12.9716, 77.5946
     
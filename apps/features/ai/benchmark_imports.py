@@ -0,0 +1,91 @@
+"""
+Import-time benchmark for the AI chat stack.
+
+Starts fresh interpreters that set up Django and import a module, and reports
+the median wall time and whether the OpenAI SDK got loaded. Run from the
+project root:
+
+    python -m apps.features.ai.benchmark_imports [--runs 7] [module ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "apps.features.chat.views",
+    "apps.features.chat.consumers",
+    "src.urls",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+__import__({module!r})
+end = time.perf_counter()
+print(json.dumps({{
+    "setup": setup_done - start,
+    "import": end - setup_done,
+    "openai_loaded": "openai" in sys.modules,
+}}))
+"""
+
+
+def measure(module, runs, env):
+    """
+    Import a module in fresh interpreters.
+
+    Args:
+        module: Dotted module path
+        runs: Number of interpreter launches
+        env: Environment for the child processes
+
+    Returns:
+        Dict with median timings in milliseconds and the OpenAI flag
+    """
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            capture_output=True, text=True, env=env, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    return {
+        "module": module,
+        "setup_ms": statistics.median(s["setup"] for s in samples) * 1000,
+        "import_ms": statistics.median(s["import"] for s in samples) * 1000,
+        "openai_loaded": any(s["openai_loaded"] for s in samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker import time.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+
+    print(f"{'module':<34}{'django.setup':>14}{'import':>10}{'openai':>8}")
+    for module in args.modules:
+        try:
+            result = measure(module, args.runs, env)
+        except subprocess.CalledProcessError as e:
+            last_line = (e.stderr.strip().splitlines() or ["?"])[-1]
+            print(f"{module:<34}  failed: {last_line}")
+            continue
+        print(
+            f"{result['module']:<34}{result['setup_ms']:>12.0f}ms{result['import_ms']:>8.0f}ms"
+            f"{'yes' if result['openai_loaded'] else 'no':>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Response caching for EV Charging Chatbot.
+Caches answers to FAQ-style questions (exact match on a normalized question,
+optionally nearest-neighbour on embeddings) and Places lookups per geo cell.
+"""
+import math
+import operator
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from cachetools import TTLCache
+from apps.features.ai.config import config
+
+# Words that don't change what is being asked
+FILLER_WORDS = {
+    "a", "an", "the", "please", "pls", "can", "could", "would", "you", "me", "tell",
+    "i", "want", "to", "know", "do", "does", "is", "are", "hey", "hi", "so",
+}
+
+_PUNCTUATION_RE = re.compile(r"[^a-z0-9\s]")
+
+
+def normalize_question(text: str) -> str:
+    """
+    Normalize a question so trivial rewordings share a cache key.
+
+    Args:
+        text: Raw user question
+
+    Returns:
+        Lowercased question without punctuation and filler words
+    """
+    words = _PUNCTUATION_RE.sub(" ", (text or "").lower()).split()
+    kept = [w for w in words if w not in FILLER_WORDS]
+    return " ".join(kept or words)
+
+
+class LocalBackend:
+    """In-process TTL + LRU store; each worker process keeps its own copy."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        """
+        Initialize the store.
+
+        Args:
+            maxsize: Max entries before least recently used ones are evicted
+            ttl: Seconds an entry stays valid
+        """
+        self._data = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: Any, value: Any):
+        with self._lock:
+            self._data[key] = value
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        with self._lock:
+            # Expired entries are dropped on access, so copy the live ones
+            self._data.expire()
+            return list(self._data.items())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.counts = {"hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+        lookups = counts["hits"] + counts["semantic_hits"] + counts["misses"]
+        counts["hit_rate"] = round((lookups - counts["misses"]) / lookups, 3) if lookups else 0.0
+        return counts
+
+
+def _unit(vector: List[float]) -> List[float]:
+    """Scale a vector to unit length so cosine similarity is a dot product."""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class ResponseCache:
+    """Cache of generated answers keyed by normalized question."""
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[int] = None,
+        embedder: Optional[Callable[[str], Optional[List[float]]]] = None,
+        similarity_threshold: Optional[float] = None,
+        backend: Optional[LocalBackend] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Max cached answers (default from config)
+            ttl: Seconds an answer stays valid (default from config)
+            embedder: Optional callable(text) -> embedding used for
+                nearest-neighbour lookups when there is no exact match
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            backend: Storage backend (default LocalBackend)
+        """
+        self.backend = backend or LocalBackend(
+            maxsize or config.response_cache_size,
+            ttl or config.response_cache_ttl
+        )
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold or config.response_cache_similarity
+        self.stats = CacheStats()
+
+    def get(self, question: str, namespace: str = "") -> Tuple[Optional[str], Optional[List[float]]]:
+        """
+        Look up a cached answer.
+
+        Args:
+            question: The user's question
+            namespace: Separates answers produced under different prompts (e.g. intent)
+
+        Returns:
+            Tuple of (answer or None, query embedding or None). Pass the
+            embedding back to set() so it is not computed twice.
+        """
+        key = (namespace, normalize_question(question))
+        entry = self.backend.get(key)
+        if entry is not None:
+            self.stats.incr("hits")
+            return entry["answer"], None
+
+        embedding = self._embed(question)
+        if embedding is not None:
+            answer = self._nearest(namespace, embedding)
+            if answer is not None:
+                self.stats.incr("semantic_hits")
+                return answer, embedding
+
+        self.stats.incr("misses")
+        return None, embedding
+
+    def set(self, question: str, answer: str, namespace: str = "", embedding: Optional[List[float]] = None):
+        """
+        Store an answer.
+
+        Args:
+            question: The user's question
+            answer: Generated answer
+            namespace: Same namespace used for get()
+            embedding: Query embedding returned by get(), if any
+        """
+        if embedding is None and self.embedder is not None:
+            embedding = self._embed(question)
+        key = (namespace, normalize_question(question))
+        self.backend.set(key, {"answer": answer, "embedding": embedding})
+        self.stats.incr("stores")
+
+    def clear(self):
+        self.backend.clear()
+        self.stats.reset()
+
+    def _embed(self, question: str) -> Optional[List[float]]:
+        if self.embedder is None:
+            return None
+        try:
+            embedding = self.embedder(question)
+        except Exception as e:
+            print(f"Error embedding question for cache lookup: {e}")
+            return None
+        return _unit(embedding) if embedding else None
+
+    def _nearest(self, namespace: str, embedding: List[float]) -> Optional[str]:
+        """Return the answer of the most similar cached question above the threshold."""
+        best_score, best_answer = self.similarity_threshold, None
+        for (entry_namespace, _), entry in self.backend.items():
+            if entry_namespace != namespace or entry["embedding"] is None:
+                continue
+            score = sum(map(operator.mul, embedding, entry["embedding"]))
+            if score >= best_score:
+                best_score, best_answer = score, entry["answer"]
+        return best_answer
+
+
+class GeoCellCache:
+    """Caches Places results per rounded-coordinate cell and radius."""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[int] = None, decimals: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Max cached cells (default from config)
+            ttl: Seconds a cell stays valid (default from config)
+            decimals: Coordinate rounding; 3 decimals is a ~110 m cell
+        """
+        self.backend = LocalBackend(maxsize or config.places_cache_size, ttl or config.places_cache_ttl)
+        self.decimals = config.places_cache_cell_decimals if decimals is None else decimals
+        self.stats = CacheStats()
+
+    def key(self, lat: float, lng: float, radius: int) -> Tuple[float, float, int]:
+        return (round(lat, self.decimals), round(lng, self.decimals), radius)
+
+    def get(self, lat: float, lng: float, radius: int) -> Optional[str]:
+        value = self.backend.get(self.key(lat, lng, radius))
+        self.stats.incr("misses" if value is None else "hits")
+        return value
+
+    def set(self, lat: float, lng: float, radius: int, value: str):
+        self.backend.set(self.key(lat, lng, radius), value)
+        self.stats.incr("stores")
+
+    def clear(self):
+        self.backend.clear()
+        self.stats.reset()
+
+
+_response_cache = None
+_places_cache = None
+_init_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Return the process-wide answer cache. Embedding lookups are used when
+    RESPONSE_CACHE_EMBEDDINGS is enabled.
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _init_lock:
+            if _response_cache is None:
+                embedder = None
+                if config.response_cache_embeddings:
+                    from apps.features.ai.services import OpenAIService
+                    embedder = OpenAIService().embed
+                _response_cache = ResponseCache(embedder=embedder)
+    return _response_cache
+
+
+def get_places_cache() -> GeoCellCache:
+    """Return the process-wide Places geo-cell cache."""
+    global _places_cache
+    if _places_cache is None:
+        with _init_lock:
+            if _places_cache is None:
+                _places_cache = GeoCellCache()
+    return _places_cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return hit/miss metrics of both caches."""
+    return {
+        "responses": get_response_cache().stats.snapshot(),
+        "places": get_places_cache().stats.snapshot(),
+    }
@@ -2,17 +2,39 @@
 Main chatbot logic for EV Charging Assistant.
 Coordinates intent detection, service calls, and response generation.
 """
-from typing import Optional, Tuple
-from apps.features.ai.services import GoogleMapsService, OpenAIService
+import threading
+from typing import AsyncIterator, Optional, Tuple
+from asgiref.sync import sync_to_async
+from apps.features.ai.cache import get_response_cache
+from apps.features.ai.config import config
+from apps.features.ai.intent import get_intent_classifier, log_intent_example
+from apps.features.ai.services import ERROR_RESPONSE, GoogleMapsService, OpenAIService
+from apps.features.ai.tools import TOOLS, ToolExecutor
 
 
 class EVChargingChatbot:
     """Main chatbot class orchestrating all interactions."""
     
-    def __init__(self):
-        """Initialize chatbot with required services."""
-        self.openai_service = OpenAIService()
+    TOOLS_SYSTEM_INSTRUCTION = (
+        "You are a friendly and helpful EV Charging Assistant chatbot for our charging network. "
+        "Use the tools to look up our stations, charger availability and prices instead of guessing, "
+        "and only recommend stations returned by the tools. Answer general EV questions directly."
+    )
+    
+    def __init__(self, mode: Optional[str] = None, openai_service: Optional[OpenAIService] = None):
+        """
+        Initialize chatbot with required services.
+        
+        Args:
+            mode: 'intent' (classify, then answer) or 'tools' (single tool-calling
+                model call against our own stations); default from config
+            openai_service: Optional preconfigured OpenAI service (e.g. with a stub client)
+        """
+        self.mode = mode or config.chatbot_mode
+        self.openai_service = openai_service or OpenAIService()
         self.maps_service = GoogleMapsService()
+        self.intent_classifier = get_intent_classifier()
+        self.response_cache = get_response_cache()
     
     def get_response(
         self,
@@ -33,8 +55,15 @@ class EVChargingChatbot:
         Returns:
             Bot's response message
         """
+        if self.mode == "tools":
+            return self.openai_service.generate_with_tools(
+                self._build_tool_messages(user_message, chat_history, lat, lng),
+                TOOLS,
+                ToolExecutor()
+            )
+        
         # Detect user intent
-        intent = self.openai_service.detect_intent(user_message, chat_history)
+        intent = self.detect_intent(user_message, chat_history)
         
         # Prepare context and system instruction based on intent
         context, system_instruction = self._prepare_response_context(
@@ -48,19 +77,189 @@ class EVChargingChatbot:
                 "I need your location. Could you please share it?"
             )
         
+        # General EV questions get the same answer every time; serve repeats from cache
+        cacheable = intent == "general_info" and self._is_standalone(user_message, chat_history)
+        if cacheable:
+            cached, embedding = self.response_cache.get(user_message, namespace=intent)
+            if cached is not None:
+                return cached
+        
         # Generate final response
-        return self.openai_service.generate_response(
+        response = self.openai_service.generate_response(
             user_message,
             chat_history,
             context,
             system_instruction
         )
+        
+        if cacheable and response and response != ERROR_RESPONSE:
+            self.response_cache.set(user_message, response, namespace=intent, embedding=embedding)
+        return response
+    
+    async def astream_response(
+        self,
+        user_message: str,
+        chat_history: list,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async, streaming variant of get_response.
+        
+        Args:
+            user_message: The user's input message
+            chat_history: List of previous conversation messages
+            lat: User's latitude (optional)
+            lng: User's longitude (optional)
+            
+        Yields:
+            Chunks of the bot's response as they are generated
+        """
+        if self.mode == "tools":
+            async for delta in self.openai_service.astream_with_tools(
+                self._build_tool_messages(user_message, chat_history, lat, lng),
+                TOOLS,
+                ToolExecutor()
+            ):
+                yield delta
+            return
+        
+        intent = await self.adetect_intent(user_message, chat_history)
+        
+        if intent == "find_station" and (lat is None or lng is None):
+            yield (
+                "I can definitely help with that! To find the nearest stations, "
+                "I need your location. Could you please share it?"
+            )
+            return
+        
+        if intent == "find_station" and lat and lng:
+            stations = await self.maps_service.afind_charging_stations(lat, lng)
+            context, system_instruction = self._prepare_response_context(
+                intent, lat, lng, stations=stations
+            )
+        else:
+            context, system_instruction = self._prepare_response_context(
+                intent, lat, lng
+            )
+        
+        cacheable = intent == "general_info" and self._is_standalone(user_message, chat_history)
+        if cacheable:
+            # The lookup may embed the question with the sync client
+            cached, embedding = await sync_to_async(self.response_cache.get)(user_message, intent)
+            if cached is not None:
+                yield cached
+                return
+        
+        chunks = []
+        outcome = {}
+        async for delta in self.openai_service.astream_response(
+            user_message,
+            chat_history,
+            context,
+            system_instruction,
+            outcome=outcome
+        ):
+            chunks.append(delta)
+            yield delta
+        
+        # A stream that failed part-way leaves a truncated answer; never cache it
+        response = "".join(chunks)
+        if cacheable and outcome.get("complete") and response:
+            self.response_cache.set(user_message, response, namespace=intent, embedding=embedding)
+    
+    @staticmethod
+    def _is_standalone(user_message: str, chat_history: list) -> bool:
+        """
+        Whether the message opens the conversation. Cached answers are shared
+        across users, so follow-ups, whose meaning depends on earlier turns,
+        are neither served from nor stored in the cache.
+        
+        Args:
+            user_message: The user's input message
+            chat_history: List of previous conversation messages, which may
+                already end with this message
+            
+        Returns:
+            True if there are no earlier turns
+        """
+        earlier = chat_history
+        if earlier and earlier[-1].get("content") == user_message:
+            earlier = earlier[:-1]
+        return not earlier
+    
+    def detect_intent(self, user_message: str, chat_history: list) -> str:
+        """
+        Classify intent locally, asking the LLM only when confidence is low.
+        
+        Args:
+            user_message: The user's input message
+            chat_history: List of previous conversation messages
+            
+        Returns:
+            Intent label: 'find_station', 'general_info', or 'other'
+        """
+        intent, confidence = self.intent_classifier.classify(user_message)
+        if confidence >= config.intent_confidence_threshold:
+            return intent
+        
+        intent = self.openai_service.detect_intent(user_message, chat_history)
+        log_intent_example(user_message, intent)
+        return intent
+    
+    async def adetect_intent(self, user_message: str, chat_history: list) -> str:
+        """
+        Async variant of detect_intent.
+        
+        Args:
+            user_message: The user's input message
+            chat_history: List of previous conversation messages
+            
+        Returns:
+            Intent label: 'find_station', 'general_info', or 'other'
+        """
+        intent, confidence = self.intent_classifier.classify(user_message)
+        if confidence >= config.intent_confidence_threshold:
+            return intent
+        
+        intent = await self.openai_service.adetect_intent(user_message, chat_history)
+        log_intent_example(user_message, intent)
+        return intent
+    
+    def _build_tool_messages(
+        self,
+        user_message: str,
+        chat_history: list,
+        lat: Optional[float],
+        lng: Optional[float]
+    ) -> list:
+        """
+        Build the messages for the tool-calling mode.
+        
+        Args:
+            user_message: The user's input message
+            chat_history: List of previous conversation messages
+            lat: User's latitude
+            lng: User's longitude
+            
+        Returns:
+            Chat messages with the user's location as context
+        """
+        if lat is not None and lng is not None:
+            context = f"The user's current location is latitude {lat}, longitude {lng}."
+        else:
+            context = "The user's location is unknown; ask for it before searching for stations."
+        
+        return self.openai_service._build_response_messages(
+            user_message, chat_history, context, self.TOOLS_SYSTEM_INSTRUCTION
+        )
     
     def _prepare_response_context(
         self,
         intent: str,
         lat: Optional[float],
-        lng: Optional[float]
+        lng: Optional[float],
+        stations: Optional[str] = None
     ) -> Tuple[str, str]:
         """
         Prepare context and system instruction based on detected intent.
@@ -69,12 +268,15 @@ class EVChargingChatbot:
             intent: Detected user intent
             lat: User's latitude
             lng: User's longitude
+            stations: Already fetched station context (async path)
             
         Returns:
             Tuple of (context, system_instruction)
         """
         if intent == "find_station":
-            if lat and lng:
+            if stations is not None:
+                context = stations
+            elif lat and lng:
                 context = self.maps_service.find_charging_stations(lat, lng)
             else:
                 context = "Location not provided."
@@ -95,3 +297,29 @@ class EVChargingChatbot:
             system_instruction = "You are a friendly and helpful EV Charging Assistant chatbot."
         
         return context, system_instruction
+
+
+_chatbot = None
+_chatbot_lock = threading.Lock()
+
+
+def get_chatbot() -> EVChargingChatbot:
+    """
+    Return the process-wide chatbot.
+    
+    The chatbot keeps no per-conversation state, so one instance (and its
+    pooled API clients) is reused across requests and sockets.
+    """
+    global _chatbot
+    if _chatbot is None:
+        with _chatbot_lock:
+            if _chatbot is None:
+                _chatbot = EVChargingChatbot()
+    return _chatbot
+
+
+def reset_chatbot():
+    """Drop the shared chatbot so the next get_chatbot() picks up a new config."""
+    global _chatbot
+    with _chatbot_lock:
+        _chatbot = None
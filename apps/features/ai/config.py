@@ -1,9 +1,17 @@
 """
 Configuration module for EV Charging Chatbot.
 Loads environment variables and initializes API clients.
+
+Nothing here touches the environment or the OpenAI SDK at import time: the
+configuration is built on first use and clients are process-wide singletons,
+so Django processes that never chat (migrations, management commands, tests)
+neither pay for the SDK import nor need API keys.
 """
+import asyncio
 import os
-from openai import OpenAI
+import sys
+import threading
+import weakref
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -13,18 +21,60 @@ load_dotenv()
 class Config:
     """Configuration class to manage API keys and settings."""
     
-    def __init__(self):
-        """Initialize configuration and validate required environment variables."""
+    def __init__(self, validate: bool = True):
+        """
+        Initialize configuration and validate required environment variables.
+        
+        Args:
+            validate: Check API keys now; the lazy global config defers this
+                until a client or key is actually needed
+        """
         self.google_maps_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.default_radius = int(os.getenv("DEFAULT_SEARCH_RADIUS", "5000"))
         self.max_results = int(os.getenv("MAX_RESULTS", "5"))
         self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.history_token_budget = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+        self.summary_token_budget = int(os.getenv("SUMMARY_TOKEN_BUDGET", "300"))
+        self.history_max_messages = int(os.getenv("HISTORY_MAX_MESSAGES", "40"))
+        self.intent_confidence_threshold = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.85"))
+        self.intent_dataset_path = os.getenv(
+            "INTENT_DATASET_PATH",
+            os.path.join(os.path.dirname(__file__), "intent_examples.jsonl")
+        )
+        self.intent_log_path = os.getenv("INTENT_LOG_PATH")
+        self.chatbot_mode = os.getenv("CHATBOT_MODE", "intent")
+        self.max_tool_rounds = int(os.getenv("MAX_TOOL_ROUNDS", "3"))
+        self.response_cache_size = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+        self.response_cache_ttl = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+        self.response_cache_embeddings = os.getenv("RESPONSE_CACHE_EMBEDDINGS", "false").lower() == "true"
+        self.response_cache_similarity = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+        self.embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+        self.places_cache_size = int(os.getenv("PLACES_CACHE_SIZE", "2000"))
+        self.places_cache_ttl = int(os.getenv("PLACES_CACHE_TTL", "600"))
+        self.places_cache_cell_decimals = int(os.getenv("PLACES_CACHE_CELL_DECIMALS", "3"))
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL") or None
+        self.google_maps_base_url = os.getenv(
+            "GOOGLE_MAPS_BASE_URL",
+            "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+        )
+        self.http_pool_size = int(os.getenv("AI_HTTP_POOL_SIZE", "20"))
+        self.http_timeout = float(os.getenv("AI_HTTP_TIMEOUT", "30"))
         
-        self._validate()
+        self._lock = threading.Lock()
+        self._openai_client = None
+        self._http_session = None
+        # Async clients are bound to the event loop they were first used on
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._validated = False
+        
+        if validate:
+            self._validate()
     
     def _validate(self):
         """Validate that all required environment variables are set."""
+        if self._validated:
+            return
         if not self.google_maps_api_key:
             raise ValueError(
                 "🚨 Critical Error: GOOGLE_MAPS_API_KEY environment variable is not set.\n"
@@ -36,11 +86,125 @@ class Config:
                 "🚨 Critical Error: OPENAI_API_KEY environment variable is not set.\n"
                 "Get your API key from: https://platform.openai.com/account/api-keys"
             )
+        
+        self._validated = True
+    
+    def get_google_maps_api_key(self):
+        """Return the Google Maps API key, failing loudly if keys are not set."""
+        self._validate()
+        return self.google_maps_api_key
     
     def get_openai_client(self):
-        """Return an initialized OpenAI client."""
-        return OpenAI(api_key=self.openai_api_key)
+        """Return the shared OpenAI client, creating it on first use."""
+        if self._openai_client is None:
+            self._validate()
+            with self._lock:
+                if self._openai_client is None:
+                    import httpx
+                    openai_class = getattr(sys.modules[__name__], "OpenAI")
+                    self._openai_client = openai_class(
+                        api_key=self.openai_api_key,
+                        base_url=self.openai_base_url,
+                        http_client=httpx.Client(
+                            timeout=self.http_timeout,
+                            limits=httpx.Limits(max_connections=self.http_pool_size),
+                        ),
+                    )
+        return self._openai_client
+    
+    def get_async_openai_client(self):
+        """Return the async OpenAI client of the running event loop."""
+        return self._get_loop_client("openai", self._new_async_openai_client)
+    
+    def get_http_session(self):
+        """Return the shared requests session with a pooled connection adapter."""
+        if self._http_session is None:
+            with self._lock:
+                if self._http_session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.http_pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._http_session = session
+        return self._http_session
+    
+    def get_async_http_client(self):
+        """Return the pooled httpx client of the running event loop."""
+        return self._get_loop_client("http", self._new_async_http_client)
+    
+    def _new_async_openai_client(self):
+        self._validate()
+        openai_class = getattr(sys.modules[__name__], "AsyncOpenAI")
+        return openai_class(
+            api_key=self.openai_api_key,
+            base_url=self.openai_base_url,
+            http_client=self._new_async_http_client(),
+        )
+    
+    def _new_async_http_client(self):
+        import httpx
+        return httpx.AsyncClient(
+            timeout=self.http_timeout,
+            limits=httpx.Limits(max_connections=self.http_pool_size),
+        )
+    
+    def _get_loop_client(self, name, factory):
+        """
+        Reuse one async client per event loop.
+        
+        httpx async connections can't be shared across loops, so clients are
+        cached per loop and dropped together with it. Outside a running loop a
+        fresh client is returned.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return factory()
+        
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            if name not in clients:
+                clients[name] = factory()
+            return clients[name]
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> Config:
+    """Return the process-wide configuration, building it on first use."""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = Config(validate=False)
+    return _config
+
+
+def reset_config():
+    """Drop the cached configuration and clients (e.g. after env changes in tests)."""
+    global _config
+    with _config_lock:
+        _config = None
+
+
+class LazyConfig:
+    """Proxy to the process-wide Config that is only built when first read."""
+    
+    def __getattr__(self, name):
+        return getattr(get_config(), name)
+
+
+def __getattr__(name):
+    # Import the OpenAI SDK only when a client is actually created
+    if name in ("OpenAI", "AsyncOpenAI"):
+        import openai
+        return getattr(openai, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Global configuration instance
-config = Config()
+config = LazyConfig()
@@ -0,0 +1,89 @@
+"""
+Offline evaluation of the local intent classifier.
+
+Runs k-fold cross-validation over a labelled JSON-lines dataset and reports
+accuracy, per-intent precision/recall and how many turns would still fall back
+to the LLM at a given confidence threshold.
+
+Usage:
+    python -m apps.features.ai.evaluate_intents [--dataset PATH] [--threshold 0.85] [--folds 5]
+"""
+import argparse
+import random
+from collections import Counter
+from apps.features.ai.config import config
+from apps.features.ai.intent import INTENTS, IntentClassifier, load_examples
+
+
+def cross_validate(examples, folds=5, seed=0):
+    """
+    Predict every example with a model trained on the other folds.
+
+    Args:
+        examples: Labelled (text, intent) pairs
+        folds: Number of folds
+        seed: Shuffle seed so runs are reproducible
+
+    Returns:
+        List of (text, expected, predicted, confidence)
+    """
+    examples = list(examples)
+    random.Random(seed).shuffle(examples)
+    results = []
+
+    for k in range(folds):
+        test = examples[k::folds]
+        train = [ex for i, ex in enumerate(examples) if i % folds != k]
+        classifier = IntentClassifier(train)
+        for text, expected in test:
+            predicted, confidence = classifier.classify(text)
+            results.append((text, expected, predicted, confidence))
+    return results
+
+
+def report(results, threshold):
+    """Build the evaluation report lines."""
+    total = len(results)
+    correct = sum(1 for _, expected, predicted, _ in results if expected == predicted)
+    confident = [r for r in results if r[3] >= threshold]
+    confident_correct = sum(1 for _, expected, predicted, _ in confident if expected == predicted)
+
+    lines = [
+        f"Examples:              {total}",
+        f"Local accuracy:        {correct / total:.1%}",
+        f"Threshold:             {threshold}",
+        f"Handled locally:       {len(confident) / total:.1%} ({len(confident)}/{total})",
+        f"Accuracy when local:   {confident_correct / max(len(confident), 1):.1%}",
+        f"LLM fallback rate:     {(total - len(confident)) / total:.1%}",
+        "",
+        f"{'intent':<14}{'precision':>10}{'recall':>10}{'support':>10}",
+    ]
+
+    support = Counter(expected for _, expected, _, _ in results)
+    predicted_counts = Counter(predicted for _, _, predicted, _ in results)
+    for intent in INTENTS:
+        hits = sum(1 for _, e, p, _ in results if e == p == intent)
+        precision = hits / predicted_counts[intent] if predicted_counts[intent] else 0.0
+        recall = hits / support[intent] if support[intent] else 0.0
+        lines.append(f"{intent:<14}{precision:>10.1%}{recall:>10.1%}{support[intent]:>10}")
+
+    errors = [r for r in confident if r[1] != r[2]]
+    if errors:
+        lines += ["", "Confident mistakes:"]
+        lines += [f"  {text!r}: expected {e}, got {p} ({c:.2f})" for text, e, p, c in errors]
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local intent classifier.")
+    parser.add_argument("--dataset", default=config.intent_dataset_path)
+    parser.add_argument("--threshold", type=float, default=config.intent_confidence_threshold)
+    parser.add_argument("--folds", type=int, default=5)
+    args = parser.parse_args()
+
+    results = cross_validate(load_examples(args.dataset), folds=args.folds)
+    print("\n".join(report(results, args.threshold)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Local intent classification for EV Charging Chatbot.
+Scores messages with keyword rules plus a naive Bayes model trained from
+labelled examples, so most turns skip the OpenAI intent round-trip.
+"""
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from apps.features.ai.config import config
+
+INTENTS = ("find_station", "general_info", "other")
+
+# Hand-written rules: (intent, pattern, log-score boost)
+RULES = [
+    ("find_station", re.compile(
+        r"\b(near(by|est)?|closest|around (me|here)|close to me|near me|where)\b"
+        r".*\b(charg\w*|station\w*|plug\w*|supercharger\w*)\b"
+    ), 3.0),
+    ("find_station", re.compile(
+        r"\b(find|locate|show|need|looking for|search)\b.*\b(charg(er|ing)\w*|station\w*)\b"
+    ), 2.0),
+    ("find_station", re.compile(r"\b(running low|low battery|battery is low|almost empty)\b"), 1.5),
+    ("general_info", re.compile(
+        r"\b(what|how|why|which|explain|difference|is it|can i|does|should)\b"
+        r".*\b(kw|kwh|ccs\d?|chademo|type ?[12]|j1772|nacs|level ?[123]|dc|ac|battery|range|"
+        r"charg\w*|plug|connector|ev|tesla|fast)\b"
+    ), 2.0),
+    ("other", re.compile(
+        r"^\s*(hi|hello|hey|yo|good (morning|afternoon|evening)|thanks?|thank you|bye|goodbye|ok(ay)?|cool)\b"
+    ), 2.5),
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a message into lowercase unigram and bigram features.
+
+    Args:
+        text: Raw user message
+
+    Returns:
+        List of feature strings
+    """
+    words = _TOKEN_RE.findall((text or "").lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def load_examples(path: str) -> List[Tuple[str, str]]:
+    """
+    Read labelled examples from a JSON-lines file.
+
+    Args:
+        path: File with one {"text": ..., "intent": ...} object per line
+
+    Returns:
+        List of (text, intent) pairs; unknown intents are skipped
+    """
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if row.get("intent") in INTENTS and row.get("text"):
+                examples.append((row["text"], row["intent"]))
+    return examples
+
+
+class IntentClassifier:
+    """Keyword rules plus a multinomial naive Bayes model over message tokens."""
+
+    def __init__(self, examples: Optional[Iterable[Tuple[str, str]]] = None, alpha: float = 1.0):
+        """
+        Initialize and train the classifier.
+
+        Args:
+            examples: Labelled (text, intent) pairs to train on
+            alpha: Laplace smoothing for unseen tokens
+        """
+        self.alpha = alpha
+        self.priors: Dict[str, float] = {}
+        self.token_log_probs: Dict[str, Dict[str, float]] = {}
+        self.unseen_log_probs: Dict[str, float] = {}
+        self.fit(examples or [])
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "IntentClassifier":
+        """
+        Train token weights from labelled examples.
+
+        Args:
+            examples: Labelled (text, intent) pairs
+
+        Returns:
+            The classifier itself
+        """
+        intent_counts = Counter()
+        token_counts = defaultdict(Counter)
+
+        for text, intent in examples:
+            intent_counts[intent] += 1
+            token_counts[intent].update(tokenize(text))
+
+        vocabulary = set()
+        for counts in token_counts.values():
+            vocabulary.update(counts)
+        vocab_size = len(vocabulary) or 1
+        total = sum(intent_counts.values())
+
+        for intent in INTENTS:
+            # Smoothed prior so an intent with no examples can still win on rules
+            self.priors[intent] = math.log((intent_counts[intent] + 1) / (total + len(INTENTS)))
+            counts = token_counts[intent]
+            denominator = sum(counts.values()) + self.alpha * vocab_size
+            self.token_log_probs[intent] = {
+                token: math.log((count + self.alpha) / denominator) for token, count in counts.items()
+            }
+            self.unseen_log_probs[intent] = math.log(self.alpha / denominator)
+
+        self.vocabulary = vocabulary
+        return self
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Return the unnormalized log-score of every intent."""
+        tokens = [t for t in tokenize(text) if t in self.vocabulary]
+        lowered = (text or "").lower()
+        scores = {}
+
+        for intent in INTENTS:
+            log_probs = self.token_log_probs[intent]
+            unseen = self.unseen_log_probs[intent]
+            scores[intent] = self.priors[intent] + sum(log_probs.get(t, unseen) for t in tokens)
+
+        for intent, pattern, boost in RULES:
+            if pattern.search(lowered):
+                scores[intent] += boost
+        return scores
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """
+        Classify a message locally.
+
+        Args:
+            text: The latest user message
+
+        Returns:
+            Tuple of (intent, confidence) where confidence is the softmax
+            probability of the winning intent
+        """
+        scores = self.scores(text)
+        top = max(scores.values())
+        exp_scores = {intent: math.exp(score - top) for intent, score in scores.items()}
+        norm = sum(exp_scores.values())
+        intent = max(exp_scores, key=exp_scores.get)
+        return intent, exp_scores[intent] / norm
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """
+    Return the process-wide classifier, trained once from the bundled dataset
+    plus any examples logged at INTENT_LOG_PATH.
+    """
+    global _classifier
+    if _classifier is not None:
+        return _classifier
+
+    with _classifier_lock:
+        if _classifier is None:
+            examples = []
+            for path in (config.intent_dataset_path, config.intent_log_path):
+                if path and os.path.exists(path):
+                    try:
+                        examples += load_examples(path)
+                    except (OSError, ValueError) as e:
+                        print(f"Error loading intent examples from {path}: {e}")
+            _classifier = IntentClassifier(examples)
+    return _classifier
+
+
+def log_intent_example(text: str, intent: str, source: str = "llm"):
+    """
+    Append a labelled example (e.g. an LLM fallback decision) for retraining.
+    No-op unless INTENT_LOG_PATH is configured.
+    """
+    path = config.intent_log_path
+    if not path or intent not in INTENTS:
+        return
+
+    line = json.dumps({"text": text, "intent": intent, "source": source})
+    try:
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"Error logging intent example: {e}")
@@ -0,0 +1,184 @@
+"""
+Token-budgeted conversation memory for EV Charging Chatbot.
+Keeps a sliding window of recent turns plus a rolling summary of older ones.
+The window is bounded both in tokens and in messages; anything that falls
+out of it is folded into the summary, never dropped.
+"""
+import threading
+from typing import Awaitable, Callable, List, Optional, Tuple
+from apps.features.ai.config import config
+
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """
+    Load the tiktoken encoding for the configured model once per process.
+    tiktoken downloads BPE files on first use; if that is not possible we fall
+    back to a character based estimate instead of failing the chat turn.
+    """
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed:
+        return _encoding
+
+    with _encoding_lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                import tiktoken
+                try:
+                    _encoding = tiktoken.encoding_for_model(config.openai_model)
+                except KeyError:
+                    _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                print(f"tiktoken unavailable, estimating token counts: {e}")
+                _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a piece of text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Number of tokens (estimated as ~4 characters per token without tiktoken)
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class ConversationMemory:
+    """Sliding window of chat history that fits inside a token and message budget."""
+
+    # Per-message overhead of the "role: content" line in the prompt
+    MESSAGE_OVERHEAD = 4
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        summary_budget: Optional[int] = None,
+        low_watermark: float = 0.6,
+        max_messages: Optional[int] = None
+    ):
+        """
+        Initialize memory limits.
+
+        Args:
+            token_budget: Max tokens for summary + window (default from config)
+            summary_budget: Max tokens kept in the rolling summary (default from config)
+            low_watermark: Fraction of the budget the window is trimmed down to
+                once it overflows, so summaries are refreshed every few turns
+                instead of on every message
+            max_messages: Max messages in the window (default from config)
+        """
+        self.token_budget = token_budget or config.history_token_budget
+        self.summary_budget = summary_budget or config.summary_token_budget
+        self.low_watermark = low_watermark
+        self.max_messages = max_messages or config.history_max_messages
+
+    def message_tokens(self, message: dict) -> int:
+        """Return the prompt cost of a single history entry."""
+        return count_tokens(message["content"] or "") + self.MESSAGE_OVERHEAD
+
+    def fit(self, summary: str, messages: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """
+        Split chronological messages into the window to send and the ones to evict.
+
+        Args:
+            summary: Current rolling summary of older turns
+            messages: Unsummarized messages, oldest first
+
+        Returns:
+            Tuple of (window, evicted), both oldest first
+        """
+        available = self.token_budget - count_tokens(summary)
+        costs = [self.message_tokens(m) for m in messages]
+
+        if sum(costs) <= available and len(messages) <= self.max_messages:
+            return list(messages), []
+
+        # Overflowing: keep the newest messages up to the low watermark
+        target = int(available * self.low_watermark)
+        max_kept = max(1, int(self.max_messages * self.low_watermark))
+        kept, used = 0, 0
+        for cost in reversed(costs):
+            if kept and (used + cost > target or kept >= max_kept):
+                break
+            used += cost
+            kept += 1
+
+        split = len(messages) - kept
+        return list(messages[split:]), list(messages[:split])
+
+    def build_history(
+        self,
+        summary: str,
+        messages: List[dict],
+        summarizer: Callable[[str, List[dict]], str]
+    ) -> Tuple[List[dict], str, List[dict]]:
+        """
+        Build the prompt history, folding evicted turns into the summary.
+
+        Args:
+            summary: Current rolling summary
+            messages: Unsummarized messages, oldest first
+            summarizer: Callable(previous_summary, evicted_messages) -> new summary
+
+        Returns:
+            Tuple of (history, summary, evicted) where history starts with the
+            summary entry when there is one
+        """
+        window, evicted = self.fit(summary, messages)
+
+        if evicted:
+            summary = self.trim(summarizer(summary, evicted))
+
+        history = list(window)
+        if summary:
+            history.insert(0, {"role": "summary", "content": summary})
+        return history, summary, evicted
+
+    async def abuild_history(
+        self,
+        summary: str,
+        messages: List[dict],
+        summarizer: Callable[[str, List[dict]], Awaitable[str]]
+    ) -> Tuple[List[dict], str, List[dict]]:
+        """
+        Async variant of build_history for coroutine summarizers.
+
+        Args:
+            summary: Current rolling summary
+            messages: Unsummarized messages, oldest first
+            summarizer: Async callable(previous_summary, evicted_messages) -> new summary
+
+        Returns:
+            Tuple of (history, summary, evicted)
+        """
+        window, evicted = self.fit(summary, messages)
+
+        if evicted:
+            summary = self.trim(await summarizer(summary, evicted))
+
+        history = list(window)
+        if summary:
+            history.insert(0, {"role": "summary", "content": summary})
+        return history, summary, evicted
+
+    def trim(self, text: str) -> str:
+        """Cut text down to the summary budget, keeping the most recent part."""
+        if count_tokens(text) <= self.summary_budget:
+            return text
+        encoding = _get_encoding()
+        if encoding is None:
+            return text[-self.summary_budget * 4:]
+        tokens = encoding.encode(text, disallowed_special=())
+        return encoding.decode(tokens[-self.summary_budget:])
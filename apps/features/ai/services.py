@@ -2,16 +2,22 @@
 Service modules for EV Charging Chatbot.
 Contains Google Maps API and OpenAI API integrations.
 """
+import httpx
 import requests
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
+from asgiref.sync import sync_to_async
+from apps.features.ai.cache import get_places_cache
 from apps.features.ai.config import config
 
+ERROR_RESPONSE = "I'm sorry, I seem to be having a technical issue. Please try again in a moment."
+MAPS_ERROR_RESPONSE = "Sorry, I'm having trouble accessing mapping services right now."
+# Places answers worth caching; OVER_QUERY_LIMIT, REQUEST_DENIED etc. are not "no stations"
+PLACES_CACHEABLE_STATUSES = ("OK", "ZERO_RESULTS")
+
 
 class GoogleMapsService:
     """Service class for Google Maps API interactions."""
     
-    BASE_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    
     @staticmethod
     def find_charging_stations(
         lat: float,
@@ -29,24 +35,84 @@ class GoogleMapsService:
         Returns:
             Formatted string with charging station information
         """
+        params = GoogleMapsService._build_params(lat, lng, radius)
+        places_cache = get_places_cache()
+        cached = places_cache.get(lat, lng, params["radius"])
+        if cached is not None:
+            return cached
+        
+        try:
+            response = config.get_http_session().get(config.google_maps_base_url, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Error calling Google Maps API: {e}")
+            return MAPS_ERROR_RESPONSE
+        
+        return GoogleMapsService._cache_response(data, lat, lng, params["radius"])
+    
+    @staticmethod
+    async def afind_charging_stations(
+        lat: float,
+        lng: float,
+        radius: Optional[int] = None
+    ) -> str:
+        """
+        Async variant of find_charging_stations for the ASGI chat path.
+        
+        Args:
+            lat: Latitude coordinate
+            lng: Longitude coordinate
+            radius: Search radius in meters (default from config)
+            
+        Returns:
+            Formatted string with charging station information
+        """
+        params = GoogleMapsService._build_params(lat, lng, radius)
+        places_cache = get_places_cache()
+        cached = places_cache.get(lat, lng, params["radius"])
+        if cached is not None:
+            return cached
+        
+        try:
+            client = config.get_async_http_client()
+            response = await client.get(config.google_maps_base_url, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPError as e:
+            print(f"Error calling Google Maps API: {e}")
+            return MAPS_ERROR_RESPONSE
+        
+        return GoogleMapsService._cache_response(data, lat, lng, params["radius"])
+    
+    @staticmethod
+    def _build_params(lat: float, lng: float, radius: Optional[int]) -> Dict[str, Any]:
+        """Build the Places nearby-search query parameters."""
         if radius is None:
             radius = config.default_radius
         
-        params = {
+        return {
             "location": f"{lat},{lng}",
             "radius": radius,
             "keyword": "electric vehicle charging station",
-            "key": config.google_maps_api_key
+            "key": config.get_google_maps_api_key()
         }
+    
+    @staticmethod
+    def _cache_response(data: Dict[str, Any], lat: float, lng: float, radius: int) -> str:
+        """Format a Places payload, caching it only when Places actually answered."""
+        status = data.get("status")
+        if status not in PLACES_CACHEABLE_STATUSES:
+            print(f"Google Maps API returned {status}: {data.get('error_message', '')}")
+            return MAPS_ERROR_RESPONSE
         
-        try:
-            response = requests.get(GoogleMapsService.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error calling Google Maps API: {e}")
-            return "Sorry, I'm having trouble accessing mapping services right now."
-        
+        result = GoogleMapsService._format_response(data)
+        get_places_cache().set(lat, lng, radius, result)
+        return result
+    
+    @staticmethod
+    def _format_response(data: Dict[str, Any]) -> str:
+        """Turn a Places response payload into the chatbot context string."""
         if not data.get("results"):
             return "No charging stations found within the search radius."
         
@@ -85,11 +151,29 @@ class GoogleMapsService:
 class OpenAIService:
     """Service class for OpenAI API interactions."""
     
-    def __init__(self):
-        """Initialize OpenAI service with client."""
-        self.client = config.get_openai_client()
+    def __init__(self, client=None, async_client=None):
+        """
+        Initialize OpenAI service with client.
+        
+        Args:
+            client: Optional OpenAI client (e.g. a stub in tests); defaults to
+                the shared, connection-pooled client
+            async_client: Optional async OpenAI client
+        """
+        self._client = client
+        self._async_client = async_client
         self.model = config.openai_model
     
+    @property
+    def client(self):
+        """Injected client, or the process-wide one created on first use."""
+        return self._client or config.get_openai_client()
+    
+    @property
+    def async_client(self):
+        """Injected async client, or the one shared on the running event loop."""
+        return self._async_client or config.get_async_openai_client()
+    
     def detect_intent(self, user_message: str, chat_history: list) -> str:
         """
         Classify user intent using GPT model.
@@ -101,24 +185,7 @@ class OpenAIService:
         Returns:
             Intent label: 'find_station', 'general_info', or 'other'
         """
-        formatted_history = self._format_chat_history(chat_history)
-        
-        prompt = f"""
-You are an intent detection assistant for an EV charging chatbot.
-Based on the latest user message and the conversation history, decide the user's intent.
-
-CONVERSATION HISTORY:
-{formatted_history}
-
-LATEST USER MESSAGE: "{user_message}"
-
-Possible intents:
-1. find_station — User asks for nearest/closest/available charging station, directions, or locations.
-2. general_info — User asks general questions about how to charge, plug types, speed, costs, etc.
-3. other — Unrelated, conversational, or unclear queries.
-
-Respond with ONLY the intent label (find_station / general_info / other).
-"""
+        prompt = self._build_intent_prompt(user_message, chat_history)
         
         try:
             result = self.client.chat.completions.create(
@@ -150,6 +217,332 @@ Respond with ONLY the intent label (find_station / general_info / other).
         Returns:
             Generated response text
         """
+        messages = self._build_response_messages(
+            user_message, chat_history, context, system_instruction
+        )
+        
+        try:
+            completion = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+            )
+            return completion.choices[0].message.content
+        except Exception as e:
+            print(f"Error generating final response from OpenAI: {e}")
+            return ERROR_RESPONSE
+    
+    async def adetect_intent(self, user_message: str, chat_history: list) -> str:
+        """
+        Async variant of detect_intent using the async OpenAI client.
+        
+        Args:
+            user_message: The latest user message
+            chat_history: List of previous conversation messages
+            
+        Returns:
+            Intent label: 'find_station', 'general_info', or 'other'
+        """
+        prompt = self._build_intent_prompt(user_message, chat_history)
+        
+        try:
+            result = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0,
+            )
+            return result.choices[0].message.content.strip().lower()
+        except Exception as e:
+            print(f"Error getting intent from OpenAI: {e}")
+            return "other"
+    
+    async def astream_response(
+        self,
+        user_message: str,
+        chat_history: list,
+        context: str,
+        system_instruction: str,
+        outcome: Optional[Dict[str, bool]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chatbot response token by token as the model produces it.
+        
+        Args:
+            user_message: The latest user message
+            chat_history: List of previous conversation messages
+            context: Relevant context for the response
+            system_instruction: System-level instruction for the AI
+            outcome: Optional dict; its "complete" key is set to True only when
+                the stream ran to the end (a failed stream may be truncated)
+            
+        Yields:
+            Text deltas of the generated response
+        """
+        messages = self._build_response_messages(
+            user_message, chat_history, context, system_instruction
+        )
+        
+        streamed_any = False
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    streamed_any = True
+                    yield delta
+            if outcome is not None:
+                outcome["complete"] = True
+        except Exception as e:
+            print(f"Error streaming final response from OpenAI: {e}")
+            if not streamed_any:
+                yield ERROR_RESPONSE
+    
+    def generate_with_tools(self, messages: list, tools: list, executor) -> str:
+        """
+        Let the model call tools in-process until it produces an answer.
+        
+        Args:
+            messages: Chat messages for the turn
+            tools: Tool schemas offered to the model
+            executor: ToolExecutor running the requested calls
+            
+        Returns:
+            Generated response text
+        """
+        messages = list(messages)
+        
+        try:
+            for _ in range(config.max_tool_rounds):
+                completion = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    tools=tools,
+                )
+                message = completion.choices[0].message
+                if not message.tool_calls:
+                    return message.content
+                
+                tool_calls = [
+                    {"id": call.id, "name": call.function.name, "arguments": call.function.arguments}
+                    for call in message.tool_calls
+                ]
+                messages.append(self._tool_call_message(message.content, tool_calls))
+                for call in tool_calls:
+                    messages.append(self._tool_result_message(
+                        call, executor.execute(call["name"], call["arguments"])
+                    ))
+            
+            # Out of tool rounds: answer with what has been gathered so far
+            completion = self.client.chat.completions.create(model=self.model, messages=messages)
+            return completion.choices[0].message.content
+        except Exception as e:
+            print(f"Error generating tool response from OpenAI: {e}")
+            return ERROR_RESPONSE
+    
+    async def astream_with_tools(self, messages: list, tools: list, executor) -> AsyncIterator[str]:
+        """
+        Streaming variant of generate_with_tools.
+        
+        Text deltas are yielded as soon as the model answers directly; tool
+        calls are accumulated from the stream, run in a worker thread (they hit
+        the ORM) and the follow-up answer is streamed.
+        
+        Args:
+            messages: Chat messages for the turn
+            tools: Tool schemas offered to the model
+            executor: ToolExecutor running the requested calls
+            
+        Yields:
+            Text deltas of the generated response
+        """
+        messages = list(messages)
+        execute = sync_to_async(executor.execute)
+        streamed_any = False
+        
+        try:
+            for round_number in range(config.max_tool_rounds + 1):
+                offer_tools = round_number < config.max_tool_rounds
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=True,
+                    **({"tools": tools} if offer_tools else {}),
+                )
+                
+                content, tool_calls = [], {}
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        streamed_any = True
+                        content.append(delta.content)
+                        yield delta.content
+                    for call in delta.tool_calls or []:
+                        entry = tool_calls.setdefault(call.index, {"id": None, "name": "", "arguments": ""})
+                        if call.id:
+                            entry["id"] = call.id
+                        if call.function and call.function.name:
+                            entry["name"] += call.function.name
+                        if call.function and call.function.arguments:
+                            entry["arguments"] += call.function.arguments
+                
+                if not tool_calls:
+                    return
+                
+                tool_calls = [tool_calls[index] for index in sorted(tool_calls)]
+                messages.append(self._tool_call_message("".join(content) or None, tool_calls))
+                for call in tool_calls:
+                    messages.append(self._tool_result_message(
+                        call, await execute(call["name"], call["arguments"])
+                    ))
+        except Exception as e:
+            print(f"Error streaming tool response from OpenAI: {e}")
+            if not streamed_any:
+                yield ERROR_RESPONSE
+    
+    @staticmethod
+    def _tool_call_message(content: Optional[str], tool_calls: list) -> Dict[str, Any]:
+        """Build the assistant message that records the model's tool calls."""
+        return {
+            "role": "assistant",
+            "content": content,
+            "tool_calls": [
+                {
+                    "id": call["id"],
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": call["arguments"]},
+                }
+                for call in tool_calls
+            ],
+        }
+    
+    @staticmethod
+    def _tool_result_message(call: Dict[str, Any], result: str) -> Dict[str, Any]:
+        """Build the tool message carrying a call's result back to the model."""
+        return {"role": "tool", "tool_call_id": call["id"], "content": result}
+    
+    def embed(self, text: str) -> list:
+        """
+        Embed text for nearest-neighbour cache lookups.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector
+        """
+        result = self.client.embeddings.create(model=config.embedding_model, input=text)
+        return result.data[0].embedding
+    
+    def summarize_history(self, summary: str, messages: list) -> str:
+        """
+        Fold older conversation turns into the rolling summary.
+        
+        Args:
+            summary: Current summary of the conversation (may be empty)
+            messages: Turns that no longer fit in the prompt window
+            
+        Returns:
+            Updated summary text
+        """
+        try:
+            completion = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_summary_messages(summary, messages),
+                temperature=0,
+                max_tokens=config.summary_token_budget,
+            )
+            return completion.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"Error summarizing chat history with OpenAI: {e}")
+            return self._fallback_summary(summary, messages)
+    
+    async def asummarize_history(self, summary: str, messages: list) -> str:
+        """
+        Async variant of summarize_history.
+        
+        Args:
+            summary: Current summary of the conversation (may be empty)
+            messages: Turns that no longer fit in the prompt window
+            
+        Returns:
+            Updated summary text
+        """
+        try:
+            completion = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_summary_messages(summary, messages),
+                temperature=0,
+                max_tokens=config.summary_token_budget,
+            )
+            return completion.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"Error summarizing chat history with OpenAI: {e}")
+            return self._fallback_summary(summary, messages)
+    
+    def _build_summary_messages(self, summary: str, messages: list) -> list:
+        """Build the prompt that folds evicted turns into the summary."""
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You maintain a short running summary of a conversation between a driver "
+                    "and an EV charging assistant. Keep facts that matter for later turns "
+                    "(vehicle, plug type, locations, stations discussed, preferences). "
+                    "Reply with the updated summary only."
+                ),
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"CURRENT SUMMARY:\n{summary or 'None yet.'}\n\n"
+                    f"NEW TURNS:\n{self._format_chat_history(messages)}"
+                ),
+            },
+        ]
+    
+    @staticmethod
+    def _fallback_summary(summary: str, messages: list) -> str:
+        """Extractive summary used when the model is unavailable."""
+        lines = [summary] if summary else []
+        lines += [f"{msg['role']}: {(msg['content'] or '')[:200]}" for msg in messages]
+        return "\n".join(lines)
+    
+    def _build_intent_prompt(self, user_message: str, chat_history: list) -> str:
+        """Build the intent classification prompt."""
+        formatted_history = self._format_chat_history(chat_history)
+        
+        return f"""
+You are an intent detection assistant for an EV charging chatbot.
+Based on the latest user message and the conversation history, decide the user's intent.
+
+CONVERSATION HISTORY:
+{formatted_history}
+
+LATEST USER MESSAGE: "{user_message}"
+
+Possible intents:
+1. find_station — User asks for nearest/closest/available charging station, directions, or locations.
+2. general_info — User asks general questions about how to charge, plug types, speed, costs, etc.
+3. other — Unrelated, conversational, or unclear queries.
+
+Respond with ONLY the intent label (find_station / general_info / other).
+"""
+    
+    def _build_response_messages(
+        self,
+        user_message: str,
+        chat_history: list,
+        context: str,
+        system_instruction: str
+    ) -> list:
+        """Build the chat messages for the final response call."""
         formatted_history = self._format_chat_history(chat_history)
         
         final_prompt = f"""
@@ -163,19 +556,10 @@ Here is the relevant data or context for your response:
 
 Based on all of the above, provide a helpful and natural response to the LATEST user message: "{user_message}"
 """
-        
-        try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_instruction},
-                    {"role": "user", "content": final_prompt},
-                ],
-            )
-            return completion.choices[0].message.content
-        except Exception as e:
-            print(f"Error generating final response from OpenAI: {e}")
-            return "I'm sorry, I seem to be having a technical issue. Please try again in a moment."
+        return [
+            {"role": "system", "content": system_instruction},
+            {"role": "user", "content": final_prompt},
+        ]
     
     @staticmethod
     def _format_chat_history(chat_history: list) -> str:
@@ -0,0 +1,322 @@
+"""
+Local stub servers for OpenAI and Google Places.
+
+Used by the replay benchmark to exercise the full chatbot pipeline (HTTP
+clients, pooling, caching, DB) and by `update_stations --stub` to exercise
+the Places import without network access. Each server adds a
+configurable latency with uniform jitter and records request/token counts.
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+from apps.features.ai.memory import count_tokens
+
+_LATEST_MESSAGE_RE = re.compile(r'LATEST (?:USER|user) (?:MESSAGE|message):\s*"(.*)"')
+_LOCATION_RE = re.compile(r"latitude (-?\d+(?:\.\d+)?), longitude (-?\d+(?:\.\d+)?)")
+
+
+class _StubServer:
+    """Threaded HTTP server running in a daemon thread."""
+
+    handler_class = None
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, seed: Optional[int] = None):
+        """
+        Initialize the stub.
+
+        Args:
+            latency_ms: Base delay added before every response
+            jitter_ms: Uniform +/- jitter around the base delay
+            seed: Seed for reproducible jitter
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "_StubServer":
+        server = self
+
+        class Handler(self.handler_class):
+            stub = server
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def delay(self):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        seconds = max(self.latency_ms + jitter, 0) / 1000
+        if seconds:
+            time.sleep(seconds)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {}
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stub = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _OpenAIHandler(_JSONHandler):
+    def do_POST(self):
+        payload = self.read_json()
+        self.stub.delay()
+
+        if self.path.endswith("/embeddings"):
+            return self.send_json(self.stub.embeddings(payload))
+        if not self.path.endswith("/chat/completions"):
+            return self.send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+        try:
+            message = self.stub.complete(payload)
+        except Exception as e:
+            return self.send_json({"error": {"message": f"Stub failed: {e}"}}, status=500)
+        if not payload.get("stream"):
+            return self.send_json(self.stub.completion_payload(payload, message))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for chunk in self.stub.stream_chunks(payload, message):
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class StubOpenAIServer(_StubServer):
+    """
+    Minimal OpenAI-compatible API (chat completions, streaming, tools, embeddings).
+
+    Intent prompts are answered by the local classifier, summaries with a short
+    digest, tool-enabled requests search our stations once, and regular answers
+    replay the recorded reply for the latest user message (or a canned one).
+    """
+
+    handler_class = _OpenAIHandler
+
+    def __init__(self, *args, replies: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replies = replies or {}
+
+    def complete(self, payload) -> dict:
+        """Decide the assistant message for a chat completion request."""
+        messages = payload.get("messages", [])
+        prompt = "\n".join(m.get("content") or "" for m in messages)
+        latest = _LATEST_MESSAGE_RE.search(prompt)
+        latest = latest.group(1) if latest else (messages[-1].get("content") or "" if messages else "")
+
+        self.incr("requests")
+        self.incr("prompt_tokens", count_tokens(prompt))
+
+        if "intent detection assistant" in prompt:
+            from apps.features.ai.intent import get_intent_classifier
+            self.incr("intent_requests")
+            content = get_intent_classifier().classify(latest)[0]
+        elif "running summary" in prompt:
+            self.incr("summary_requests")
+            content = "Summary: the driver asked about EV charging."
+        elif payload.get("tools") and not any(m.get("role") == "tool" for m in messages):
+            location = _LOCATION_RE.search(prompt)
+            if location:
+                self.incr("tool_call_requests")
+                arguments = {"latitude": float(location.group(1)), "longitude": float(location.group(2))}
+                return {"role": "assistant", "content": None, "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": "search_stations", "arguments": json.dumps(arguments)},
+                }]}
+            content = self.replies.get(latest) or self.default_reply(latest)
+        else:
+            content = self.replies.get(latest) or self.default_reply(latest)
+
+        self.incr("completion_tokens", count_tokens(content))
+        return {"role": "assistant", "content": content}
+
+    @staticmethod
+    def default_reply(question: str) -> str:
+        return (
+            f"Here is what I found about \"{question[:80]}\". Most public DC fast chargers "
+            "deliver 50-150 kW, while Level 2 chargers typically provide 7-22 kW."
+        )
+
+    def completion_payload(self, payload, message) -> dict:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def stream_chunks(self, payload, message):
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+        }
+        if message.get("tool_calls"):
+            calls = [dict(call, index=i) for i, call in enumerate(message["tool_calls"])]
+            yield dict(base, choices=[{"index": 0, "delta": {"tool_calls": calls}, "finish_reason": None}])
+        else:
+            for word in re.findall(r"\S+\s*", message["content"]):
+                yield dict(base, choices=[{"index": 0, "delta": {"content": word}, "finish_reason": None}])
+        yield dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+
+    def embeddings(self, payload) -> dict:
+        self.incr("embedding_requests")
+        inputs = payload.get("input")
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        data = []
+        for i, text in enumerate(inputs):
+            # Bag-of-characters vector: similar questions get similar embeddings
+            vector = [0.0] * 32
+            for char in str(text).lower():
+                vector[ord(char) % 32] += 1.0
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        return {"object": "list", "data": data, "model": payload.get("model", "stub"),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+
+
+class _PlacesHandler(_JSONHandler):
+    def do_GET(self):
+        self.stub.delay()
+        self.stub.incr("requests")
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self.send_json(self.stub.search(params))
+
+
+class StubPlacesServer(_StubServer):
+    """
+    Google Places nearby-search stub.
+
+    By default every query returns five deterministic stations around the
+    query point. With `lattice_step` (degrees) it serves a fixed lattice of
+    stations instead: those within the requested radius, nearest first,
+    `page_size` per page with a next_page_token and at most 60 in total, as
+    the real API does. Overlapping queries then see the same place_ids.
+    """
+
+    handler_class = _PlacesHandler
+    max_results = 60
+
+    def __init__(self, *args, lattice_step: Optional[float] = None, page_size: int = 20, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lattice_step = lattice_step
+        self.page_size = page_size
+
+    def search(self, params) -> dict:
+        if self.lattice_step is None:
+            lat, lng = (float(v) for v in params.get("location", "0,0").split(","))
+            return {"status": "OK", "results": self.places(lat, lng)}
+
+        if params.get("pagetoken"):
+            try:
+                lat, lng, radius, offset = json.loads(params["pagetoken"])
+            except ValueError:
+                return {"status": "INVALID_REQUEST", "results": []}
+        else:
+            lat, lng = (float(v) for v in params.get("location", "0,0").split(","))
+            radius, offset = float(params.get("radius", 1000)), 0
+
+        self.incr("pages")
+        results = self.lattice_places(lat, lng, radius)
+        page = results[offset:offset + self.page_size]
+        payload = {"status": "OK" if page else "ZERO_RESULTS", "results": page}
+        if offset + self.page_size < len(results):
+            payload["next_page_token"] = json.dumps([lat, lng, radius, offset + self.page_size])
+        return payload
+
+    def lattice_places(self, lat: float, lng: float, radius: float):
+        step = self.lattice_step
+        dlat = radius / 111_320
+        dlng = radius / (111_320 * max(math.cos(math.radians(lat)), 0.01))
+        found = []
+        for i in range(math.floor((lat - dlat) / step), math.ceil((lat + dlat) / step) + 1):
+            for j in range(math.floor((lng - dlng) / step), math.ceil((lng + dlng) / step) + 1):
+                plat, plng = i * step, j * step
+                distance = math.hypot((plat - lat) * 111_320, (plng - lng) * 111_320 * math.cos(math.radians(lat)))
+                if distance <= radius:
+                    found.append((distance, i, j, plat, plng))
+        found.sort()
+        return [
+            {
+                "name": f"Lattice Charging Point {i}/{j}",
+                "vicinity": f"{plat:.4f}, {plng:.4f}",
+                "geometry": {"location": {"lat": plat, "lng": plng}},
+                "place_id": f"lattice-{i}-{j}",
+            }
+            for _, i, j, plat, plng in found[:self.max_results]
+        ]
+
+    def places(self, lat: float, lng: float, count: int = 5):
+        return [
+            {
+                "name": f"Stub Charging Point {i + 1}",
+                "vicinity": f"{lat + i * 0.001:.4f}, {lng + i * 0.001:.4f}",
+                "rating": round(3.5 + (i % 3) * 0.5, 1),
+                "opening_hours": {"open_now": i % 2 == 0},
+                "geometry": {"location": {"lat": lat + i * 0.001, "lng": lng + i * 0.001}},
+                "place_id": f"stub-{lat:.3f}-{lng:.3f}-{i}",
+            }
+            for i in range(count)
+        ]
@@ -7,6 +7,20 @@ from unittest.mock import Mock, patch, MagicMock
 import os
 
 
+@pytest.fixture(autouse=True)
+def clear_response_caches():
+    """Keep cached answers and Places results from leaking between tests."""
+    with patch.dict(os.environ, {
+        'GOOGLE_MAPS_API_KEY': 'test_google_key',
+        'OPENAI_API_KEY': 'test_openai_key'
+    }):
+        from apps.features.ai.cache import get_places_cache, get_response_cache
+        
+        get_places_cache().clear()
+        get_response_cache().clear()
+    yield
+
+
 # Test Config Module
 class TestConfig:
     """Test cases for configuration module."""
@@ -69,7 +83,7 @@ class TestGoogleMapsService:
         'GOOGLE_MAPS_API_KEY': 'test_google_key',
         'OPENAI_API_KEY': 'test_openai_key'
     })
-    @patch('services.requests.get')
+    @patch('services.requests.Session.get')
     def test_find_charging_stations_success(self, mock_get):
         """Test successful charging station search."""
         from services import GoogleMapsService
@@ -77,6 +91,7 @@ class TestGoogleMapsService:
         # Mock API response
         mock_response = Mock()
         mock_response.json.return_value = {
+            'status': 'OK',
             'results': [
                 {
                     'name': 'Station A',
@@ -109,13 +124,13 @@ class TestGoogleMapsService:
         'GOOGLE_MAPS_API_KEY': 'test_google_key',
         'OPENAI_API_KEY': 'test_openai_key'
     })
-    @patch('services.requests.get')
+    @patch('services.requests.Session.get')
     def test_find_charging_stations_no_results(self, mock_get):
         """Test handling of no results."""
         from services import GoogleMapsService
         
         mock_response = Mock()
-        mock_response.json.return_value = {'results': []}
+        mock_response.json.return_value = {'status': 'ZERO_RESULTS', 'results': []}
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
         
@@ -127,7 +142,7 @@ class TestGoogleMapsService:
         'GOOGLE_MAPS_API_KEY': 'test_google_key',
         'OPENAI_API_KEY': 'test_openai_key'
     })
-    @patch('services.requests.get')
+    @patch('services.requests.Session.get')
     def test_find_charging_stations_api_error(self, mock_get):
         """Test handling of API errors."""
         from services import GoogleMapsService
@@ -143,13 +158,13 @@ class TestGoogleMapsService:
         'GOOGLE_MAPS_API_KEY': 'test_google_key',
         'OPENAI_API_KEY': 'test_openai_key'
     })
-    @patch('services.requests.get')
+    @patch('services.requests.Session.get')
     def test_find_charging_stations_custom_radius(self, mock_get):
         """Test charging station search with custom radius."""
         from services import GoogleMapsService
         
         mock_response = Mock()
-        mock_response.json.return_value = {'results': []}
+        mock_response.json.return_value = {'status': 'ZERO_RESULTS', 'results': []}
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
         
@@ -409,6 +424,232 @@ class TestEVChargingChatbot:
         assert 'expert on Electric Vehicles' in system_instruction
 
 
+# Test Response Caching
+class TestResponseCache:
+    """Test cases for the answer and Places caches."""
+    
+    def test_normalized_question_hits(self):
+        """Test rewordings that only differ in filler words share an entry."""
+        from cache import ResponseCache
+        
+        cache = ResponseCache(maxsize=10, ttl=60)
+        cache.set("What is CCS2?", "CCS2 is a connector.", namespace="general_info")
+        
+        answer, _ = cache.get("what's ccs2", namespace="general_info")
+        assert answer is None
+        answer, _ = cache.get("Can you tell me what is CCS2", namespace="general_info")
+        assert answer == "CCS2 is a connector."
+        assert cache.stats.snapshot()["hits"] == 1
+        assert cache.stats.snapshot()["misses"] == 1
+    
+    def test_embedding_nearest_neighbour(self):
+        """Test a semantically close question is served from the cache."""
+        from cache import ResponseCache
+        
+        vectors = {
+            "How long does Level 2 take?": [1.0, 0.1, 0.0],
+            "Level 2 charging time?": [0.98, 0.12, 0.01],
+            "What is NACS?": [0.0, 0.2, 1.0],
+        }
+        cache = ResponseCache(maxsize=10, ttl=60, embedder=vectors.get, similarity_threshold=0.95)
+        cache.set("How long does Level 2 take?", "About 4-8 hours.")
+        
+        assert cache.get("Level 2 charging time?")[0] == "About 4-8 hours."
+        assert cache.get("What is NACS?")[0] is None
+        assert cache.stats.snapshot()["semantic_hits"] == 1
+    
+    def test_lru_eviction(self):
+        """Test the least recently used answer is evicted first."""
+        from cache import ResponseCache
+        
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache.set("q one", "a1")
+        cache.set("q two", "a2")
+        cache.get("q one")
+        cache.set("q three", "a3")
+        
+        assert cache.get("q one")[0] == "a1"
+        assert cache.get("q two")[0] is None
+    
+    @patch.dict(os.environ, {
+        'GOOGLE_MAPS_API_KEY': 'test_google_key',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    @patch('services.requests.Session.get')
+    def test_places_lookup_cached_per_geo_cell(self, mock_get):
+        """Test nearby coordinates in the same cell reuse the Places result."""
+        from services import GoogleMapsService
+        
+        mock_response = Mock()
+        mock_response.json.return_value = {'status': 'OK', 'results': [{'name': 'Station A'}]}
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        first = GoogleMapsService.find_charging_stations(12.97161, 77.59461)
+        second = GoogleMapsService.find_charging_stations(12.97158, 77.59459)
+        
+        assert first == second
+        assert mock_get.call_count == 1
+    
+    @patch.dict(os.environ, {
+        'GOOGLE_MAPS_API_KEY': 'test_google_key',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    @patch('services.requests.Session.get')
+    def test_places_errors_are_not_cached(self, mock_get):
+        """Test a quota or auth failure is reported, not cached as "no stations"."""
+        from services import GoogleMapsService
+        
+        denied = Mock()
+        denied.json.return_value = {'status': 'OVER_QUERY_LIMIT', 'results': []}
+        denied.raise_for_status = Mock()
+        ok = Mock()
+        ok.json.return_value = {'status': 'OK', 'results': [{'name': 'Station A'}]}
+        ok.raise_for_status = Mock()
+        mock_get.side_effect = [denied, ok]
+        
+        first = GoogleMapsService.find_charging_stations(12.9716, 77.5946)
+        second = GoogleMapsService.find_charging_stations(12.9716, 77.5946)
+        
+        assert 'trouble accessing mapping services' in first
+        assert 'Station A' in second
+        assert mock_get.call_count == 2
+    
+    @patch.dict(os.environ, {
+        'GOOGLE_MAPS_API_KEY': 'test_google_key',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    @patch('chatbot.OpenAIService')
+    @patch('chatbot.GoogleMapsService')
+    def test_general_info_answer_served_from_cache(self, mock_maps, mock_openai):
+        """Test a repeated FAQ question does not call OpenAI again."""
+        from chatbot import EVChargingChatbot
+        
+        mock_openai_instance = Mock()
+        mock_openai_instance.generate_response.return_value = 'CCS2 is the European DC connector.'
+        mock_openai.return_value = mock_openai_instance
+        
+        chatbot = EVChargingChatbot()
+        chatbot.get_response("What is the difference between CCS2 and Type 2?", [])
+        response = chatbot.get_response("what is the difference between CCS2 and Type 2", [])
+        
+        assert response == 'CCS2 is the European DC connector.'
+        assert mock_openai_instance.generate_response.call_count == 1
+    
+    @patch.dict(os.environ, {
+        'GOOGLE_MAPS_API_KEY': 'test_google_key',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    @patch('chatbot.OpenAIService')
+    @patch('chatbot.GoogleMapsService')
+    def test_follow_up_is_not_served_from_cache(self, mock_maps, mock_openai):
+        """Test a question asked after earlier turns gets its own answer."""
+        from chatbot import EVChargingChatbot
+        
+        mock_openai_instance = Mock()
+        mock_openai_instance.detect_intent.return_value = 'general_info'
+        mock_openai_instance.generate_response.side_effect = ['About an hour.', '6-10 hours on Level 2.']
+        mock_openai.return_value = mock_openai_instance
+        
+        chatbot = EVChargingChatbot()
+        chatbot.get_response("How long does charging take?", [])
+        history = [
+            {'role': 'user', 'content': 'Tell me about Level 2 chargers'},
+            {'role': 'bot', 'content': 'They deliver 7-22 kW.'},
+        ]
+        response = chatbot.get_response("How long does charging take?", history)
+        
+        assert response == '6-10 hours on Level 2.'
+        assert mock_openai_instance.generate_response.call_count == 2
+
+
+# Test Local Intent Classifier
+class TestIntentClassifier:
+    """Test cases for the local intent classifier."""
+    
+    def test_classify_with_rules_only(self):
+        """Test keyword rules classify obvious messages without training data."""
+        from intent import IntentClassifier
+        
+        classifier = IntentClassifier()
+        assert classifier.classify("Where is the nearest charging station?")[0] == 'find_station'
+        assert classifier.classify("What is the difference between CCS and CHAdeMO?")[0] == 'general_info'
+        assert classifier.classify("hello there")[0] == 'other'
+    
+    def test_training_examples_raise_confidence(self):
+        """Test labelled examples sharpen the prediction."""
+        from intent import IntentClassifier
+        
+        examples = [
+            ("charger around the mall", "find_station"),
+            ("any charger by the mall", "find_station"),
+            ("tell me a joke", "other"),
+        ]
+        untrained = IntentClassifier().classify("charger by the mall")
+        trained = IntentClassifier(examples).classify("charger by the mall")
+        
+        assert trained[0] == 'find_station'
+        assert trained[1] > untrained[1]
+    
+    def test_bundled_dataset_cross_validation(self):
+        """Test the bundled dataset keeps confident local predictions accurate."""
+        from intent import load_examples
+        from evaluate_intents import cross_validate
+        from config import config
+        
+        results = cross_validate(load_examples(config.intent_dataset_path))
+        confident = [r for r in results if r[3] >= config.intent_confidence_threshold]
+        correct = sum(1 for _, expected, predicted, _ in confident if expected == predicted)
+        
+        assert len(confident) / len(results) > 0.5
+        assert correct / len(confident) > 0.9
+
+
+class TestChatbotIntentRouting:
+    """Test cases for local intent detection with LLM fallback."""
+    
+    @patch.dict(os.environ, {
+        'GOOGLE_MAPS_API_KEY': 'test_google_key',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    @patch('chatbot.OpenAIService')
+    @patch('chatbot.GoogleMapsService')
+    def test_confident_intent_skips_llm(self, mock_maps, mock_openai):
+        """Test a confident local prediction does not call OpenAI."""
+        from chatbot import EVChargingChatbot
+        
+        mock_openai_instance = Mock()
+        mock_openai.return_value = mock_openai_instance
+        
+        chatbot = EVChargingChatbot()
+        intent = chatbot.detect_intent("Find me the nearest EV charging station", [])
+        
+        assert intent == 'find_station'
+        mock_openai_instance.detect_intent.assert_not_called()
+    
+    @patch.dict(os.environ, {
+        'GOOGLE_MAPS_API_KEY': 'test_google_key',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    @patch('chatbot.OpenAIService')
+    @patch('chatbot.GoogleMapsService')
+    def test_low_confidence_falls_back_to_llm(self, mock_maps, mock_openai):
+        """Test an ambiguous message is sent to the LLM."""
+        from chatbot import EVChargingChatbot
+        
+        mock_openai_instance = Mock()
+        mock_openai_instance.detect_intent.return_value = 'general_info'
+        mock_openai.return_value = mock_openai_instance
+        
+        chatbot = EVChargingChatbot()
+        chatbot.intent_classifier = Mock()
+        chatbot.intent_classifier.classify.return_value = ('other', 0.4)
+        intent = chatbot.detect_intent("and the second one?", [])
+        
+        assert intent == 'general_info'
+        mock_openai_instance.detect_intent.assert_called_once_with("and the second one?", [])
+
+
 # Fixtures
 @pytest.fixture
 def mock_env_vars():
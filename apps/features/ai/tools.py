@@ -0,0 +1,296 @@
+"""
+Tool definitions for EV Charging Chatbot.
+Exposes our own stations, charger availability and pricing to the model as
+function tools and executes the calls in-process against the database.
+"""
+import json
+import math
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+
+# Same platform fee the booking views charge on top of the subtotal
+PLATFORM_FEE_RATE = Decimal("0.15")
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "search_stations",
+            "description": (
+                "Search charging stations on our network near a location. "
+                "Use this whenever the user wants to find, compare or book a charger nearby."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "latitude": {"type": "number", "description": "Latitude of the search center"},
+                    "longitude": {"type": "number", "description": "Longitude of the search center"},
+                    "radius_km": {"type": "number", "description": "Search radius in kilometers (default 10)"},
+                    "plug_type": {"type": "string", "description": "Optional plug type name, e.g. CCS2 or Type 2"},
+                    "fast_charge_only": {"type": "boolean", "description": "Only stations with fast chargers"},
+                    "limit": {"type": "integer", "description": "Maximum number of stations (default 5)"},
+                },
+                "required": ["latitude", "longitude"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_charger_availability",
+            "description": "List the chargers of a station with their availability and booked slots for a date.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "station_id": {"type": "integer", "description": "Station id from search_stations"},
+                    "date": {"type": "string", "description": "Date as YYYY-MM-DD (default today)"},
+                },
+                "required": ["station_id"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_pricing",
+            "description": "Get charger prices at a station and optionally estimate the cost of a session.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "station_id": {"type": "integer", "description": "Station id from search_stations"},
+                    "charger_id": {"type": "integer", "description": "Optional charger id to price"},
+                    "duration_hours": {"type": "number", "description": "Optional session length to estimate"},
+                },
+                "required": ["station_id"],
+            },
+        },
+    },
+]
+
+
+def search_stations(
+    latitude: float,
+    longitude: float,
+    radius_km: float = 10,
+    plug_type: Optional[str] = None,
+    fast_charge_only: bool = False,
+    limit: int = 5
+) -> Dict[str, Any]:
+    """
+    Find our stations within a radius, nearest first.
+
+    Args:
+        latitude: Latitude of the search center
+        longitude: Longitude of the search center
+        radius_km: Search radius in kilometers
+        plug_type: Optional plug type name filter
+        fast_charge_only: Only include stations with a fast charger
+        limit: Maximum number of stations returned
+
+    Returns:
+        Dict with a "stations" list
+    """
+    from django.db.models import Count, Q
+    from apps.driver.utils import calculate_distance
+    from apps.host.models import ChargingStation
+
+    limit = max(1, min(int(limit or 5), 20))
+    radius_km = float(radius_km or 10)
+
+    # Bounding box first so the database filters before distances are computed
+    dlat = radius_km / 111.0
+    dlng = radius_km / (111.0 * max(math.cos(math.radians(latitude)), 0.01))
+    stations = ChargingStation.objects.filter(
+        latitude__range=(latitude - dlat, latitude + dlat),
+        longitude__range=(longitude - dlng, longitude + dlng),
+        removed_at__isnull=True,
+    )
+
+    charger_filter = Q(chargers__is_active=True)
+    if plug_type:
+        charger_filter &= Q(chargers__plug_types__name__iexact=plug_type)
+    if fast_charge_only:
+        charger_filter &= Q(chargers__charger_type__is_fast_charge=True)
+
+    stations = stations.annotate(
+        matching_chargers=Count("chargers", filter=charger_filter, distinct=True),
+        available_chargers=Count("chargers", filter=charger_filter & Q(chargers__available=True), distinct=True),
+    ).filter(matching_chargers__gt=0).values(
+        "id", "station_name", "address", "location_area", "status",
+        "opening_time", "closing_time", "latitude", "longitude",
+        "matching_chargers", "available_chargers",
+    )
+
+    results = []
+    for station in stations:
+        distance = calculate_distance(latitude, longitude, station["latitude"], station["longitude"])
+        if distance > radius_km:
+            continue
+        results.append({
+            "station_id": station["id"],
+            "name": station["station_name"],
+            "address": station["address"] or station["location_area"],
+            "status": station["status"],
+            "hours": f"{station['opening_time']:%H:%M}-{station['closing_time']:%H:%M}",
+            "distance_km": round(distance, 2),
+            "chargers": station["matching_chargers"],
+            "available_chargers": station["available_chargers"],
+        })
+
+    results.sort(key=lambda s: s["distance_km"])
+    return {"stations": results[:limit]}
+
+
+def get_charger_availability(station_id: int, date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return the chargers of a station with their booked slots for a date.
+
+    Args:
+        station_id: Station primary key
+        date: Date as YYYY-MM-DD (default today)
+
+    Returns:
+        Dict with the date and a "chargers" list
+    """
+    from django.utils import timezone
+    from django.utils.dateparse import parse_date
+    from apps.bookings.models import Booking
+    from apps.host.models import Charger
+
+    day = parse_date(date) if date else None
+    day = day or timezone.localdate()
+
+    chargers = list(
+        Charger.objects.filter(station_id=station_id, is_active=True)
+        .select_related("charger_type")
+        .order_by("id")
+    )
+    booked = {}
+    for booking in Booking.objects.filter(
+        charger__in=chargers,
+        booking_date=day,
+        status__in=["pending", "confirmed", "in_progress"],
+    ).order_by("start_time").values("charger_id", "start_time", "end_time"):
+        booked.setdefault(booking["charger_id"], []).append(
+            f"{booking['start_time']:%H:%M}-{booking['end_time']:%H:%M}"
+        )
+
+    return {
+        "station_id": station_id,
+        "date": day.isoformat(),
+        "chargers": [
+            {
+                "charger_id": charger.id,
+                "name": charger.name,
+                "type": charger.charger_type.name,
+                "fast_charge": charger.charger_type.is_fast_charge,
+                "power_kw": float(charger.power_rating),
+                "available_now": charger.available,
+                "open_24_7": charger.open_24_7,
+                "booked_slots": booked.get(charger.id, []),
+            }
+            for charger in chargers
+        ],
+    }
+
+
+def get_pricing(
+    station_id: int,
+    charger_id: Optional[int] = None,
+    duration_hours: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Return charger prices at a station, with an optional session estimate.
+
+    Args:
+        station_id: Station primary key
+        charger_id: Optional charger to restrict to
+        duration_hours: Optional session length for the estimate
+
+    Returns:
+        Dict with a "chargers" price list
+    """
+    from apps.host.models import Charger
+
+    chargers = Charger.objects.filter(station_id=station_id, is_active=True).order_by("id")
+    if charger_id:
+        chargers = chargers.filter(id=charger_id)
+
+    prices = []
+    for charger in chargers.values(
+        "id", "name", "mode", "price", "extended_time_unit", "extended_price_per_unit"
+    ):
+        entry = {
+            "charger_id": charger["id"],
+            "name": charger["name"],
+            "rate": f"{charger['price']} per {charger['mode']}",
+            "extension": f"{charger['extended_price_per_unit']} per {charger['extended_time_unit']} {charger['mode']}",
+        }
+        if duration_hours and charger["mode"] == "hour":
+            subtotal = charger["price"] * Decimal(str(duration_hours))
+            platform_fee = subtotal * PLATFORM_FEE_RATE
+            entry["estimate"] = {
+                "hours": duration_hours,
+                "subtotal": str(subtotal.quantize(Decimal("0.01"))),
+                "platform_fee": str(platform_fee.quantize(Decimal("0.01"))),
+                "total": str((subtotal + platform_fee).quantize(Decimal("0.01"))),
+            }
+        prices.append(entry)
+
+    return {"station_id": station_id, "chargers": prices}
+
+
+TOOL_FUNCTIONS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "search_stations": search_stations,
+    "get_charger_availability": get_charger_availability,
+    "get_pricing": get_pricing,
+}
+
+
+class ToolExecutor:
+    """Runs tool calls for a single chat turn, caching identical calls."""
+
+    def __init__(self, functions: Optional[Dict[str, Callable[..., Dict[str, Any]]]] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            functions: Tool name -> callable mapping (default TOOL_FUNCTIONS)
+        """
+        self.functions = functions or TOOL_FUNCTIONS
+        self.cache: Dict[tuple, str] = {}
+        self.calls = 0
+
+    def execute(self, name: str, arguments: str) -> str:
+        """
+        Execute a tool call.
+
+        Args:
+            name: Tool name chosen by the model
+            arguments: JSON-encoded arguments from the model
+
+        Returns:
+            JSON-encoded tool result (errors are returned to the model, not raised)
+        """
+        try:
+            kwargs = json.loads(arguments or "{}")
+        except ValueError:
+            return json.dumps({"error": "Arguments must be a JSON object."})
+
+        key = (name, json.dumps(kwargs, sort_keys=True))
+        if key in self.cache:
+            return self.cache[key]
+
+        function = self.functions.get(name)
+        if function is None:
+            return json.dumps({"error": f"Unknown tool: {name}"})
+
+        try:
+            self.calls += 1
+            result = json.dumps(function(**kwargs), default=str)
+        except Exception as e:
+            print(f"Error running tool {name}: {e}")
+            result = json.dumps({"error": f"{name} failed."})
+
+        self.cache[key] = result
+        return result
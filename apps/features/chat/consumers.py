@@ -1,9 +1,15 @@
 import json
+import math
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
 from apps.accounts.models import User
+from apps.features.ai.chatbot import get_chatbot
 from apps.features.chat.models import ChatRoom, Message
+from apps.features.ai.memory import ConversationMemory
+from apps.features.chat.serializers import MessageSerializer
+from apps.features.chat.utils import load_ai_chat_tail, save_ai_chat_summary
+from apps.features.chat.throttling import get_concurrency_gate, get_rate_limiter
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -150,3 +156,115 @@ class ChatConsumer(AsyncWebsocketConsumer):
     # Helper for sending consistent JSON
     async def send_json(self, data):
         await self.send(text_data=json.dumps(data))
+
+
+
+class AIChatConsumer(AsyncWebsocketConsumer):
+    """
+    Driver ↔ AI chat over WebSocket.
+    Streams the answer token by token and stores the final AI message once.
+    """
+
+    async def connect(self):
+        user = self.scope["user"]
+        if not user.is_authenticated:
+            await self.close()
+            return
+
+        self.chat = await self.get_ai_chat(user)
+        self.chatbot = get_chatbot()
+        self.memory = ConversationMemory()
+        await self.accept()
+
+    async def receive(self, text_data: str):
+        if not text_data:
+            await self.send_json({"type": "error", "error": "Empty message payload."})
+            return
+
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            await self.send_json({"type": "error", "error": "Invalid JSON format."})
+            return
+
+        query = (data.get("text") or "").strip()
+        if not query:
+            await self.send_json({"type": "error", "error": "Text Message is required"})
+            return
+
+        try:
+            latitude = float(data["latitude"]) if data.get("latitude") is not None else None
+            longitude = float(data["longitude"]) if data.get("longitude") is not None else None
+        except (TypeError, ValueError):
+            await self.send_json({"type": "error", "error": "Invalid latitude/longitude."})
+            return
+
+        user = self.scope["user"]
+        retry_after = await get_rate_limiter().aconsume(user.pk)
+        if retry_after:
+            await self.send_json({
+                "type": "error",
+                "error": "Too many AI chat requests. Please slow down.",
+                "retry_after": max(1, math.ceil(retry_after)),
+            })
+            return
+
+        gate = get_concurrency_gate()
+        slot = await gate.aacquire(user.pk)
+        if slot is None:
+            await self.send_json({
+                "type": "error",
+                "error": "Another AI chat request is still running. Please retry shortly.",
+                "retry_after": max(1, math.ceil(gate.max_wait)),
+            })
+            return
+
+        try:
+            await self.answer(user, query, latitude, longitude)
+        finally:
+            await gate.arelease(slot)
+
+    async def answer(self, user, query, latitude, longitude):
+        user_message, tail = await self.save_user_message(self.chat, user, query)
+        history, summary, evicted = await self.memory.abuild_history(
+            self.chat.summary, tail, self.chatbot.openai_service.asummarize_history
+        )
+        if evicted:
+            await database_sync_to_async(save_ai_chat_summary)(self.chat, summary, evicted)
+        await self.send_json({"type": "user_message", "message": await self.serialize(user_message)})
+
+        chunks = []
+        async for delta in self.chatbot.astream_response(query, history, latitude, longitude):
+            chunks.append(delta)
+            await self.send_json({"type": "token", "delta": delta})
+
+        ai_message = await self.save_ai_message(self.chat, "".join(chunks))
+        await self.send_json({"type": "ai_message", "message": await self.serialize(ai_message)})
+
+    # ------------------------------------------------------------------
+    # Database Utility Functions
+    # ------------------------------------------------------------------
+    @staticmethod
+    @database_sync_to_async
+    def get_ai_chat(user):
+        chat, created = ChatRoom.objects.get_or_create(driver=user, is_ai_chat=True)
+        return chat
+
+    @staticmethod
+    @database_sync_to_async
+    def save_user_message(chat, user, text):
+        message = Message.objects.create(chat=chat, sender=user, text=text, is_from_ai=False)
+        return message, load_ai_chat_tail(chat)
+
+    @staticmethod
+    @database_sync_to_async
+    def save_ai_message(chat, text):
+        return Message.objects.create(chat=chat, text=text, is_from_ai=True)
+
+    @staticmethod
+    @database_sync_to_async
+    def serialize(message):
+        return MessageSerializer(message).data
+
+    async def send_json(self, data):
+        await self.send(text_data=json.dumps(data, default=str))
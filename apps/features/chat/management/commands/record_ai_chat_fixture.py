@@ -0,0 +1,45 @@
+import json
+from django.core.management.base import BaseCommand
+from apps.features.chat.models import ChatRoom
+
+
+class Command(BaseCommand):
+    help = 'Export recent AI conversations as a replay fixture for replay_ai_chat'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the fixture JSON file to write')
+        parser.add_argument('--limit', type=int, default=20, help='Number of most recent AI chats to export')
+        parser.add_argument('--max-turns', type=int, default=20, help='Max turns kept per conversation')
+        parser.add_argument('--latitude', type=float, default=23.8103, help='Location replayed with every turn')
+        parser.add_argument('--longitude', type=float, default=90.4125, help='Location replayed with every turn')
+
+    def handle(self, *args, **options):
+        chats = ChatRoom.objects.filter(is_ai_chat=True).order_by('-created_at')[:options['limit']]
+
+        conversations = []
+        for chat in chats:
+            turns = []
+            pending = None
+            # Only the texts are exported, no user data
+            for message in chat.messages.order_by('timestamp').values('is_from_ai', 'text').iterator():
+                if not message['is_from_ai']:
+                    pending = {"text": message['text']}
+                elif pending is not None:
+                    pending["reply"] = message['text']
+                    turns.append(pending)
+                    pending = None
+            if turns:
+                conversations.append({
+                    "name": f"chat-{chat.id}",
+                    "location": [options['latitude'], options['longitude']],
+                    "turns": turns[-options['max_turns']:],
+                })
+
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump({"conversations": conversations}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+        total_turns = sum(len(c["turns"]) for c in conversations)
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(conversations)} conversations ({total_turns} turns) to {options['output']}"
+        ))
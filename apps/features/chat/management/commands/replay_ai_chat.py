@@ -0,0 +1,192 @@
+import json
+import os
+import time
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.accounts.models import User
+from apps.features.ai import cache as ai_cache
+from apps.features.ai.chatbot import reset_chatbot
+from apps.features.ai.config import reset_config
+from apps.features.ai.stubs import StubOpenAIServer, StubPlacesServer
+from apps.features.chat.views import ai_chat
+
+
+DEFAULT_FIXTURE = os.path.normpath(os.path.join(
+    os.path.dirname(__file__), '..', '..', '..', 'ai', 'fixtures', 'chat_replay.json'
+))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Replay recorded AI conversations through ai_chat against local OpenAI/Places stubs and report latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', nargs='?', default=DEFAULT_FIXTURE, help='Replay fixture JSON')
+        parser.add_argument('--openai-latency-ms', type=float, default=400)
+        parser.add_argument('--maps-latency-ms', type=float, default=150)
+        parser.add_argument('--jitter-ms', type=float, default=50)
+        parser.add_argument('--repeat', type=int, default=1, help='Replay every conversation N times')
+        parser.add_argument('--mode', choices=['intent', 'tools'], default='intent', help='Chatbot orchestration mode')
+        parser.add_argument('--warm-cache', action='store_true', help="Don't clear the answer/Places caches first")
+        parser.add_argument('--seed', type=int, default=0, help='Jitter seed')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        with open(options['fixture'], encoding='utf-8') as f:
+            conversations = json.load(f)['conversations']
+
+        replies = {turn['text']: turn['reply'] for c in conversations for turn in c['turns'] if turn.get('reply')}
+        openai_stub = StubOpenAIServer(
+            latency_ms=options['openai_latency_ms'], jitter_ms=options['jitter_ms'],
+            seed=options['seed'], replies=replies
+        )
+        places_stub = StubPlacesServer(
+            latency_ms=options['maps_latency_ms'], jitter_ms=options['jitter_ms'], seed=options['seed']
+        )
+
+        with openai_stub, places_stub:
+            env = {
+                'OPENAI_API_KEY': 'stub',
+                'GOOGLE_MAPS_API_KEY': 'stub',
+                'OPENAI_BASE_URL': f'{openai_stub.base_url}/v1',
+                'GOOGLE_MAPS_BASE_URL': f'{places_stub.base_url}/maps/api/place/nearbysearch/json',
+                'CHATBOT_MODE': options['mode'],
+            }
+            previous_env = {key: os.environ.get(key) for key in env}
+            os.environ.update(env)
+            self._reset_ai_state(clear_caches=not options['warm_cache'])
+            try:
+                turns = self._replay(conversations, options['repeat'])
+                report = self._build_report(
+                    turns, openai_stub.stats, places_stub.stats, ai_cache.get_cache_stats()
+                )
+            finally:
+                for key, value in previous_env.items():
+                    if value is None:
+                        os.environ.pop(key, None)
+                    else:
+                        os.environ[key] = value
+                self._reset_ai_state(clear_caches=False)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print_report(report, options)
+
+    @staticmethod
+    def _reset_ai_state(clear_caches):
+        reset_config()
+        reset_chatbot()
+        response_cache, places_cache = ai_cache.get_response_cache(), ai_cache.get_places_cache()
+        if clear_caches:
+            response_cache.clear()
+            places_cache.clear()
+        response_cache.stats.reset()
+        places_cache.stats.reset()
+
+    def _replay(self, conversations, repeat):
+        factory = APIRequestFactory()
+        turns = []
+
+        # Everything the replay writes (users, chats, messages) is rolled back
+        with transaction.atomic():
+            for run in range(repeat):
+                for index, conversation in enumerate(conversations):
+                    driver = User.objects.create_user(
+                        full_name=f"Replay Driver {run}-{index}",
+                        email=f"replay-{run}-{index}-{time.time_ns()}@example.com",
+                        phone=f"+88019{run:03d}{index:05d}",
+                        password=None,
+                    )
+                    lat, lng = conversation.get('location') or (None, None)
+                    query = f'?latitude={lat}&longitude={lng}' if lat is not None else ''
+
+                    for turn in conversation['turns']:
+                        request = factory.post(f'/api/chat/ai-chat/{query}', {'text': turn['text']}, format='json')
+                        force_authenticate(request, user=driver)
+
+                        with CaptureQueriesContext(connection) as queries:
+                            start = time.perf_counter()
+                            response = ai_chat(request)
+                            elapsed = time.perf_counter() - start
+
+                        turns.append({
+                            'conversation': conversation['name'],
+                            'status': response.status_code,
+                            'latency_ms': elapsed * 1000,
+                            'queries': len(queries.captured_queries),
+                        })
+            transaction.set_rollback(True)
+        return turns
+
+    @staticmethod
+    def _build_report(turns, openai_stats, places_stats, cache_stats):
+        latencies = [t['latency_ms'] for t in turns]
+        queries = [t['queries'] for t in turns]
+        return {
+            'turns': len(turns),
+            'errors': sum(1 for t in turns if t['status'] >= 400),
+            'latency_ms': {
+                'p50': round(percentile(latencies, 50), 1),
+                'p95': round(percentile(latencies, 95), 1),
+                'p99': round(percentile(latencies, 99), 1),
+                'mean': round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+                'max': round(max(latencies), 1) if latencies else 0.0,
+            },
+            'openai': {
+                'requests': openai_stats.get('requests', 0),
+                'intent_requests': openai_stats.get('intent_requests', 0),
+                'summary_requests': openai_stats.get('summary_requests', 0),
+                'tool_call_requests': openai_stats.get('tool_call_requests', 0),
+                'embedding_requests': openai_stats.get('embedding_requests', 0),
+                'prompt_tokens': openai_stats.get('prompt_tokens', 0),
+                'completion_tokens': openai_stats.get('completion_tokens', 0),
+            },
+            'places_requests': places_stats.get('requests', 0),
+            'cache': cache_stats,
+            'db_queries': {
+                'per_turn_mean': round(sum(queries) / len(queries), 1) if queries else 0.0,
+                'per_turn_max': max(queries) if queries else 0,
+                'total': sum(queries),
+            },
+        }
+
+    def _print_report(self, report, options):
+        latency = report['latency_ms']
+        openai = report['openai']
+        cache = report['cache']
+        self.stdout.write(
+            f"Replayed {report['turns']} turns ({report['errors']} errors), mode={options['mode']}, "
+            f"openai={options['openai_latency_ms']:.0f}ms maps={options['maps_latency_ms']:.0f}ms "
+            f"jitter=±{options['jitter_ms']:.0f}ms"
+        )
+        self.stdout.write(
+            f"Turn latency   p50 {latency['p50']:.0f}ms  p95 {latency['p95']:.0f}ms  "
+            f"p99 {latency['p99']:.0f}ms  mean {latency['mean']:.0f}ms  max {latency['max']:.0f}ms"
+        )
+        self.stdout.write(
+            f"OpenAI         {openai['requests']} calls ({openai['intent_requests']} intent, "
+            f"{openai['summary_requests']} summary, {openai['tool_call_requests']} tool), "
+            f"{openai['prompt_tokens']} prompt / {openai['completion_tokens']} completion tokens"
+        )
+        self.stdout.write(f"Places         {report['places_requests']} calls")
+        self.stdout.write(
+            f"Cache          answers {cache['responses']['hit_rate']:.0%} hit "
+            f"({cache['responses']['hits'] + cache['responses']['semantic_hits']}/"
+            f"{cache['responses']['hits'] + cache['responses']['semantic_hits'] + cache['responses']['misses']}), "
+            f"places {cache['places']['hit_rate']:.0%} hit"
+        )
+        self.stdout.write(
+            f"DB queries     {report['db_queries']['per_turn_mean']} per turn "
+            f"(max {report['db_queries']['per_turn_max']})"
+        )
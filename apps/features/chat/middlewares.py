@@ -1,7 +1,82 @@
+import time
+import threading
+from urllib.parse import parse_qs
+from cachetools import TTLCache
+from django.conf import settings
 from channels.middleware import BaseMiddleware
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
-from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+# Validated token (jti) -> (user snapshot, expires_at). Bounded LRU with a short
+# TTL so reconnect storms after a deploy don't turn into one user query per socket.
+USER_CACHE_TTL = getattr(settings, 'WS_JWT_USER_CACHE_TTL', 60)
+USER_CACHE_SIZE = getattr(settings, 'WS_JWT_USER_CACHE_SIZE', 10_000)
+
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+_cache_lock = threading.Lock()
+
+# Token validation is pure CPU (signature + claims), so one shared instance is enough.
+jwt_auth = JWTAuthentication()
+
+
+def get_cached_user(jti):
+    with _cache_lock:
+        entry = _user_cache.get(jti)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if expires_at <= time.time():
+            _user_cache.pop(jti, None)
+            return None
+        return user
+
+
+def cache_user(jti, user, token_exp):
+    expires_at = min(time.time() + USER_CACHE_TTL, token_exp)
+    with _cache_lock:
+        _user_cache[jti] = (user, expires_at)
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop every cached token of a user (logout blacklisting, password change).
+    """
+    with _cache_lock:
+        stale = [jti for jti, (user, _) in _user_cache.items() if user.pk == user_id]
+        for jti in stale:
+            _user_cache.pop(jti, None)
+
+
+def clear_user_cache():
+    with _cache_lock:
+        _user_cache.clear()
+
+
+async def get_user_for_token(raw_token):
+    """
+    Validate the token in-line (no thread hop) and resolve the user, hitting the
+    database only when the token's jti is not cached yet.
+    """
+    validated_token = jwt_auth.get_validated_token(raw_token)
+    jti = validated_token.get(api_settings.JTI_CLAIM)
+
+    user = get_cached_user(jti) if jti else None
+    if user is not None:
+        return user
+
+    user_id = validated_token[api_settings.USER_ID_CLAIM]
+    User = get_user_model()
+    user = await User.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise User.DoesNotExist("User is inactive")
+
+    if jti:
+        cache_user(jti, user, validated_token['exp'])
+    return user
+
 
 class JWTAuthMiddleware(BaseMiddleware):
     """
@@ -12,22 +87,11 @@ class JWTAuthMiddleware(BaseMiddleware):
     async def __call__(self, scope, receive, send):
         scope["user"] = AnonymousUser()
         query_string = scope.get("query_string", b"").decode()
-        token = None
-
-        # get token from query string
-        for param in query_string.split("&"):
-            if param.startswith("token="):
-                token = param.split("=")[1]
-                break
+        token = parse_qs(query_string).get("token", [None])[0]
 
         if token:
             try:
-                jwt_auth = JWTAuthentication()
-                # Validate token (sync to async)
-                validated_token = await sync_to_async(jwt_auth.get_validated_token)(token)
-                # Get user (sync to async)
-                user = await sync_to_async(jwt_auth.get_user)(validated_token)
-                scope["user"] = user
+                scope["user"] = await get_user_for_token(token)
             except Exception as e:
                 # Invalid token
                 scope["user"] = AnonymousUser()
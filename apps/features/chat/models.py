@@ -6,6 +6,10 @@ class ChatRoom(models.Model):
     driver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='driver_chats')
     host = models.ForeignKey(User, on_delete=models.CASCADE, related_name='host_chats', null=True, blank=True)
     is_ai_chat = models.BooleanField(default=False)
+
+    # Rolling summary of AI chat turns that no longer fit in the prompt window
+    summary = models.TextField(blank=True, default='')
+    summary_until = models.DateTimeField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -29,6 +33,10 @@ class Message(models.Model):
     is_from_ai = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['chat', 'timestamp']),
+        ]
 
     def save(self, *args, **kwargs):
         """
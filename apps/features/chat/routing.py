@@ -3,4 +3,5 @@ from apps.features.chat import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/chat/(?P<chat_id>\d+)/$', consumers.ChatConsumer.as_asgi()),
+    re_path(r'ws/ai-chat/$', consumers.AIChatConsumer.as_asgi()),
 ]
\ No newline at end of file
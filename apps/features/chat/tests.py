@@ -1,3 +1,484 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from apps.accounts.models import User
+from channels.testing import WebsocketCommunicator
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.features.chat import middlewares
+from apps.features.chat.consumers import AIChatConsumer
+from apps.driver.models import PlugType
+from apps.features.ai.cache import get_response_cache
+from apps.features.ai.chatbot import EVChargingChatbot
+from apps.features.ai.memory import ConversationMemory
+from apps.features.ai.services import OpenAIService
+from apps.features.ai.tools import ToolExecutor
+from apps.host.models import Charger, ChargerType, ChargingStation
+from apps.features.chat.models import ChatRoom, Message
+from apps.features.chat.utils import get_ai_chat_history
+from apps.features.chat.throttling import (
+    BUSY_RETRY_AFTER, ConcurrencyGate, TokenBucket, get_concurrency_gate, throttle_ai_chat,
+)
+from apps.features.chat.views import ai_chat
 
-# Create your tests here.
+
+class JWTAuthMiddlewareCacheTests(TestCase):
+    def setUp(self):
+        middlewares.clear_user_cache()
+        self.user = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def resolve(self, token):
+        scope = {"query_string": f"foo=bar&token={token}".encode()}
+
+        async def inner(scope, receive, send):
+            return scope["user"]
+
+        return await middlewares.JWTAuthMiddleware(inner)(scope, None, None)
+
+    async def test_second_connection_is_served_from_cache(self):
+        user = await self.resolve(self.token)
+        self.assertEqual(user.pk, self.user.pk)
+
+        await User.objects.filter(pk=self.user.pk).adelete()
+        cached = await self.resolve(self.token)
+        self.assertEqual(cached.pk, self.user.pk)
+
+    async def test_invalidation_forces_lookup(self):
+        await self.resolve(self.token)
+        await sync_to_async(middlewares.invalidate_cached_user)(self.user.pk)
+
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        user = await self.resolve(self.token)
+        self.assertFalse(user.is_authenticated)
+
+    async def test_invalid_token_is_anonymous(self):
+        user = await self.resolve("not-a-token")
+        self.assertFalse(user.is_authenticated)
+
+
+class StubOpenAIService:
+    async def asummarize_history(self, summary, messages):
+        return summary
+
+
+class StubChatbot:
+    openai_service = StubOpenAIService()
+
+    async def astream_response(self, user_message, chat_history, lat=None, lng=None):
+        for delta in ["CCS2 is ", "a fast-charging ", "connector."]:
+            yield delta
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class AIChatConsumerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+
+    @patch("apps.features.chat.consumers.get_chatbot", StubChatbot)
+    async def test_streams_tokens_and_persists_reply_once(self):
+        communicator = WebsocketCommunicator(AIChatConsumer.as_asgi(), "/ws/ai-chat/")
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to({"text": "What is CCS2?"})
+        events = []
+        while not events or events[-1]["type"] != "ai_message":
+            events.append(await communicator.receive_json_from())
+        await communicator.disconnect()
+
+        self.assertEqual(events[0]["type"], "user_message")
+        deltas = [e["delta"] for e in events if e["type"] == "token"]
+        self.assertEqual(len(deltas), 3)
+        self.assertEqual(events[-1]["message"]["text"], "".join(deltas))
+        self.assertEqual(await Message.objects.filter(is_from_ai=True).acount(), 1)
+
+    async def test_rejects_anonymous(self):
+        communicator = WebsocketCommunicator(AIChatConsumer.as_asgi(), "/ws/ai-chat/")
+        communicator.scope["user"] = middlewares.AnonymousUser()
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+
+class ConversationMemoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.chat = ChatRoom.objects.create(driver=self.user, is_ai_chat=True)
+        for i in range(30):
+            Message.objects.create(
+                chat=self.chat, sender=self.user, text=f"question {i} " + "word " * 40, is_from_ai=i % 2 == 1
+            )
+
+    def test_window_fits_budget(self):
+        memory = ConversationMemory(token_budget=500, summary_budget=100)
+        messages = [{"role": "user", "content": "word " * 40} for _ in range(30)]
+        window, evicted = memory.fit("", messages)
+
+        self.assertEqual(len(window) + len(evicted), 30)
+        self.assertLessEqual(sum(memory.message_tokens(m) for m in window), 500)
+        self.assertEqual(window[-1], messages[-1])
+
+    def test_evicted_turns_are_folded_into_summary(self):
+        calls = []
+
+        def summarizer(summary, evicted):
+            calls.append(len(evicted))
+            return "driver asked about stations"
+
+        memory = ConversationMemory(token_budget=500, summary_budget=100)
+        history = get_ai_chat_history(self.chat, summarizer, memory)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(history[0], {"role": "summary", "content": "driver asked about stations"})
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.summary, "driver asked about stations")
+        self.assertIsNotNone(self.chat.summary_until)
+
+        # Next turn only loads the unsummarized tail and stays within budget
+        history = get_ai_chat_history(self.chat, summarizer, memory)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(history) - 1, 30 - calls[0])
+
+    def test_messages_beyond_the_cap_are_summarized_not_dropped(self):
+        chat = ChatRoom.objects.create(driver=self.user, is_ai_chat=True)
+        start = timezone.now() - timedelta(hours=1)
+        for i in range(50):
+            message = Message.objects.create(chat=chat, sender=self.user, text=f"ok {i}", is_from_ai=i % 2 == 1)
+            Message.objects.filter(id=message.id).update(timestamp=start + timedelta(seconds=i))
+        evicted_texts = []
+
+        def summarizer(summary, evicted):
+            evicted_texts.extend(m["content"] for m in evicted)
+            return "short chat"
+
+        # Far under the token budget; only the message cap overflows
+        memory = ConversationMemory(token_budget=5000, summary_budget=100, max_messages=40)
+        history = get_ai_chat_history(chat, summarizer, memory)
+
+        window = [m["content"] for m in history[1:]]
+        self.assertEqual(evicted_texts + window, [f"ok {i}" for i in range(50)])
+        self.assertEqual(len(window), 24)
+        chat.refresh_from_db()
+        self.assertEqual(chat.summary_until, start + timedelta(seconds=25))
+
+
+def stub_message(content=None, tool_calls=None):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content, tool_calls=tool_calls))])
+
+
+def stub_tool_call(call_id, name, arguments):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+def stub_chunk(content=None, tool_calls=None):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))])
+
+
+class StubCompletions:
+    """Replays canned responses and records every request."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return self.responses.pop(0)
+
+
+class AsyncStubCompletions(StubCompletions):
+    async def create(self, **kwargs):
+        chunks = super().create(**kwargs)
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        return stream()
+
+
+def stub_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class ChatbotToolsTests(TestCase):
+    def setUp(self):
+        host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123"
+        )
+        self.station = ChargingStation.objects.create(
+            host=host, station_name="Gulshan Hub", location_area="Gulshan", latitude=23.7925, longitude=90.4078
+        )
+        far_host = User.objects.create_user(
+            full_name="Far Host", email="far@example.com", phone="+8801700000003", password="secret123"
+        )
+        far_station = ChargingStation.objects.create(
+            host=far_host, station_name="Chittagong Hub", location_area="Agrabad", latitude=22.3569, longitude=91.7832
+        )
+        fast = ChargerType.objects.create(name="DC Fast", is_fast_charge=True)
+        ccs2 = PlugType.objects.create(name="CCS2")
+        for station in (self.station, far_station):
+            charger = Charger.objects.create(name="C1", station=station, charger_type=fast, price=200)
+            charger.plug_types.add(ccs2)
+        self.charger = self.station.chargers.get()
+
+    def test_search_stations_returns_our_nearby_stations_and_caches_calls(self):
+        executor = ToolExecutor()
+        arguments = json.dumps({"latitude": 23.78, "longitude": 90.40, "radius_km": 5, "plug_type": "ccs2"})
+
+        result = json.loads(executor.execute("search_stations", arguments))
+        executor.execute("search_stations", arguments)
+
+        self.assertEqual([s["name"] for s in result["stations"]], ["Gulshan Hub"])
+        self.assertEqual(result["stations"][0]["available_chargers"], 1)
+        self.assertEqual(executor.calls, 1)
+
+    def test_pricing_estimate_includes_platform_fee(self):
+        result = ToolExecutor().execute("get_pricing", json.dumps({"station_id": self.station.id, "duration_hours": 2}))
+
+        estimate = json.loads(result)["chargers"][0]["estimate"]
+        self.assertEqual(estimate["subtotal"], "400.00")
+        self.assertEqual(estimate["total"], "460.00")
+
+    def test_unknown_tool_is_reported_to_model(self):
+        result = json.loads(ToolExecutor().execute("book_everything", "{}"))
+        self.assertIn("Unknown tool", result["error"])
+
+    def test_tools_mode_answers_from_our_stations(self):
+        completions = StubCompletions([
+            stub_message(tool_calls=[stub_tool_call("call_1", "search_stations", {"latitude": 23.78, "longitude": 90.40})]),
+            stub_message(content="Gulshan Hub is 1.5 km away and has a free DC fast charger."),
+        ])
+        service = OpenAIService(client=stub_client(completions), async_client=object())
+        chatbot = EVChargingChatbot(mode="tools", openai_service=service)
+
+        response = chatbot.get_response("Find me a fast charger", [], 23.78, 90.40)
+
+        self.assertIn("Gulshan Hub", response)
+        self.assertEqual(len(completions.requests), 2)
+        self.assertIn("tools", completions.requests[0])
+        tool_message = completions.requests[1]["messages"][-1]
+        self.assertEqual(tool_message["role"], "tool")
+        self.assertIn("Gulshan Hub", tool_message["content"])
+
+    async def test_tools_mode_streams_after_tool_call(self):
+        completions = AsyncStubCompletions([
+            [
+                stub_chunk(tool_calls=[SimpleNamespace(
+                    index=0, id="call_1", function=SimpleNamespace(name="get_pricing", arguments='{"station_')
+                )]),
+                stub_chunk(tool_calls=[SimpleNamespace(
+                    index=0, id=None, function=SimpleNamespace(name=None, arguments=f'id": {self.station.id}}}')
+                )]),
+            ],
+            [stub_chunk(content="It costs "), stub_chunk(content="200 per hour.")],
+        ])
+        service = OpenAIService(client=object(), async_client=stub_client(completions))
+        chatbot = EVChargingChatbot(mode="tools", openai_service=service)
+
+        deltas = [delta async for delta in chatbot.astream_response("How much is Gulshan Hub?", [])]
+
+        self.assertEqual("".join(deltas), "It costs 200 per hour.")
+        tool_message = completions.requests[1]["messages"][-1]
+        self.assertIn("200", json.loads(tool_message["content"])["chargers"][0]["rate"])
+
+
+class FailingStubCompletions(AsyncStubCompletions):
+    """Streams its chunks, then drops the connection."""
+
+    async def create(self, **kwargs):
+        chunks = StubCompletions.create(self, **kwargs)
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+            raise ConnectionError("stream reset")
+        return stream()
+
+
+class StreamCachingTests(TestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        self.addCleanup(get_response_cache().clear)
+
+    async def answer(self, completions, history=()):
+        service = OpenAIService(client=object(), async_client=stub_client(completions))
+        chatbot = EVChargingChatbot(mode="intent", openai_service=service)
+        with patch.object(chatbot, "adetect_intent", return_value="general_info"):
+            return "".join([
+                delta async for delta in chatbot.astream_response("How long does charging take?", list(history))
+            ])
+
+    async def test_truncated_stream_is_not_cached(self):
+        response = await self.answer(FailingStubCompletions([[stub_chunk(content="It usually takes ")]]))
+
+        self.assertEqual(response, "It usually takes ")
+        cached, _ = await sync_to_async(get_response_cache().get)("How long does charging take?", "general_info")
+        self.assertIsNone(cached)
+
+    async def test_complete_stream_is_cached(self):
+        await self.answer(AsyncStubCompletions([[stub_chunk(content="About "), stub_chunk(content="an hour.")]]))
+
+        cached, _ = await sync_to_async(get_response_cache().get)("How long does charging take?", "general_info")
+        self.assertEqual(cached, "About an hour.")
+
+    async def test_follow_ups_are_not_served_from_the_cache(self):
+        await self.answer(AsyncStubCompletions([[stub_chunk(content="About an hour.")]]))
+
+        history = [
+            {"role": "user", "content": "Tell me about Level 2 chargers"},
+            {"role": "bot", "content": "They deliver 7-22 kW."},
+            {"role": "user", "content": "How long does charging take?"},
+        ]
+        response = await self.answer(AsyncStubCompletions([[stub_chunk(content="6-10 hours on Level 2.")]]), history)
+
+        self.assertEqual(response, "6-10 hours on Level 2.")
+        cached, _ = await sync_to_async(get_response_cache().get)("How long does charging take?", "general_info")
+        self.assertEqual(cached, "About an hour.")
+
+
+class ReplayBenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_replay_runs_offline_and_rolls_back(self):
+        out = StringIO()
+        call_command(
+            "replay_ai_chat", "--openai-latency-ms", "0", "--maps-latency-ms", "0", "--jitter-ms", "0",
+            "--json", stdout=out
+        )
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report["turns"], 13)
+        self.assertEqual(report["errors"], 0)
+        self.assertGreater(report["openai"]["requests"], 0)
+        self.assertGreaterEqual(report["cache"]["responses"]["hits"], 1)
+        self.assertGreater(report["db_queries"]["per_turn_mean"], 0)
+        self.assertFalse(User.objects.filter(email__startswith="replay-").exists())
+        self.assertFalse(Message.objects.exists())
+
+
+class SyncStubChatbot:
+    openai_service = SimpleNamespace(summarize_history=lambda summary, messages: summary)
+
+    def get_response(self, user_message, chat_history, lat=None, lng=None):
+        return f"Answer to {user_message}"
+
+
+class AIChatThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.factory = APIRequestFactory()
+
+    def post(self, view, text):
+        request = self.factory.post('/api/chat/ai-chat/', {'text': text}, format='json')
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def test_bucket_allows_burst_then_reports_wait(self):
+        bucket = TokenBucket(capacity=2, refill_rate=1)
+
+        self.assertEqual(bucket.consume("u1"), 0)
+        self.assertEqual(bucket.consume("u1"), 0)
+        wait = bucket.consume("u1")
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 1)
+        self.assertEqual(bucket.consume("u2"), 0)
+
+    async def test_gate_queues_until_a_slot_frees(self):
+        gate = ConcurrencyGate(limit=1, max_wait=2, max_queued=1)
+        slot = await gate.aacquire("u1")
+        self.assertIsNone(await ConcurrencyGate(limit=1, max_wait=0, max_queued=1).aacquire("u1"))
+
+        threading.Timer(0.1, gate.release, args=[slot]).start()
+        self.assertIsNotNone(await gate.aacquire("u1"))
+
+    @patch("apps.features.ai.chatbot.get_chatbot", SyncStubChatbot)
+    def test_busy_user_gets_429_without_waiting(self):
+        slot = get_concurrency_gate().try_acquire(self.user.pk)
+        self.addCleanup(get_concurrency_gate().release, slot)
+
+        started = time.monotonic()
+        response = self.post(ai_chat, "What is CCS2?")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(int(response["Retry-After"]), BUSY_RETRY_AFTER)
+        self.assertFalse(Message.objects.exists())
+
+    @override_settings(AI_CHAT_BURST=1)
+    @patch("apps.features.ai.chatbot.get_chatbot", SyncStubChatbot)
+    def test_identical_retries_are_rate_limited(self):
+        first = self.post(ai_chat, "What is CCS2?")
+        retry = self.post(ai_chat, "What is CCS2?")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 429)
+        self.assertIsNone(retry.get("X-Coalesced"))
+
+    @override_settings(AI_CHAT_BURST=1)
+    @patch("apps.features.ai.chatbot.get_chatbot", SyncStubChatbot)
+    def test_rate_limited_request_gets_429_with_retry_after(self):
+        first = self.post(ai_chat, "What is CCS2?")
+        second = self.post(ai_chat, "What is CHAdeMO?")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 429)
+        self.assertGreaterEqual(int(second["Retry-After"]), 1)
+        self.assertEqual(Message.objects.filter(is_from_ai=True).count(), 1)
+
+    def test_identical_inflight_requests_are_coalesced(self):
+        calls = []
+
+        @api_view(['POST'])
+        @throttle_ai_chat
+        def slow_view(request):
+            calls.append(request.data['text'])
+            time.sleep(0.3)
+            return Response({"reply": f"call {len(calls)}"}, status=201)
+
+        responses = []
+        threads = [
+            threading.Thread(target=lambda: responses.append(self.post(slow_view, "Where can I charge?")))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+
+        leader, follower = sorted(responses, key=lambda r: r.status_code)
+        self.assertEqual(leader.data, {"reply": "call 1"})
+        # The duplicate is refused at once instead of holding a thread
+        self.assertEqual(follower.status_code, 429)
+        self.assertEqual(int(follower["Retry-After"]), BUSY_RETRY_AFTER)
+
+        retry = self.post(slow_view, "Where can I charge?")
+        self.assertEqual(retry.data, {"reply": "call 1"})
+        self.assertEqual(retry["X-Coalesced"], "true")
+        self.assertEqual(len(calls), 1)
+
+        # Only the refused duplicate's retry is coalesced; asking again runs
+        self.assertEqual(self.post(slow_view, "Where can I charge?").data, {"reply": "call 2"})
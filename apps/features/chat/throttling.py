@@ -0,0 +1,308 @@
+"""
+Per-user guards for the AI chat endpoints.
+
+Every AI turn costs OpenAI/Places calls, so a client firing requests in a loop
+(or a double-submitting frontend) has to be slowed down before it reaches the
+chatbot:
+
+- TokenBucket: AI_CHAT_BURST requests at once, refilled at AI_CHAT_RATE_PER_MINUTE.
+- ConcurrencyGate: at most AI_CHAT_MAX_CONCURRENT turns per user. HTTP
+  requests over the limit get 429 right away; websocket turns wait (with
+  asyncio.sleep) up to AI_CHAT_QUEUE_WAIT seconds, AI_CHAT_MAX_QUEUED at most.
+- SingleFlight: an identical request (same user, text and location) arriving
+  while the first one is still running gets 429, and its retry reuses the
+  first one's response instead of running again.
+
+The HTTP guards never sleep, so a throttled request doesn't hold a worker
+thread. Every request, coalesced or not, is charged against the bucket.
+
+All state lives in the Django cache, so limits are shared by every worker as
+long as the cache is (set REDIS_CACHE_URL in production).
+"""
+import asyncio
+import hashlib
+import json
+import math
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+POLL_INTERVAL = 0.05
+# Retry-After for a request refused because the user's turn is still running
+BUSY_RETRY_AFTER = 2
+
+
+def get_cache():
+    return caches[getattr(settings, 'AI_CHAT_THROTTLE_CACHE', 'default')]
+
+
+@contextmanager
+def cache_lock(cache, key, timeout=2, wait=1):
+    """
+    Best-effort mutex on top of cache.add (atomic on LocMem, Redis, Memcached).
+    Gives up waiting after `wait` seconds rather than failing the request.
+    """
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    acquired = cache.add(lock_key, token, timeout)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.005)
+        acquired = cache.add(lock_key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+class TokenBucket:
+    """Token bucket rate limit stored as (tokens, updated_at) per key."""
+
+    def __init__(self, capacity, refill_rate, prefix='ai_chat:bucket'):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.prefix = prefix
+        # An untouched bucket is full again after this long, so the entry can expire
+        self.ttl = math.ceil(capacity / refill_rate) + 1
+
+    def consume(self, key, tokens=1):
+        """
+        Take tokens from the bucket of `key`.
+        Returns 0 when allowed, otherwise the seconds until enough tokens are back.
+        """
+        cache = get_cache()
+        bucket_key = f"{self.prefix}:{key}"
+
+        with cache_lock(cache, bucket_key):
+            now = time.time()
+            level, updated_at = cache.get(bucket_key) or (self.capacity, now)
+            level = min(self.capacity, level + (now - updated_at) * self.refill_rate)
+
+            if level >= tokens:
+                cache.set(bucket_key, (level - tokens, now), self.ttl)
+                return 0
+            cache.set(bucket_key, (level, now), self.ttl)
+            return (tokens - level) / self.refill_rate
+
+    async def aconsume(self, key, tokens=1):
+        return await sync_to_async(self.consume, thread_sensitive=False)(key, tokens)
+
+
+class ConcurrencyGate:
+    """
+    Caps the number of turns running at once per key.
+    Slots are cache keys with a TTL, so a crashed worker can't hold one forever.
+    """
+
+    def __init__(self, limit, max_wait, max_queued, slot_ttl=120, prefix='ai_chat:slot'):
+        self.limit = limit
+        self.max_wait = max_wait
+        self.max_queued = max_queued
+        self.slot_ttl = slot_ttl
+        self.prefix = prefix
+
+    def try_acquire(self, key):
+        cache = get_cache()
+        for index in range(self.limit):
+            slot = f"{self.prefix}:{key}:{index}"
+            if cache.add(slot, 1, self.slot_ttl):
+                return slot
+        return None
+
+    def release(self, slot):
+        get_cache().delete(slot)
+
+    def _enqueue(self, key):
+        cache = get_cache()
+        queue_key = f"{self.prefix}:{key}:queued"
+        cache.add(queue_key, 0, self.slot_ttl)
+        try:
+            position = cache.incr(queue_key)
+        except ValueError:
+            # Expired between add and incr
+            cache.add(queue_key, 1, self.slot_ttl)
+            position = 1
+        return queue_key, position
+
+    def _dequeue(self, queue_key):
+        try:
+            get_cache().decr(queue_key)
+        except ValueError:
+            pass
+
+    async def aacquire(self, key):
+        try_acquire = sync_to_async(self.try_acquire, thread_sensitive=False)
+        slot = await try_acquire(key)
+        if slot or not self.max_wait:
+            return slot
+
+        queue_key, position = await sync_to_async(self._enqueue, thread_sensitive=False)(key)
+        try:
+            if position > self.max_queued:
+                return None
+            deadline = time.monotonic() + self.max_wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(POLL_INTERVAL)
+                slot = await try_acquire(key)
+                if slot:
+                    return slot
+            return None
+        finally:
+            await sync_to_async(self._dequeue, thread_sensitive=False)(queue_key)
+
+    async def arelease(self, slot):
+        await sync_to_async(self.release, thread_sensitive=False)(slot)
+
+
+class SingleFlight:
+    """
+    Coalesces identical requests: the first caller (leader) runs and
+    duplicates arriving meanwhile are refused. If any were refused, the
+    leader's result is kept for `result_ttl` seconds and handed to the first
+    identical retry; otherwise a later identical request runs normally.
+    """
+
+    def __init__(self, wait, result_ttl=30, prefix='ai_chat:flight'):
+        self.wait = wait
+        self.result_ttl = result_ttl
+        self.prefix = prefix
+
+    def begin(self, key):
+        """
+        Try to become the leader for `key`.
+        Returns (is_leader, flight_id); the running marker expires after `wait`
+        seconds so a crashed leader can't block the key forever.
+        """
+        flight_id = uuid.uuid4().hex
+        if get_cache().add(f"{self.prefix}:{key}:running", flight_id, self.wait):
+            return True, flight_id
+        return False, None
+
+    def refuse(self, key):
+        """Record a refused duplicate, so the leader keeps its result for the retry."""
+        get_cache().set(f"{self.prefix}:{key}:waiting", 1, self.wait)
+
+    def claim(self, key):
+        """The result kept for a refused duplicate of `key`, once; else None."""
+        cache = get_cache()
+        result_key = f"{self.prefix}:{key}:result"
+        result = cache.get(result_key)
+        if result is not None:
+            cache.delete(result_key)
+        return result
+
+    def finish(self, key, flight_id, result=None):
+        """Keep the leader's result for a refused duplicate and let the next identical request run."""
+        cache = get_cache()
+        waiting_key = f"{self.prefix}:{key}:waiting"
+        if result is not None and cache.get(waiting_key):
+            cache.set(f"{self.prefix}:{key}:result", result, self.result_ttl)
+        cache.delete(waiting_key)
+        running_key = f"{self.prefix}:{key}:running"
+        if cache.get(running_key) == flight_id:
+            cache.delete(running_key)
+
+
+def get_rate_limiter():
+    return TokenBucket(
+        capacity=getattr(settings, 'AI_CHAT_BURST', 5),
+        refill_rate=getattr(settings, 'AI_CHAT_RATE_PER_MINUTE', 12) / 60,
+    )
+
+
+def get_concurrency_gate():
+    return ConcurrencyGate(
+        limit=getattr(settings, 'AI_CHAT_MAX_CONCURRENT', 1),
+        max_wait=getattr(settings, 'AI_CHAT_QUEUE_WAIT', 10),
+        max_queued=getattr(settings, 'AI_CHAT_MAX_QUEUED', 2),
+    )
+
+
+def get_single_flight():
+    return SingleFlight(wait=getattr(settings, 'AI_CHAT_COALESCE_WAIT', 60))
+
+
+def request_fingerprint(user_id, text, latitude=None, longitude=None):
+    raw = f"{user_id}|{text.strip().lower()}|{latitude}|{longitude}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def too_many_requests(retry_after, detail="Too many AI chat requests. Please slow down."):
+    retry_after = max(1, math.ceil(retry_after))
+    return Response(
+        {"error": detail, "retry_after": retry_after},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def coalesced(result):
+    status_code, data = result
+    return Response(data, status=status_code, headers={"X-Coalesced": "true"})
+
+
+def throttle_ai_chat(view):
+    """
+    Guards a DRF AI chat view (place it below @permission_classes): applies the
+    rate limit, coalesces duplicates and caps concurrent turns, answering 429
+    with Retry-After instead of waiting. Only successful leader responses are
+    shared with retries.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not getattr(settings, 'AI_CHAT_THROTTLE_ENABLED', True):
+            return view(request, *args, **kwargs)
+
+        user_id = request.user.pk
+        text = str(request.data.get('text', '')).strip()
+        if not text:
+            return view(request, *args, **kwargs)
+
+        retry_after = get_rate_limiter().consume(user_id)
+        if retry_after:
+            return too_many_requests(retry_after)
+
+        flight = get_single_flight()
+        key = request_fingerprint(
+            user_id, text,
+            request.query_params.get('latitude'), request.query_params.get('longitude')
+        )
+        is_leader, flight_id = flight.begin(key)
+        if not is_leader:
+            flight.refuse(key)
+            return too_many_requests(BUSY_RETRY_AFTER, "An identical request is still being processed.")
+
+        result = None
+        try:
+            # Retry of a refused duplicate: answer with the leader's response
+            previous = flight.claim(key)
+            if previous is not None:
+                return coalesced(previous)
+
+            gate = get_concurrency_gate()
+            slot = gate.try_acquire(user_id)
+            if slot is None:
+                return too_many_requests(
+                    BUSY_RETRY_AFTER, "Another AI chat request is still running. Please retry shortly."
+                )
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                gate.release(slot)
+
+            if response.status_code < 400:
+                # Plain JSON types so the cache can pickle it (serializer data holds the serializer)
+                result = (response.status_code, json.loads(json.dumps(response.data, cls=JSONEncoder)))
+            return response
+        finally:
+            flight.finish(key, flight_id, result)
+
+    return wrapper
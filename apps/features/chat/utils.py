@@ -0,0 +1,39 @@
+from apps.features.ai.memory import ConversationMemory
+from apps.features.chat.models import ChatRoom
+
+
+def load_ai_chat_tail(chat):
+    """
+    Load only the unsummarized tail of an AI chat, oldest first.
+    Served by the (chat, timestamp) index instead of scanning the whole history.
+    The tail is loaded in full: ConversationMemory folds whatever exceeds its
+    message cap into the summary and advances summary_until, so it stays short
+    without older turns being dropped unsummarized.
+    """
+    messages = chat.messages.all()
+    if chat.summary_until:
+        messages = messages.filter(timestamp__gt=chat.summary_until)
+
+    tail = messages.order_by('timestamp').values('is_from_ai', 'text', 'timestamp')
+    return [
+        {'role': 'bot' if m['is_from_ai'] else "user", "content": m['text'], "timestamp": m['timestamp']}
+        for m in tail
+    ]
+
+
+def save_ai_chat_summary(chat, summary, evicted):
+    chat.summary = summary
+    chat.summary_until = evicted[-1]['timestamp']
+    ChatRoom.objects.filter(id=chat.id).update(summary=chat.summary, summary_until=chat.summary_until)
+
+
+def get_ai_chat_history(chat, summarizer, memory=None):
+    """
+    Return the token-budgeted history for the next AI turn.
+    Turns that fall out of the window are folded into ChatRoom.summary.
+    """
+    memory = memory or ConversationMemory()
+    history, summary, evicted = memory.build_history(chat.summary, load_ai_chat_tail(chat), summarizer)
+    if evicted:
+        save_ai_chat_summary(chat, summary, evicted)
+    return history
@@ -2,8 +2,10 @@ from rest_framework import status
 from apps.accounts.models import User
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from apps.features.ai.chatbot import EVChargingChatbot
 from apps.features.chat.models import ChatRoom, Message
+from apps.features.chat.utils import get_ai_chat_history
+from apps.features.chat.throttling import throttle_ai_chat
+from apps.common.db_router import replica_reads
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from apps.features.chat.serializers import ChatRoomSerializer, MessageSerializer
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
@@ -13,6 +15,7 @@ from django.db.models import Q
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def my_chats(request):
     user = request.user
     search_query = request.query_params.get('search', '')
@@ -73,6 +76,7 @@ def get_messages(request, chat_id):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def driver_host_chat_list(request):
     user = request.user
 
@@ -106,6 +110,7 @@ def driver_host_chat_list(request):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def driver_chat_list(request):
     user = request.user
 
@@ -145,6 +150,7 @@ def driver_chat_list(request):
 @api_view(['POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@throttle_ai_chat
 def ai_chat(request):
     """
     Driver ↔ AI chat endpoint
@@ -166,14 +172,11 @@ def ai_chat(request):
         is_from_ai=False
     )
     
-    chatbot = EVChargingChatbot()
+    # Imported here so loading the chat URLs doesn't pull in the AI stack
+    from apps.features.ai.chatbot import get_chatbot
+    chatbot = get_chatbot()
     
-
-    
-    history = list(chat.messages.values('is_from_ai', 'text').order_by('timestamp'))
-    formatted_history = [
-        {'role': 'bot' if h['is_from_ai'] else "user", "content": h['text']} for h in history
-    ]
+    formatted_history = get_ai_chat_history(chat, chatbot.openai_service.summarize_history)
     
     ai_reply = chatbot.get_response(
         query,
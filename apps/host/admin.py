@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Avg, Count
 from unfold.admin import ModelAdmin
 from django.utils.html import format_html
 from apps.host.models import ChargingStation, ChargerType, Charger, ConnectorType
@@ -16,8 +17,25 @@ class ChargingStationAdmin(ModelAdmin):
     list_filter = ["status", "location_area"]
     search_fields = ["station_name", "address", "google_place_id"]
     readonly_fields = ["created_at", "updated_at", "average_rating", "review_count"]
+    list_select_related = ["host"]
     list_per_page = 20
 
+    # Ratings are aggregated in the changelist query instead of the
+    # per-row queries of the ChargingStation properties of the same name
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            rating_avg=Avg("reviews__rating"), rating_count=Count("reviews")
+        )
+
+    @admin.display(description="Average Rating", ordering="rating_avg")
+    def average_rating(self, obj):
+        rating = getattr(obj, "rating_avg", None)
+        return round(rating, 2) if rating is not None else 0
+
+    @admin.display(description="Reviews", ordering="rating_count")
+    def review_count(self, obj):
+        return getattr(obj, "rating_count", 0)
+
     def image_preview(self, obj):
         if obj.image:
             return format_html('<img src="{}" width="80" style="border-radius:6px;"/>', obj.image.url)
@@ -69,6 +87,7 @@ class ChargerAdmin(ModelAdmin):
     list_display = ["id", "name", "station", "charger_type", "mode", "price"]
     list_filter = ["charger_type", "mode"]
     search_fields = ["name", "station__station_name", "charger_type__name"]
+    list_select_related = ["station", "charger_type"]
     list_per_page = 25
 
     unfold_config = {
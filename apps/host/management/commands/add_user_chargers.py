@@ -1,11 +1,7 @@
-import os
-import qrcode
-import uuid
-from django.core.files import File
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from django.conf import settings
-from apps.host.models import ChargingStation, Charger, ChargerType, ConnectorType, PlugType
+from apps.host.models import ChargingStation, ChargerType, ConnectorType, PlugType
+from apps.host.utlis import bulk_create_chargers
 
 User = get_user_model()
 
@@ -40,31 +36,21 @@ class Command(BaseCommand):
         plug2, _ = PlugType.objects.get_or_create(name="CHAdeMO Plug")
 
         for station in stations:
-            for i in range(1, 4):  # 3 chargers per station
-                unique_code = str(uuid.uuid4())
-
-                charger = Charger.objects.create(
-                    name=f"Super Charger {i}",
-                    scanner_code=unique_code,
-                    station=station,
-                    charger_type=charger_type,
-                    price=50,
-                    extended_price_per_unit=15,
-                    mode='hour',
-                )
-
-                charger.plug_types.add(plug1, plug2)
-                charger.connector_types.add(connector_ccs, connector_type2)
-
-                # ✅ Generate QR code & attach to scanner_image
-                img = qrcode.make(unique_code)
-                img_path = os.path.join(settings.MEDIA_ROOT, f"charger_scanners/{unique_code}.png")
-                os.makedirs(os.path.dirname(img_path), exist_ok=True)
-                img.save(img_path)
-
-                with open(img_path, "rb") as f:
-                    charger.scanner_image.save(f"{unique_code}.png", File(f), save=True)
-
+            # 3 chargers per station; QR codes are rendered on demand
+            chargers = bulk_create_chargers(station, [
+                {
+                    "name": f"Super Charger {i}",
+                    "charger_type": charger_type,
+                    "price": 50,
+                    "extended_price_per_unit": 15,
+                    "mode": 'hour',
+                    "plug_types": [plug1.id, plug2.id],
+                    "connector_types": [connector_ccs.id, connector_type2.id],
+                }
+                for i in range(1, 4)
+            ])
+
+            for charger in chargers:
                 self.stdout.write(self.style.SUCCESS(f"Added charger: {charger.name} to {station.station_name}"))
 
         self.stdout.write(self.style.SUCCESS("✅ All chargers added successfully!"))
@@ -0,0 +1,56 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.host.models import ChargingStation, Charger, ChargerType, ConnectorType, PlugType
+from apps.host.utlis import bulk_create_chargers
+
+
+class Command(BaseCommand):
+    help = "Provision N identical chargers on a station (e.g. onboarding a depot)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--station-id', type=int, help='Station to add the chargers to')
+        parser.add_argument('--email', help='Host email, used when --station-id is not given')
+        parser.add_argument('--count', type=int, default=10)
+        parser.add_argument('--name-prefix', default='Charger')
+        parser.add_argument('--charger-type', default='Fast Charger', help='Charger type name (created if missing)')
+        parser.add_argument('--mode', choices=['hour', 'kwh'], default='hour')
+        parser.add_argument('--price', type=float, default=50)
+        parser.add_argument('--power-rating', type=float, default=7.5)
+        parser.add_argument('--plug-types', nargs='*', default=[], help='Plug type names (created if missing)')
+        parser.add_argument('--connector-types', nargs='*', default=[], help='Connector type names (created if missing)')
+
+    def handle(self, *args, **options):
+        stations = ChargingStation.objects.all()
+        if options['station_id']:
+            station = stations.filter(id=options['station_id']).first()
+        elif options['email']:
+            station = stations.filter(host__email=options['email']).first()
+        else:
+            raise CommandError("Pass --station-id or --email")
+        if station is None:
+            raise CommandError("Charging station not found")
+
+        charger_type, _ = ChargerType.objects.get_or_create(name=options['charger_type'])
+        plug_ids = [PlugType.objects.get_or_create(name=name)[0].id for name in options['plug_types']]
+        connector_ids = [ConnectorType.objects.get_or_create(name=name)[0].id for name in options['connector_types']]
+
+        start = time.perf_counter()
+        offset = Charger.objects.filter(station=station).count()
+        chargers = [
+            {
+                'name': f"{options['name_prefix']} {offset + i}",
+                'charger_type': charger_type,
+                'mode': options['mode'],
+                'price': options['price'],
+                'power_rating': options['power_rating'],
+                'plug_types': plug_ids,
+                'connector_types': connector_ids,
+            }
+            for i in range(1, options['count'] + 1)
+        ]
+
+        created = bulk_create_chargers(station, chargers)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {len(created)} chargers to {station.station_name} in {(time.perf_counter() - start) * 1000:.0f}ms"
+        ))
@@ -1,5 +1,4 @@
 import random
-from django.utils.crypto import get_random_string
 from django.core.management.base import BaseCommand
 from apps.host.models import ChargingStation, ChargerDetail  
 
@@ -14,7 +13,6 @@ class Command(BaseCommand):
             return
 
         for index, station in enumerate(stations, start=1):
-            scanner_image = f"stations/scanner_{get_random_string(6).upper()}.jpg" 
             charger_type = random.choice(['type_a', 'type_b', 'chademo', 'ccs'])
             charger_level = random.choice(['Level 1', 'Level 2', 'Level 3'])
             price_per_hour = round(random.uniform(1.0, 10.0), 2)
@@ -32,7 +30,6 @@ class Command(BaseCommand):
             ChargerDetail.objects.update_or_create(
                 station=station,
                 defaults={
-                    'scanner_image': scanner_image,
                     'charger_type': charger_type,
                     'charger_level': charger_level,
                     'price_per_hour': price_per_hour,
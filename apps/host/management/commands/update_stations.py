@@ -1,56 +1,74 @@
-import googlemaps
+import json
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from django.utils import timezone
-from apps.host.models import ChargingStation
+from django.core.management.base import BaseCommand, CommandError
+from apps.host.places_import import DEFAULT_REGIONS, PlacesImporter
+
+
+def parse_bbox(value):
+    try:
+        south, west, north, east = (float(v) for v in value.split(','))
+    except ValueError:
+        raise CommandError(f"--bbox must be south,west,north,east, got {value!r}")
+    if south >= north or west >= east:
+        raise CommandError(f"--bbox {value!r} is empty")
+    return south, west, north, east
+
 
 class Command(BaseCommand):
-    help = "Fetch charging stations from Google Maps and store/update in DB"
-
-    def handle(self, *args, **kwargs):
-        gmaps = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
-
-        locations = [
-            (40.7128, -74.0060),   # New York City
-            (34.0522, -118.2437),  # Los Angeles
-            (41.8781, -87.6298),   # Chicago
-            (29.7604, -95.3698),   # Houston
-            (33.4484, -112.0740),  # Phoenix
-            (39.9526, -75.1652),   # Philadelphia
-            (32.7767, -96.7970),   # Dallas
-            (37.7749, -122.4194),  # San Francisco
-            (47.6062, -122.3321),  # Seattle
-            (25.7617, -80.1918),   # Miami
-        ]
-
-        radius = 50000  # 50 km
-
-        for loc in locations:
-            results = gmaps.places_nearby(
-                location=loc,
-                radius=radius,
-                type='electric_vehicle_charging_station'
-            )
-
-            for place in results.get('results', []):
-                name = place.get('name')
-                address = place.get('vicinity')
-                lat = place['geometry']['location']['lat']
-                lng = place['geometry']['location']['lng']
-                place_id = place.get('place_id')
-
-                ChargingStation.objects.update_or_create(
-                    google_place_id=place_id,
-                    defaults={
-                        'station_name': name,
-                        'address': address,
-                        'latitude': lat,
-                        'longitude': lng,
-                        'host_id': 1,  # Ensure user with id=1 exists
-                        'location_area': address or name,
-                        'status': 'OP',
-                        'updated_at': timezone.now()
-                    }
+    help = "Sync charging stations from Google Places by tiling regions into a concurrent search grid"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--region', action='append', choices=sorted(DEFAULT_REGIONS), help='Predefined region (repeatable, default: all)')
+        parser.add_argument('--bbox', action='append', help='Custom region as south,west,north,east (repeatable)')
+        parser.add_argument('--radius', type=int, default=10000, help='Search circle radius in metres')
+        parser.add_argument('--concurrency', type=int, default=8, help='Tiles searched in parallel')
+        parser.add_argument('--qps', type=float, default=10, help='Places requests per second across all workers')
+        parser.add_argument('--batch-size', type=int, default=500, help='Stations per upsert')
+        parser.add_argument('--dry-run', action='store_true', help='Fetch and diff without writing')
+        parser.add_argument('--stub', action='store_true', help='Query a local Places stub instead of Google')
+        parser.add_argument('--stub-latency-ms', type=float, default=100)
+        parser.add_argument('--stub-lattice-step', type=float, default=0.02, help='Degrees between stub stations')
+        parser.add_argument('--json', action='store_true', help='Print the metrics as JSON')
+        parser.add_argument('--changeset', metavar='PATH', help='Write the created/updated/removed stations as JSON')
+
+    def handle(self, *args, **options):
+        regions = [parse_bbox(value) for value in options['bbox'] or []]
+        if options['region'] or not regions:
+            regions += [DEFAULT_REGIONS[name] for name in options['region'] or sorted(DEFAULT_REGIONS)]
+
+        importer_options = dict(
+            radius=options['radius'], concurrency=options['concurrency'],
+            qps=options['qps'], batch_size=options['batch_size'],
+        )
+        if options['stub']:
+            from apps.features.ai.stubs import StubPlacesServer
+            stub = StubPlacesServer(latency_ms=options['stub_latency_ms'], lattice_step=options['stub_lattice_step'])
+            with stub:
+                importer = PlacesImporter(
+                    'stub', base_url=f'{stub.base_url}/maps/api/place/nearbysearch/json', page_token_delay=0,
+                    **importer_options
                 )
+                metrics, changes = importer.run(regions, dry_run=options['dry_run'])
+        else:
+            if not settings.GOOGLE_MAPS_API_KEY:
+                raise CommandError("GOOGLE_MAPS_API_KEY is not set")
+            importer = PlacesImporter(settings.GOOGLE_MAPS_API_KEY, **importer_options)
+            metrics, changes = importer.run(regions, dry_run=options['dry_run'])
+
+        if options['changeset']:
+            with open(options['changeset'], 'w') as f:
+                json.dump(changes, f)
+
+        if options['json']:
+            self.stdout.write(json.dumps(metrics, indent=2))
+            return
 
-        self.stdout.write(self.style.SUCCESS("✅ USA Charging Stations updated successfully"))
+        self.stdout.write(f"Tiles             {metrics['tiles']} ({metrics['splits']} split, {metrics['truncated']} truncated, {metrics['errors']} failed)")
+        self.stdout.write(f"Requests          {metrics['requests']} ({metrics['pages']} result pages)")
+        self.stdout.write(f"Places            {metrics['results']} returned, {metrics['unique']} unique")
+        self.stdout.write(f"Stations          {metrics['created']} created, {metrics['updated']} updated, {metrics['removed']} removed, {metrics['unchanged']} unchanged")
+        self.stdout.write(f"Fetch             {metrics['fetch_seconds']:.1f} s (rate limit wait {metrics['rate_limit_wait_seconds']:.1f} s)")
+        self.stdout.write(f"Sync              {metrics['sync_seconds']:.2f} s")
+        self.stdout.write(f"Places/s          {metrics['places_per_second']:.0f}")
+        self.stdout.write(f"Latency p50/p95   {metrics['latency_p50_ms']:.0f} / {metrics['latency_p95_ms']:.0f} ms")
+        self.stdout.write(self.style.SUCCESS("✅ Charging stations synced"))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("host", "0004_charger_is_default"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="charger",
+            name="scanner_image",
+        ),
+    ]
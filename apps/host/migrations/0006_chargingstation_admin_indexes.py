@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("host", "0005_remove_charger_scanner_image"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chargingstation",
+            index=models.Index(fields=["status"], name="host_chargi_status_fc87e1_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="chargingstation",
+            index=models.Index(
+                fields=["location_area"], name="host_chargi_locatio_f929ee_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def clear_duplicate_place_ids(apps, schema_editor):
+    """Blank place ids become NULL and only the newest station keeps a duplicated id."""
+    ChargingStation = apps.get_model("host", "ChargingStation")
+    ChargingStation.objects.filter(google_place_id="").update(google_place_id=None)
+    seen = set()
+    for station_id, place_id in (
+        ChargingStation.objects.exclude(google_place_id=None).order_by("-id").values_list("id", "google_place_id")
+    ):
+        if place_id in seen:
+            ChargingStation.objects.filter(id=station_id).update(google_place_id=None)
+        seen.add(place_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("host", "0006_chargingstation_admin_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_place_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="chargingstation",
+            name="google_place_id",
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="chargingstation",
+            name="host",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="charging_station",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("host", "0007_station_place_import"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chargingstation",
+            name="places_hash",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+        migrations.AddField(
+            model_name="chargingstation",
+            name="removed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -12,7 +12,8 @@ class ChargingStation(models.Model):
         ('CL', 'Closed'),
         ('MA', 'In Maintenance'),
     ]
-    host = models.OneToOneField(User, on_delete=models.CASCADE, related_name='charging_station')
+    # Null for public stations imported from Google Places (update_stations)
+    host = models.OneToOneField(User, on_delete=models.CASCADE, related_name='charging_station', null=True, blank=True)
     station_name = models.CharField(max_length=200, verbose_name="Station Name")
     location_area = models.CharField(max_length=255, verbose_name="Location Area/Expressway")
     address = models.TextField(blank=True, null=True)
@@ -21,7 +22,11 @@ class ChargingStation(models.Model):
     closing_time = models.TimeField(default=datetime.time(22, 0))
     latitude = models.FloatField()
     longitude = models.FloatField()
-    google_place_id = models.CharField(max_length=255, blank=True, null=True)
+    google_place_id = models.CharField(max_length=255, unique=True, blank=True, null=True)
+    # Content hash of the imported Places fields and when the place disappeared
+    # from Places (apps/host/places_import.py); removed stations are hidden
+    places_hash = models.CharField(max_length=32, blank=True, default='')
+    removed_at = models.DateTimeField(null=True, blank=True)
     image = models.ImageField(upload_to='station_images/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -48,6 +53,10 @@ class ChargingStation(models.Model):
         verbose_name = "Charging Station"
         verbose_name_plural = "Charging Stations"
         ordering = ['station_name']
+        indexes = [
+            models.Index(fields=['status']),
+            models.Index(fields=['location_area']),
+        ]
 
     def __str__(self):
         return self.station_name
@@ -80,7 +89,6 @@ class Charger(models.Model):
     name = models.CharField(max_length=50)
     is_default = models.BooleanField(default=False)
     scanner_code = models.CharField(max_length=36, unique=True, default=uuid.uuid4)
-    scanner_image = models.ImageField(upload_to='charger_scanners/', blank=True, null=True)
     station = models.ForeignKey(ChargingStation, on_delete=models.CASCADE, related_name='chargers')
     charger_type = models.ForeignKey(ChargerType, on_delete=models.PROTECT, related_name='chargers')
     plug_types = models.ManyToManyField(PlugType, related_name='chargers')
@@ -0,0 +1,357 @@
+"""
+Import public charging stations from Google Places nearby search.
+
+A region (bounding box) is tiled into a grid of overlapping search circles;
+tiles that come back full (Places stops at 60 results) are split in four.
+The tiles are queried concurrently through a shared rate limiter, and every
+result page is followed through next_page_token. Places are deduplicated by
+place_id in memory and compared by content hash with what is stored: only new
+and changed places are upserted, with bulk_create(update_conflicts=True) in
+batches, and imported places that disappeared are soft-deleted (removed_at).
+An unchanged nightly sync therefore writes nothing.
+
+Imported stations have no host. Existing rows keep their host, status and
+opening hours; only the Places fields are refreshed.
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import requests
+from django.conf import settings
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+from apps.host.models import ChargingStation
+
+PLACES_NEARBY_URL = getattr(
+    settings, 'GOOGLE_PLACES_NEARBY_URL', 'https://maps.googleapis.com/maps/api/place/nearbysearch/json'
+)
+PLACE_TYPE = 'electric_vehicle_charging_station'
+# A next_page_token only becomes valid a short while after it is issued
+PAGE_TOKEN_DELAY = getattr(settings, 'GOOGLE_PLACES_PAGE_TOKEN_DELAY', 2.0)
+PAGE_TOKEN_RETRIES = 3
+MAX_PAGES = 3
+# Places returns at most 60 results per search; a full tile is split in four
+MAX_RESULTS = 60
+MIN_RADIUS = 500
+METERS_PER_DEGREE = 111_320
+# Tiles are spaced slightly closer than the gap-free limit so cell corners
+# stay inside a circle despite rounding and the degree/metre approximation
+TILE_OVERLAP = 0.95
+
+UPSERT_FIELDS = [
+    'station_name', 'address', 'location_area', 'latitude', 'longitude', 'places_hash', 'removed_at', 'updated_at',
+]
+LOOKUP_BATCH = 500
+# Change-set cells are rounded coordinates, ~1 km at 2 decimals
+CELL_DECIMALS = 2
+
+# Metro areas covered by the nightly sync: (south, west, north, east)
+DEFAULT_REGIONS = {
+    'new-york': (40.48, -74.28, 40.93, -73.68),
+    'los-angeles': (33.70, -118.67, 34.34, -117.65),
+    'chicago': (41.64, -87.94, 42.02, -87.52),
+    'houston': (29.52, -95.79, 30.11, -95.01),
+    'phoenix': (33.29, -112.32, 33.92, -111.59),
+    'philadelphia': (39.87, -75.28, 40.14, -74.96),
+    'dallas': (32.62, -97.00, 33.02, -96.55),
+    'san-francisco': (37.60, -122.53, 37.93, -122.20),
+    'seattle': (47.49, -122.44, 47.74, -122.22),
+    'miami': (25.55, -80.48, 25.98, -80.12),
+}
+
+# Sent after a sync wrote anything, with changes={'created', 'updated',
+# 'removed': [[station_id, place_id, lat, lng], ...], 'cells': [[lat, lng], ...]}
+# so spatial indexes and caches can update just the affected entries.
+stations_synced = Signal()
+
+
+class PlacesError(Exception):
+    pass
+
+
+def place_hash(place):
+    """Digest of the Places fields we store; unchanged places are skipped on sync."""
+    location = place['geometry']['location']
+    content = [place.get('name') or '', place.get('vicinity') or '', round(location['lat'], 6), round(location['lng'], 6)]
+    return hashlib.blake2b(json.dumps(content).encode(), digest_size=16).hexdigest()
+
+
+def station_from_place(place_id, place, digest, now):
+    location = place['geometry']['location']
+    name = (place.get('name') or 'Charging station')[:200]
+    address = place.get('vicinity') or ''
+    return ChargingStation(
+        google_place_id=place_id,
+        station_name=name,
+        address=address,
+        location_area=(address or name)[:255],
+        latitude=location['lat'],
+        longitude=location['lng'],
+        status='OP',
+        places_hash=digest,
+        removed_at=None,
+        updated_at=now,
+    )
+
+
+def cell(lat, lng):
+    return (round(lat, CELL_DECIMALS), round(lng, CELL_DECIMALS))
+
+
+def grid_tiles(south, west, north, east, radius):
+    """
+    Centres of search circles of `radius` metres covering the box. Circles on
+    a square grid with spacing radius * sqrt(2) leave no gaps between them.
+    """
+    step = radius * math.sqrt(2) * TILE_OVERLAP
+    lat_step = step / METERS_PER_DEGREE
+    rows = max(1, math.ceil((north - south) / lat_step))
+    tiles = []
+    for row in range(rows):
+        lat = min(north, south + (row + 0.5) * lat_step)
+        lng_step = step / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        cols = max(1, math.ceil((east - west) / lng_step))
+        for col in range(cols):
+            tiles.append((round(lat, 6), round(min(east, west + (col + 0.5) * lng_step), 6)))
+    return tiles
+
+
+def split_tile(lat, lng, radius):
+    """The four half-radius tiles covering the grid cell of a saturated tile."""
+    offset = radius * math.sqrt(2) * TILE_OVERLAP / 4
+    dlat = offset / METERS_PER_DEGREE
+    dlng = offset / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return [
+        (round(lat + y * dlat, 6), round(lng + x * dlng, 6), radius / 2)
+        for y in (-1, 1) for x in (-1, 1)
+    ]
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = 0.0
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.interval
+            self.waited += at - now
+        if at > now:
+            time.sleep(at - now)
+
+
+class PlacesImporter:
+    def __init__(self, api_key, radius=10_000, concurrency=8, qps=10, batch_size=500,
+                 base_url=PLACES_NEARBY_URL, page_token_delay=PAGE_TOKEN_DELAY, timeout=10):
+        self.api_key = api_key
+        self.radius = radius
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.base_url = base_url
+        self.page_token_delay = page_token_delay
+        self.timeout = timeout
+        self.limiter = RateLimiter(qps)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stats = {
+            'tiles': 0, 'splits': 0, 'truncated': 0, 'requests': 0, 'pages': 0, 'results': 0, 'errors': 0,
+            'created': 0, 'updated': 0, 'unchanged': 0, 'removed': 0,
+        }
+        self.latencies = []
+
+    def session(self):
+        # requests.Session is not thread-safe; one pooled session per worker
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def count(self, **amounts):
+        with self.lock:
+            for name, amount in amounts.items():
+                self.stats[name] += amount
+
+    def request(self, params):
+        self.limiter.wait()
+        sent = time.perf_counter()
+        try:
+            response = self.session().get(self.base_url, params=dict(params, key=self.api_key), timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise PlacesError(str(e))
+        finally:
+            with self.lock:
+                self.stats['requests'] += 1
+                self.latencies.append(time.perf_counter() - sent)
+        if payload.get('status') not in ('OK', 'ZERO_RESULTS', 'INVALID_REQUEST'):
+            raise PlacesError(payload.get('error_message') or payload.get('status'))
+        return payload
+
+    def search_tile(self, lat, lng, radius):
+        """Every result page of one search circle."""
+        places = []
+        payload = self.request({'location': f'{lat},{lng}', 'radius': round(radius), 'type': PLACE_TYPE})
+        for page in range(MAX_PAGES):
+            if payload.get('status') == 'INVALID_REQUEST':
+                raise PlacesError(f"Invalid request for tile {lat},{lng}")
+            places.extend(payload.get('results', []))
+            self.count(pages=1)
+            token = payload.get('next_page_token')
+            if not token or page == MAX_PAGES - 1:
+                break
+            for attempt in range(PAGE_TOKEN_RETRIES):
+                time.sleep(self.page_token_delay)
+                payload = self.request({'pagetoken': token})
+                if payload.get('status') != 'INVALID_REQUEST':
+                    break
+            else:
+                # The token never became valid; keep the pages already read.
+                # Counted as truncated, so missing places are not pruned.
+                print(f"Places page token expired for tile {lat},{lng} after {page + 1} pages")
+                self.count(truncated=1)
+                break
+        return places
+
+    def fetch(self, tiles):
+        """
+        Query the tiles concurrently and return the unique places by place_id.
+        Tiles that hit the Places result cap are split and searched again.
+        """
+        unique = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            pending = {pool.submit(self.search_tile, *tile): tile for tile in tiles}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    lat, lng, radius = pending.pop(future)
+                    self.count(tiles=1)
+                    try:
+                        places = future.result()
+                    except PlacesError as e:
+                        print(f"Places search failed for tile {lat},{lng}: {e}")
+                        self.count(errors=1)
+                        continue
+                    self.count(results=len(places))
+                    for place in places:
+                        if place.get('place_id'):
+                            unique[place['place_id']] = place
+                    if len(places) < MAX_RESULTS:
+                        continue
+                    if radius / 2 < MIN_RADIUS:
+                        self.count(truncated=1)
+                        continue
+                    self.count(splits=1)
+                    for tile in split_tile(lat, lng, radius):
+                        pending[pool.submit(self.search_tile, *tile)] = tile
+        return unique
+
+    def sync(self, places, regions, write=True):
+        """
+        Apply the fetched places and return the change-set.
+
+        Each place is hashed; rows whose stored hash matches are left alone,
+        new and changed ones are upserted, and imported stations inside the
+        regions that no longer appear are soft-deleted. Pruning is skipped when
+        any tile failed or was truncated, since missing places are then
+        unknown rather than gone.
+        """
+        now = timezone.now()
+        existing = {}
+        place_ids = list(places)
+        for i in range(0, len(place_ids), LOOKUP_BATCH):
+            rows = ChargingStation.objects.filter(google_place_id__in=place_ids[i:i + LOOKUP_BATCH]).values(
+                'id', 'google_place_id', 'places_hash', 'removed_at', 'latitude', 'longitude'
+            )
+            existing.update((row['google_place_id'], row) for row in rows)
+
+        changes = {'created': [], 'updated': [], 'removed': []}
+        cells = set()
+        stations = []
+        for place_id, place in places.items():
+            digest = place_hash(place)
+            row = existing.get(place_id)
+            if row and row['places_hash'] == digest and row['removed_at'] is None:
+                self.count(unchanged=1)
+                continue
+            station = station_from_place(place_id, place, digest, now)
+            stations.append(station)
+            cells.add(cell(station.latitude, station.longitude))
+            if row:
+                # A moved station leaves its old cell as well
+                cells.add(cell(row['latitude'], row['longitude']))
+                changes['updated'].append([row['id'], place_id, station.latitude, station.longitude])
+            else:
+                changes['created'].append([None, place_id, station.latitude, station.longitude])
+
+        if write:
+            for i in range(0, len(stations), self.batch_size):
+                ChargingStation.objects.bulk_create(
+                    stations[i:i + self.batch_size], update_conflicts=True,
+                    unique_fields=['google_place_id'], update_fields=UPSERT_FIELDS,
+                )
+            created_ids = [entry[1] for entry in changes['created']]
+            ids = {}
+            for i in range(0, len(created_ids), LOOKUP_BATCH):
+                ids.update(ChargingStation.objects.filter(
+                    google_place_id__in=created_ids[i:i + LOOKUP_BATCH]
+                ).values_list('google_place_id', 'id'))
+            for entry in changes['created']:
+                entry[0] = ids.get(entry[1])
+
+        if not (self.stats['errors'] or self.stats['truncated']):
+            in_regions = Q()
+            for south, west, north, east in regions:
+                in_regions |= Q(latitude__range=(south, north), longitude__range=(west, east))
+            candidates = ChargingStation.objects.filter(
+                in_regions, host__isnull=True, removed_at__isnull=True, google_place_id__isnull=False,
+            ).values_list('id', 'google_place_id', 'latitude', 'longitude')
+            for station_id, place_id, lat, lng in candidates.iterator():
+                if place_id not in places:
+                    changes['removed'].append([station_id, place_id, lat, lng])
+                    cells.add(cell(lat, lng))
+            if write:
+                removed_ids = [entry[0] for entry in changes['removed']]
+                for i in range(0, len(removed_ids), LOOKUP_BATCH):
+                    ChargingStation.objects.filter(id__in=removed_ids[i:i + LOOKUP_BATCH]).update(
+                        removed_at=now, updated_at=now
+                    )
+
+        self.count(created=len(changes['created']), updated=len(changes['updated']), removed=len(changes['removed']))
+        changes['cells'] = sorted(cells)
+        if write and (stations or changes['removed']):
+            stations_synced.send(sender=ChargingStation, changes=changes)
+        return changes
+
+    def run(self, regions, dry_run=False):
+        """Fetch and sync the regions; returns (metrics, change-set)."""
+        started = time.perf_counter()
+        tiles = [(lat, lng, self.radius) for region in regions for lat, lng in grid_tiles(*region, self.radius)]
+        places = self.fetch(tiles)
+        fetched = time.perf_counter()
+        changes = self.sync(places, regions, write=not dry_run)
+        finished = time.perf_counter()
+
+        latencies = sorted(self.latencies)
+        metrics = dict(
+            self.stats,
+            unique=len(places),
+            fetch_seconds=fetched - started,
+            sync_seconds=finished - fetched,
+            places_per_second=len(places) / (finished - started) if finished > started else 0,
+            rate_limit_wait_seconds=self.limiter.waited,
+            latency_p50_ms=latencies[len(latencies) // 2] * 1000 if latencies else 0,
+            latency_p95_ms=latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0,
+        )
+        return metrics, changes
@@ -0,0 +1,170 @@
+"""
+On-demand QR images for chargers.
+
+A charger's QR code is a pure function of its scanner_code, so nothing is
+stored at creation time. Images are rendered when requested and kept in a
+process-wide LRU and, if CHARGER_QR_DISK_CACHE_DIR is set, in a size-bounded
+directory shared by the workers of a host.
+"""
+import io
+import os
+import hashlib
+import threading
+import qrcode
+import qrcode.image.svg
+from cachetools import LRUCache
+from django.conf import settings
+
+# Bump when the rendering below changes so ETags and cached files are invalidated
+QR_RENDER_VERSION = 1
+
+QR_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+QR_DEFAULT_BOX_SIZE = 10
+QR_MAX_BOX_SIZE = 40
+
+
+def render_qr(scanner_code, fmt='png', box_size=QR_DEFAULT_BOX_SIZE):
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=box_size,
+        border=4,
+    )
+    qr.add_data(scanner_code)
+    qr.make(fit=True)
+
+    buffer = io.BytesIO()
+    if fmt == 'svg':
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def qr_etag(scanner_code, fmt, box_size):
+    raw = f"{QR_RENDER_VERSION}:{scanner_code}:{fmt}:{box_size}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class DiskCache:
+    """
+    Files named by key in one directory, evicting the least recently used
+    ones once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Hits count as recent use for eviction
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def set(self, key, data):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("Charger QR: disk cache write failed", e)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Rescan so files written by other processes are accounted for too
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+
+class QRCache:
+    """Rendered QR images: memory LRU first, then the optional disk cache."""
+
+    def __init__(self, maxsize, disk=None):
+        self._memory = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.disk = disk
+        self.renders = 0
+
+    def get(self, scanner_code, fmt='png', box_size=QR_DEFAULT_BOX_SIZE):
+        key = f"{qr_etag(scanner_code, fmt, box_size)}.{fmt}"
+        with self._lock:
+            data = self._memory.get(key)
+        if data is not None:
+            return data
+
+        data = self.disk.get(key) if self.disk else None
+        if data is None:
+            data = render_qr(scanner_code, fmt, box_size)
+            self.renders += 1
+            if self.disk:
+                self.disk.set(key, data)
+
+        with self._lock:
+            self._memory[key] = data
+        return data
+
+
+_qr_cache = None
+_qr_cache_lock = threading.Lock()
+
+
+def get_qr_cache():
+    global _qr_cache
+    if _qr_cache is None:
+        with _qr_cache_lock:
+            if _qr_cache is None:
+                directory = getattr(settings, 'CHARGER_QR_DISK_CACHE_DIR', None)
+                disk = DiskCache(
+                    directory, getattr(settings, 'CHARGER_QR_DISK_CACHE_MAX_BYTES', 50 * 1024 * 1024)
+                ) if directory else None
+                _qr_cache = QRCache(getattr(settings, 'CHARGER_QR_CACHE_SIZE', 1024), disk)
+    return _qr_cache
+
+
+def reset_qr_cache():
+    global _qr_cache
+    with _qr_cache_lock:
+        _qr_cache = None
@@ -1,14 +1,13 @@
-import io
 import uuid
-import qrcode
 import base64
+from django.urls import reverse
 from rest_framework import serializers
 from apps.accounts.models import User
-from django.core.files.base import ContentFile
 from apps.bookings.serializers import ReviewSerializer
 from rest_framework.exceptions import ValidationError
 from apps.driver.models import PlugType
 from apps.host.models import Charger, ChargingStation, ChargerType, ConnectorType
+from apps.host.utlis import bulk_create_chargers
 
 
 class PlugTypeSerializer(serializers.ModelSerializer):
@@ -69,37 +68,20 @@ class ChargerCreateSerializer(serializers.ModelSerializer):
             scanner_code = str(uuid.uuid4())
             validated_data['scanner_code'] = scanner_code
 
-            # ✅ Step 6: Create charger (now no M2M fields inside validated_data)
+            # Step 6: Handle default charger before the insert (no re-save)
+            if validated_data.get('is_default', False):
+                Charger.objects.filter(station=station).update(is_default=False)
+
+            # ✅ Step 7: Create charger (now no M2M fields inside validated_data)
             charger = Charger.objects.create(station=station, **validated_data)
 
-            # ✅ Step 7: Add many-to-many relationships
+            # ✅ Step 8: Add many-to-many relationships
             if plug_types:
                 charger.plug_types.set(plug_types)
             if connector_types:
                 charger.connector_types.set(connector_types)
 
-            # Step 8: Handle default charger
-            is_default = validated_data.get('is_default', False)
-            if is_default:
-                Charger.objects.filter(station=station).update(is_default=False)
-                charger.is_default = True
-                charger.save()
-
-            # Step 9: Generate and save QR Code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(scanner_code)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            file_name = f'charger_qr_{charger.id}.png'
-            charger.scanner_image.save(file_name, ContentFile(buffer.getvalue()), save=True)
+            # Step 9: QR code is rendered on demand by the charger_qr view
 
             return charger
 
@@ -109,8 +91,56 @@ class ChargerCreateSerializer(serializers.ModelSerializer):
     
     
 
+class ChargerBulkItemSerializer(serializers.ModelSerializer):
+    # Plain id, checked for the whole batch in ChargerBulkCreateSerializer.validate
+    charger_type = serializers.IntegerField()
+    is_default = serializers.BooleanField(required=False, default=False)
+    plug_types = serializers.ListField(child=serializers.IntegerField(), required=False)
+    connector_types = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    class Meta:
+        model = Charger
+        fields = [
+            'name', 'charger_type', 'mode', 'price', 'power_rating',
+            'open_24_7', 'available', 'is_active',
+            'extended_time_unit', 'extended_price_per_unit', 'plug_types', 'connector_types', 'is_default'
+        ]
+
+
+class ChargerBulkCreateSerializer(serializers.Serializer):
+    station_id = serializers.IntegerField(required=False)
+    chargers = ChargerBulkItemSerializer(many=True, allow_empty=False, max_length=500)
+
+    def validate(self, attrs):
+        host = self.context['request'].user
+        station_id = attrs.get('station_id')
+        stations = ChargingStation.objects.filter(host=host)
+        station = stations.filter(id=station_id).first() if station_id else stations.first()
+        if station is None:
+            raise ValidationError({"station_id": "Charging station not found."})
+        attrs['station'] = station
+
+        # One query per lookup table for the whole batch
+        for field, model in (('charger_type', ChargerType), ('plug_types', PlugType), ('connector_types', ConnectorType)):
+            requested = set()
+            for item in attrs['chargers']:
+                value = item.get(field, [])
+                requested.update(value if isinstance(value, list) else [value])
+            missing = requested - set(model.objects.filter(id__in=requested).values_list('id', flat=True))
+            if missing:
+                raise ValidationError({field: f"Unknown ids: {sorted(missing)}"})
+
+        for item in attrs['chargers']:
+            item['charger_type_id'] = item.pop('charger_type')
+        return attrs
+
+    def create(self, validated_data):
+        return bulk_create_chargers(validated_data['station'], validated_data['chargers'])
+
+
 class ChargerSerializer(serializers.ModelSerializer):
     # qr_code = serializers.SerializerMethodField()
+    scanner_image = serializers.SerializerMethodField()
 
     class Meta:
         model = Charger
@@ -120,6 +150,11 @@ class ChargerSerializer(serializers.ModelSerializer):
             "mode", "price", "available", "open_24_7", "is_active", "is_default"
         ]
 
+    def get_scanner_image(self, obj):
+        url = reverse('charger_qr', kwargs={'pk': obj.pk, 'fmt': 'png'})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
     # def get_qr_code(self, obj):
     #     """scanner_image থেকে Base64 return করা"""
     #     if not obj.scanner_image:
@@ -1,3 +1,332 @@
-from django.test import TestCase
+import math
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+from apps.bookings.models import Review
+from apps.features.ai.stubs import StubPlacesServer
+from apps.driver.models import PlugType
+from apps.host.models import Charger, ChargerType, ChargingStation, ConnectorType
+from apps.host.places_import import METERS_PER_DEGREE, PAGE_TOKEN_RETRIES, PlacesImporter, grid_tiles, stations_synced
+from apps.host.qr import DiskCache, QRCache, get_qr_cache, reset_qr_cache
 
-# Create your tests here.
+
+class BulkChargerProvisioningTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        self.station = ChargingStation.objects.create(
+            host=self.host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        self.charger_type = ChargerType.objects.create(name="DC Fast")
+        self.plugs = [PlugType.objects.create(name="Type 2").id, PlugType.objects.create(name="CCS2").id]
+        self.connector = ConnectorType.objects.create(name="CCS Combo").id
+        self.client = APIClient()
+        self.client.force_authenticate(self.host)
+
+    def payload(self, count):
+        return {"chargers": [
+            {
+                "name": f"Bay {i}", "charger_type": self.charger_type.id, "price": "25.00",
+                "plug_types": self.plugs, "connector_types": [self.connector], "is_default": i == 3,
+            }
+            for i in range(count)
+        ]}
+
+    def test_bulk_insert_uses_constant_queries(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("bulk_add_chargers"), self.payload(200), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["chargers"]), 200)
+        self.assertLess(len(queries.captured_queries), 20)
+
+        self.assertEqual(Charger.objects.filter(station=self.station).count(), 200)
+        self.assertEqual(Charger.plug_types.through.objects.count(), 400)
+        self.assertEqual(Charger.connector_types.through.objects.count(), 200)
+        self.assertEqual(list(Charger.objects.filter(is_default=True).values_list("name", flat=True)), ["Bay 3"])
+        # QR images are rendered on demand, nothing is written to storage
+        self.assertEqual(os.listdir(self.media_root), [])
+
+    def test_unknown_plug_type_is_rejected(self):
+        payload = self.payload(2)
+        payload["chargers"][1]["plug_types"] = [999]
+
+        response = self.client.post(reverse("bulk_add_chargers"), payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Charger.objects.exists())
+
+    def test_drivers_cannot_provision(self):
+        driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.client.force_authenticate(driver)
+
+        response = self.client.post(reverse("bulk_add_chargers"), self.payload(1), format="json")
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ChargerQRTests(TestCase):
+    def setUp(self):
+        reset_qr_cache()
+        self.addCleanup(reset_qr_cache)
+        self.host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        station = ChargingStation.objects.create(
+            host=self.host, station_name="Depot", location_area="Tejgaon", latitude=23.76, longitude=90.39
+        )
+        self.charger = Charger.objects.create(
+            name="Bay 1", station=station, charger_type=ChargerType.objects.create(name="DC Fast")
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.host)
+
+    def test_png_is_rendered_once_and_revalidated_with_etag(self):
+        url = reverse("charger_qr", kwargs={"pk": self.charger.pk, "fmt": "png"})
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Content-Type"], "image/png")
+        self.assertTrue(first.content.startswith(b"\x89PNG"))
+        self.assertEqual(first["Cache-Control"], "private, max-age=86400")
+
+        self.assertEqual(self.client.get(url).content, first.content)
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+
+        self.assertEqual(get_qr_cache().renders, 1)
+
+    def test_svg_and_unknown_format(self):
+        svg = self.client.get(reverse("charger_qr", kwargs={"pk": self.charger.pk, "fmt": "svg"}))
+        self.assertEqual(svg["Content-Type"], "image/svg+xml")
+        self.assertIn(b"<svg", svg.content)
+
+        self.assertEqual(self.client.get(reverse("charger_qr", kwargs={"pk": self.charger.pk, "fmt": "gif"})).status_code, 404)
+        self.assertEqual(self.client.get(reverse("charger_qr", kwargs={"pk": 999, "fmt": "png"})).status_code, 404)
+
+    def test_only_the_stations_host_gets_the_qr(self):
+        url = reverse("charger_qr", kwargs={"pk": self.charger.pk, "fmt": "png"})
+        driver = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        other = APIClient()
+
+        self.assertEqual(other.get(url).status_code, 401)
+        other.force_authenticate(driver)
+        self.assertEqual(other.get(url).status_code, 404)
+
+    def test_disk_cache_is_shared_and_size_bounded(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+        warm = QRCache(maxsize=8, disk=DiskCache(directory, max_bytes=10 * 1024 * 1024))
+        warm.get(self.charger.scanner_code)
+        cold = QRCache(maxsize=8, disk=DiskCache(directory, max_bytes=10 * 1024 * 1024))
+        cold.get(self.charger.scanner_code)
+        self.assertEqual(cold.renders, 0)
+
+        bounded = QRCache(maxsize=1, disk=DiskCache(directory, max_bytes=3000))
+        for i in range(20):
+            bounded.get(f"code-{i}")
+        total = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        self.assertLessEqual(total, 3000)
+
+
+class HostAdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            full_name="Admin", email="admin@example.com", phone="+8801700000000", password="secret123"
+        )
+        self.reviewer = User.objects.create_user(
+            full_name="Driver", email="driver@example.com", phone="+8801700000001", password="secret123"
+        )
+        self.charger_type = ChargerType.objects.create(name="AC")
+        self.client.force_login(self.admin)
+
+    def add_stations(self, count):
+        for _ in range(count):
+            n = ChargingStation.objects.count()
+            host = User.objects.create_user(
+                full_name=f"Host {n}", email=f"host{n}@example.com", phone=f"+88017100000{n:02d}", password="secret123"
+            )
+            station = ChargingStation.objects.create(
+                host=host, station_name=f"Depot {n}", location_area="Tejgaon", latitude=23.76, longitude=90.39
+            )
+            Charger.objects.create(name="Bay", station=station, charger_type=self.charger_type)
+            Review.objects.create(charging_station=station, reviewer=self.reviewer, rating=4)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for name in ("admin:host_chargingstation_changelist", "admin:host_charger_changelist"):
+            with self.subTest(name):
+                self.add_stations(2)
+                few = self.changelist_queries(reverse(name))
+                self.add_stations(8)
+                self.assertEqual(self.changelist_queries(reverse(name)), few)
+
+    def test_station_changelist_shows_annotated_ratings(self):
+        self.add_stations(1)
+        station = ChargingStation.objects.get()
+        Review.objects.create(charging_station=station, reviewer=self.admin, rating=5)
+
+        response = self.client.get(reverse("admin:host_chargingstation_changelist"))
+
+        self.assertEqual(response.context["cl"].result_list[0].rating_avg, 4.5)
+        self.assertEqual(response.context["cl"].result_list[0].rating_count, 2)
+
+
+class PlacesImportTests(TestCase):
+    BBOX = (37.70, -122.50, 37.80, -122.40)
+
+    def setUp(self):
+        self.stub = StubPlacesServer(lattice_step=0.01).start()
+        self.addCleanup(self.stub.stop)
+
+    def importer(self, **options):
+        return PlacesImporter(
+            "stub", base_url=f"{self.stub.base_url}/maps/api/place/nearbysearch/json",
+            radius=5000, qps=0, page_token_delay=0, **options
+        )
+
+    def test_grid_covers_the_whole_box(self):
+        tiles = grid_tiles(*self.BBOX, 3000)
+        for lat in (37.70 + i * 0.005 for i in range(21)):
+            for lng in (-122.50 + j * 0.005 for j in range(21)):
+                nearest = min(
+                    math.hypot((lat - t_lat) * METERS_PER_DEGREE, (lng - t_lng) * METERS_PER_DEGREE * math.cos(math.radians(lat)))
+                    for t_lat, t_lng in tiles
+                )
+                self.assertLessEqual(nearest, 3000 * 1.001)
+
+    def test_import_follows_pages_splits_full_tiles_and_deduplicates(self):
+        metrics, changes = self.importer().run([self.BBOX])
+
+        self.assertGreater(metrics["pages"], metrics["tiles"])
+        self.assertGreater(metrics["splits"], 0)
+        self.assertLess(metrics["unique"], metrics["results"])
+        # Every lattice point of the box was found
+        imported = set(ChargingStation.objects.values_list("google_place_id", flat=True))
+        self.assertLessEqual({f"lattice-{i}-{j}" for i in range(3770, 3781) for j in range(-12250, -12239)}, imported)
+        self.assertEqual(ChargingStation.objects.count(), metrics["unique"])
+        self.assertEqual(metrics["created"], metrics["unique"])
+        self.assertEqual(
+            {entry[0] for entry in changes["created"]}, set(ChargingStation.objects.values_list("id", flat=True))
+        )
+        self.assertFalse(ChargingStation.objects.filter(host__isnull=False).exists())
+
+    def test_reimport_updates_in_place_and_keeps_host_fields(self):
+        host = User.objects.create_user(
+            full_name="Host", email="host@example.com", phone="+8801700000002", password="secret123", role="host"
+        )
+        ChargingStation.objects.create(
+            host=host, station_name="Old name", location_area="Mission", latitude=0, longitude=0,
+            status="MA", google_place_id="lattice-3775--12245",
+        )
+        self.importer().run([self.BBOX])
+        total = ChargingStation.objects.count()
+
+        self.importer().run([self.BBOX])
+
+        self.assertEqual(ChargingStation.objects.count(), total)
+        station = ChargingStation.objects.get(google_place_id="lattice-3775--12245")
+        self.assertEqual((station.host, station.status), (host, "MA"))
+        self.assertEqual(station.station_name, "Lattice Charging Point 3775/-12245")
+
+    def fetch(self, importer):
+        return importer.fetch([(lat, lng, 5000) for lat, lng in grid_tiles(*self.BBOX, 5000)])
+
+    def test_unchanged_sync_writes_nothing(self):
+        # Small enough to stay under SQLite's bound parameter limit
+        importer = self.importer(batch_size=50)
+        places = self.fetch(importer)
+        importer.sync(places, [self.BBOX])
+        received = []
+        stations_synced.connect(lambda sender, changes, **kwargs: received.append(changes), weak=False, dispatch_uid="test")
+        self.addCleanup(stations_synced.disconnect, dispatch_uid="test")
+
+        resync = self.importer(batch_size=50)
+        with CaptureQueriesContext(connection) as queries:
+            changes = resync.sync(places, [self.BBOX])
+
+        self.assertFalse([q for q in queries.captured_queries if not q["sql"].startswith("SELECT")])
+        self.assertEqual(resync.stats["unchanged"], len(places))
+        self.assertEqual((changes["created"], changes["updated"], changes["removed"], changes["cells"]), ([], [], [], []))
+        self.assertEqual(received, [])
+
+    def test_sync_updates_changed_and_soft_deletes_missing_places(self):
+        importer = self.importer(batch_size=50)
+        places = self.fetch(importer)
+        importer.sync(places, [self.BBOX])
+        received = []
+        stations_synced.connect(lambda sender, changes, **kwargs: received.append(changes), weak=False, dispatch_uid="test")
+        self.addCleanup(stations_synced.disconnect, dispatch_uid="test")
+
+        moved, gone = "lattice-3775--12245", "lattice-3772--12248"
+        places[moved] = dict(places[moved], geometry={"location": {"lat": 37.7751, "lng": -122.4452}})
+        del places[gone]
+        resync = self.importer(batch_size=50)
+        changes = resync.sync(places, [self.BBOX])
+
+        station = ChargingStation.objects.get(google_place_id=moved)
+        self.assertEqual(changes["updated"], [[station.id, moved, 37.7751, -122.4452]])
+        self.assertEqual([entry[1] for entry in changes["removed"]], [gone])
+        self.assertIn((37.72, -122.48), changes["cells"])
+        self.assertEqual(received, [changes])
+        self.assertEqual((resync.stats["updated"], resync.stats["removed"], resync.stats["created"]), (1, 1, 0))
+        self.assertIsNotNone(ChargingStation.objects.get(google_place_id=gone).removed_at)
+
+        # A place that comes back is restored
+        places[gone] = self.fetch(self.importer())[gone]
+        changes = self.importer(batch_size=50).sync(places, [self.BBOX])
+        self.assertEqual([entry[1] for entry in changes["updated"]], [gone])
+        self.assertIsNone(ChargingStation.objects.get(google_place_id=gone).removed_at)
+
+    def test_sync_keeps_missing_places_when_tiles_failed(self):
+        importer = self.importer(batch_size=50)
+        places = self.fetch(importer)
+        importer.sync(places, [self.BBOX])
+        del places["lattice-3772--12248"]
+
+        resync = self.importer(batch_size=50)
+        resync.count(errors=1)
+        changes = resync.sync(places, [self.BBOX])
+
+        self.assertEqual(changes["removed"], [])
+        self.assertFalse(ChargingStation.objects.filter(removed_at__isnull=False).exists())
+
+    def test_unusable_page_token_keeps_the_pages_read(self):
+        importer = self.importer()
+        first = {"status": "OK", "results": [{"place_id": "a"}, {"place_id": "b"}], "next_page_token": "t"}
+        with patch.object(importer, "request", side_effect=[first] + [{"status": "INVALID_REQUEST"}] * PAGE_TOKEN_RETRIES):
+            places = importer.search_tile(37.75, -122.45, 5000)
+
+        self.assertEqual([place["place_id"] for place in places], ["a", "b"])
+        self.assertEqual((importer.stats["pages"], importer.stats["truncated"]), (1, 1))
+
+    def test_dry_run_reports_changes_without_writing(self):
+        metrics, changes = self.importer().run([self.BBOX], dry_run=True)
+
+        self.assertEqual(len(changes["created"]), metrics["unique"])
+        self.assertFalse(ChargingStation.objects.exists())
@@ -1,10 +1,12 @@
 from django.urls import path
-from apps.host.views import add_charger, chargers_list, charging_station_list, host_booking_list, booking_status_update, upcoming_reservations, host_dashboard, plug_and_connector_types
+from apps.host.views import add_charger, bulk_add_chargers, charger_qr, chargers_list, charging_station_list, host_booking_list, booking_status_update, upcoming_reservations, host_dashboard, plug_and_connector_types
 
 urlpatterns = [
     path('get-plugs/', plug_and_connector_types, name='get-plugs'),
     path('add-charger/', add_charger, name='add_charger'),
+    path('add-chargers/bulk/', bulk_add_chargers, name='bulk_add_chargers'),
     path('my-chargers/', chargers_list, name='my_chargers'),
+    path('chargers/<int:pk>/qr.<str:fmt>', charger_qr, name='charger_qr'),
     path('stations/', charging_station_list, name='charging_station_list'),
     
     path('bookings/', host_booking_list, name='host-bookings'),
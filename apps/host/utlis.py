@@ -1,8 +1,49 @@
+import uuid
+from django.db import transaction
 from apps.bookings.models import Booking
 from apps.common.models import Notification
+from apps.host.models import Charger
 
 def create_booking_notification(booking, status_value):
     Notification.objects.create(
         user=booking.user,
         message=f"Your booking has been {status_value} by {booking.station.station_name}."
     )
+
+
+def bulk_create_chargers(station, chargers):
+    """
+    Insert many chargers of a station with one INSERT per table.
+
+    `chargers` are dicts of Charger fields plus optional `plug_types` and
+    `connector_types` id lists. If any is flagged default, the last one becomes
+    the station's only default charger. QR images are rendered on demand
+    (apps/host/qr.py), so nothing is written to storage here.
+    """
+    plug_rows, connector_rows = [], []
+    objs = []
+    for data in chargers:
+        data = dict(data)
+        plug_types = data.pop('plug_types', None) or []
+        connector_types = data.pop('connector_types', None) or []
+        data['is_default'] = False
+        objs.append((Charger(station=station, scanner_code=str(uuid.uuid4()), **data), plug_types, connector_types))
+
+    default_index = max((i for i, data in enumerate(chargers) if data.get('is_default')), default=None)
+
+    with transaction.atomic():
+        if default_index is not None:
+            Charger.objects.filter(station=station, is_default=True).update(is_default=False)
+            objs[default_index][0].is_default = True
+
+        created = Charger.objects.bulk_create([charger for charger, _, _ in objs])
+
+        PlugThrough = Charger.plug_types.through
+        ConnectorThrough = Charger.connector_types.through
+        for charger, (_, plug_types, connector_types) in zip(created, objs):
+            plug_rows += [PlugThrough(charger_id=charger.id, plugtype_id=pk) for pk in set(plug_types)]
+            connector_rows += [ConnectorThrough(charger_id=charger.id, connectortype_id=pk) for pk in set(connector_types)]
+        PlugThrough.objects.bulk_create(plug_rows)
+        ConnectorThrough.objects.bulk_create(connector_rows)
+
+    return created
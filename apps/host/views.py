@@ -4,17 +4,21 @@ from django.db.models import Q
 from rest_framework import status
 from apps.driver.models import PlugType
 from apps.bookings.models import Booking
+from apps.bookings.transitions import transition, InvalidTransition
+from apps.common.db_router import replica_reads
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from apps.subscriptions.models import Subscription
 from rest_framework.permissions import IsAuthenticated
 from apps.host.utlis import create_booking_notification
+from apps.host.qr import QR_DEFAULT_BOX_SIZE, QR_FORMATS, QR_MAX_BOX_SIZE, get_qr_cache, qr_etag
+from django.http import Http404, HttpResponse, HttpResponseNotModified
 from rest_framework.parsers import MultiPartParser, FormParser
 from apps.host.models import ChargingStation, Charger, ConnectorType
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.decorators import api_view, authentication_classes, permission_classes, parser_classes
 from apps.bookings.serializers import BookingSerializer, BookingHostViewSerializer, BookingCompletedSerializer
-from apps.host.serializers import ChargerCreateSerializer, ChargerSerializer, ChargingStationSerializer, PlugTypeSerializer, ConnectorTypeSerializer
+from apps.host.serializers import ChargerCreateSerializer, ChargerBulkCreateSerializer, ChargerSerializer, ChargingStationSerializer, PlugTypeSerializer, ConnectorTypeSerializer
 
  
 logger = logging.getLogger(__name__)
@@ -51,14 +55,8 @@ def add_charger(request):
 
     serializer = ChargerCreateSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
+        # The serializer already made it the only default charger if requested
         charger = serializer.save()
-
-        is_default = request.data.get("is_default", False)
-        
-        if is_default:
-            Charger.objects.filter(station__host=user).update(is_default=False)
-            charger.is_default = True
-            charger.save()
         return Response({
             "message": "Charger added successfully.",
             "charger_id": charger.id,
@@ -69,6 +67,66 @@ def add_charger(request):
 
 
 
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def charger_qr(request, pk, fmt):
+    """
+    QR image of one of the host's chargers, rendered on demand (?size= sets the
+    module size in px). The QR encodes the scanner code that starts walk-up
+    sessions, so only the station's host (or staff) may fetch it, and only the
+    client may cache it; it revalidates with the ETag.
+    """
+    if fmt not in QR_FORMATS:
+        raise Http404("Unsupported QR format")
+    try:
+        box_size = min(max(int(request.GET.get('size', QR_DEFAULT_BOX_SIZE)), 1), QR_MAX_BOX_SIZE)
+    except ValueError:
+        box_size = QR_DEFAULT_BOX_SIZE
+
+    chargers = Charger.objects.filter(pk=pk)
+    if not request.user.is_staff:
+        chargers = chargers.filter(station__host=request.user)
+    scanner_code = chargers.values_list('scanner_code', flat=True).first()
+    if scanner_code is None:
+        raise Http404("Charger not found")
+
+    etag = f'"{qr_etag(scanner_code, fmt, box_size)}"'
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(get_qr_cache().get(scanner_code, fmt, box_size), content_type=QR_FORMATS[fmt])
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+@swagger_auto_schema(method='post', request_body=ChargerBulkCreateSerializer, tags=['Charger'])
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_add_chargers(request):
+    """
+    Provision many chargers of the host's station at once.
+    QR codes are rendered on demand by charger_qr (host/chargers/<pk>/qr.<fmt>).
+    """
+    if request.user.role != 'host':
+        return Response({'error': 'Only hosts can add chargers.'}, status=status.HTTP_403_FORBIDDEN)
+
+    serializer = ChargerBulkCreateSerializer(data=request.data, context={'request': request})
+    if serializer.is_valid():
+        chargers = serializer.save()
+        return Response({
+            "message": f"{len(chargers)} chargers added successfully.",
+            "station": serializer.validated_data['station'].station_name,
+            "chargers": [
+                {"id": charger.id, "name": charger.name, "scanner_code": charger.scanner_code}
+                for charger in chargers
+            ],
+        }, status=status.HTTP_201_CREATED)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 @swagger_auto_schema(method='get', request_body=ChargerSerializer, tags=['Charger'])
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
@@ -83,11 +141,12 @@ def chargers_list(request):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def charging_station_list(request):
     """
     List all charging stations with optional search support.
     """
-    queryset = ChargingStation.objects.all()
+    queryset = ChargingStation.objects.filter(removed_at__isnull=True)
 
     # ---- SEARCH ----
     search_query = request.GET.get('search')
@@ -107,6 +166,7 @@ def charging_station_list(request):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def host_booking_list(request):
     user = request.user
     
@@ -191,11 +251,10 @@ def booking_status_update(request, pk):
     if status_value not in ['accept', 'reject']:
         return Response({'error': 'Invalid status value.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    if status_value == 'accept':
-        booking.status = 'confirmed'
-    elif status_value == 'reject':
-        booking.status = 'cancelled'
-    booking.save()
+    try:
+        transition(booking, 'confirm' if status_value == 'accept' else 'reject', user, reason=request.data.get('reason', ''))
+    except InvalidTransition as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
 
     # 🔔 Notification পাঠানো হচ্ছে
     create_booking_notification(booking, status_value)
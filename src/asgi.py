@@ -9,6 +9,7 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from apps.features.chat.middlewares import JWTAuthMiddleware
 from apps.features.chat.routing import websocket_urlpatterns
+from apps.bookings.routing import websocket_urlpatterns as booking_websocket_urlpatterns
 
 
 
@@ -16,7 +17,7 @@ application = ProtocolTypeRouter({
     "http": get_asgi_application(),
     "websocket": JWTAuthMiddleware(
         URLRouter(
-            websocket_urlpatterns
+            websocket_urlpatterns + booking_websocket_urlpatterns
         )
     ),
 })
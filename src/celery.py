@@ -14,8 +14,24 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 app.conf.beat_schedule = {
-    'update-charging-stations-monthly': {
-        'task': '.apps.host.tasks.update_charging_stations',
-        'schedule': crontab(day_of_month=1, hour=3, minute=0), 
+    # Syncs imported stations with Google Places; unchanged places are not written
+    'update-charging-stations-nightly': {
+        'task': 'apps.host.tasks.update_charging_stations',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    # Retries emails that failed or were queued while the broker was down
+    'drain-email-outbox': {
+        'task': 'apps.common.tasks.send_outbox',
+        'schedule': 60.0,
+    },
+    # Cancels no-shows, closes forgotten sessions and reminds unpaid bookings
+    'sweep-stale-bookings': {
+        'task': 'apps.bookings.tasks.sweep_stale_bookings',
+        'schedule': 300.0,
+    },
+    # Rebuilds the analytics rollups of days whose bookings changed
+    'build-daily-rollups-nightly': {
+        'task': 'apps.analytics.tasks.build_daily_rollups',
+        'schedule': crontab(hour=2, minute=30),
     },
 }
@@ -78,24 +78,72 @@ WSGI_APPLICATION = 'src.wsgi.application'
 ASGI_APPLICATION = "src.asgi.application"
 
 
-# Database
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': os.getenv('DB_NAME'),
-#         'USER': os.getenv('DB_USER'),
-#         'PASSWORD': os.getenv('DB_PASSWORD'),
-#         'HOST': os.getenv('DB_HOST'),
-#         'PORT': os.getenv('DB_PORT'),
-#     }
-# }
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database (apps/common/db_router.py)
+# DB_ENGINE=postgresql switches from the local SQLite file to Postgres with
+# persistent, health-checked connections; DB_POOL_MAX_SIZE uses psycopg 3's
+# connection pool instead. DB_REPLICA_HOST adds a read replica that listing
+# endpoints read from.
+if os.getenv('DB_ENGINE', 'sqlite') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME'),
+            'USER': os.getenv('DB_USER'),
+            'PASSWORD': os.getenv('DB_PASSWORD'),
+            'HOST': os.getenv('DB_HOST'),
+            'PORT': os.getenv('DB_PORT'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
-}
+    if os.getenv('DB_POOL_MAX_SIZE'):
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            from django.core.exceptions import ImproperlyConfigured
+            raise ImproperlyConfigured(
+                "DB_POOL_MAX_SIZE needs psycopg 3 with its pool: pip install 'psycopg[binary,pool]'"
+            )
+        # Pooled connections are returned to the pool, not kept per thread
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE')),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+    if os.getenv('DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': os.getenv('DB_REPLICA_HOST'),
+            'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+            'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # Concurrent writers wait for the lock instead of failing with "database is locked"
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            },
+        }
+    }
+    if os.getenv('DB_REPLICA_NAME'):
+        # A second SQLite file, e.g. a copy, to try the replica routing locally
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'NAME': os.getenv('DB_REPLICA_NAME'),
+            'TEST': {'MIRROR': 'default'},
+        }
+
+DATABASE_ROUTERS = ['apps.common.db_router.ReplicaRouter']
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', 5))
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -132,6 +180,12 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Charger QR images are rendered on demand (apps/host/qr.py); set a directory to
+# also keep them on disk, bounded to CHARGER_QR_DISK_CACHE_MAX_BYTES
+CHARGER_QR_CACHE_SIZE = int(os.getenv('CHARGER_QR_CACHE_SIZE', 1024))
+CHARGER_QR_DISK_CACHE_DIR = os.getenv('CHARGER_QR_DISK_CACHE_DIR') or None
+CHARGER_QR_DISK_CACHE_MAX_BYTES = int(os.getenv('CHARGER_QR_DISK_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -161,9 +215,15 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# Brute-force throttling of login/signup (apps/accounts/throttling.py)
+AUTH_THROTTLE_WINDOW = int(os.getenv('AUTH_THROTTLE_WINDOW', 15 * 60))
+LOGIN_FAILURES_PER_IP = int(os.getenv('LOGIN_FAILURES_PER_IP', 20))
+LOGIN_FAILURES_PER_EMAIL = int(os.getenv('LOGIN_FAILURES_PER_EMAIL', 5))
+SIGNUPS_PER_IP = int(os.getenv('SIGNUPS_PER_IP', 10))
+
 
 #Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
@@ -171,6 +231,11 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 
+# Email outbox (apps/common/utils.py), drained by the send_outbox Celery task
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv('EMAIL_OUTBOX_BACKOFF_SECONDS', 30))
+
 
 # CSRF settings
 CSRF_TRUSTED_ORIGINS = ["https://api.89-116-157-176.sslip.io"] 
@@ -178,12 +243,70 @@ CSRF_TRUSTED_ORIGINS = ["https://api.89-116-157-176.sslip.io"]
 
 # Google Maps
 GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
+# Station import (apps/host/places_import.py)
+GOOGLE_PLACES_NEARBY_URL = os.getenv('GOOGLE_PLACES_NEARBY_URL', 'https://maps.googleapis.com/maps/api/place/nearbysearch/json')
+GOOGLE_PLACES_PAGE_TOKEN_DELAY = float(os.getenv('GOOGLE_PLACES_PAGE_TOKEN_DELAY', 2))
+
+
+# Cache - shared Redis in production so per-user limits hold across workers,
+# per-process memory otherwise
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv('REDIS_CACHE_URL'),
+        },
+    }
+
+
+# AI chat throttling (apps/features/chat/throttling.py)
+AI_CHAT_BURST = int(os.getenv('AI_CHAT_BURST', 5))
+AI_CHAT_RATE_PER_MINUTE = float(os.getenv('AI_CHAT_RATE_PER_MINUTE', 12))
+AI_CHAT_MAX_CONCURRENT = int(os.getenv('AI_CHAT_MAX_CONCURRENT', 1))
+AI_CHAT_QUEUE_WAIT = float(os.getenv('AI_CHAT_QUEUE_WAIT', 10))
+AI_CHAT_MAX_QUEUED = int(os.getenv('AI_CHAT_MAX_QUEUED', 2))
+AI_CHAT_COALESCE_WAIT = float(os.getenv('AI_CHAT_COALESCE_WAIT', 60))
+
+
 
+# Scan-to-start (apps/bookings/views.py scan_to_start)
+SCANNER_CODE_CACHE_TTL = int(os.getenv('SCANNER_CODE_CACHE_TTL', 24 * 60 * 60))
+SCAN_EARLY_START_MINUTES = int(os.getenv('SCAN_EARLY_START_MINUTES', 15))
+SCAN_WALK_UP_MINUTES = int(os.getenv('SCAN_WALK_UP_MINUTES', 60))
+
+# Charging telemetry ingestion (apps/bookings/telemetry.py)
+TELEMETRY_MAX_BATCH = int(os.getenv('TELEMETRY_MAX_BATCH', 500))
+TELEMETRY_ZSTD_LEVEL = int(os.getenv('TELEMETRY_ZSTD_LEVEL', 3))
+TELEMETRY_CHUNK_SAMPLES = int(os.getenv('TELEMETRY_CHUNK_SAMPLES', 3600))
+TELEMETRY_ROLLUP_POINTS = int(os.getenv('TELEMETRY_ROLLUP_POINTS', 120))
+
+# Stale booking sweeper (apps/bookings/sweeper.py), run by celery beat
+SWEEP_BATCH_SIZE = int(os.getenv('SWEEP_BATCH_SIZE', 500))
+SWEEP_CHECKOUT_GRACE_MINUTES = int(os.getenv('SWEEP_CHECKOUT_GRACE_MINUTES', 30))
+SWEEP_PAYMENT_REMINDER_HOURS = int(os.getenv('SWEEP_PAYMENT_REMINDER_HOURS', 24))
+
+# Analytics rollups (apps/analytics/utils.py), rebuilt nightly by celery beat
+ROLLUP_DAYS_PER_BATCH = int(os.getenv('ROLLUP_DAYS_PER_BATCH', 31))
+ROLLUP_WATERMARK_OVERLAP_MINUTES = int(os.getenv('ROLLUP_WATERMARK_OVERLAP_MINUTES', 15))
+ANALYTICS_MAX_REPORT_DAYS = int(os.getenv('ANALYTICS_MAX_REPORT_DAYS', 366))
+
+# Admin dashboard aggregates (apps/accounts/admin_dashboard.py)
+ADMIN_DASHBOARD_CACHE_TTL = int(os.getenv('ADMIN_DASHBOARD_CACHE_TTL', 60))
+# Changelists above this many rows show the planner estimate (apps/common/paginator.py)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000))
 
 
 # Redis broker
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
+# Publishing gives up quickly when Redis is down instead of blocking the request
+# for the default retry schedule (callers fall back to the periodic beat tasks)
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'max_retries': 1,
+    'interval_start': 0,
+    'interval_step': 0.2,
+    'interval_max': 0.5,
+}
 
 
 # Channel layer - Redis
@@ -203,6 +326,7 @@ STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
 FRONTEND_URL = os.getenv('FRONTEND_URL')
 
 APPLE_CLIENT_ID=os.getenv("APPLE_CLIENT_ID")
+APPLE_KEYS_URL=os.getenv("APPLE_KEYS_URL", "https://appleid.apple.com/auth/keys")
 
 
 # Configure Crispy Forms 
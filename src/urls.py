@@ -35,6 +35,7 @@ urlpatterns = [
         path('chat/', include('apps.features.chat.urls')),
         path('stripe/', include('apps.Stripe.urls')),
         path('subscriptions/', include('apps.subscriptions.urls')),
+        path('analytics/', include('apps.analytics.urls')),
     ])),
 
 ]